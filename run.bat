@@ -47,7 +47,7 @@ echo.
 :: AI 백엔드 실행
 :: ----------------------------------------
 echo [2/3] Starting AI backend...
-start "AI_BACKEND" cmd /k "cd /d %PROJECT_ROOT%server && ..\.venv\Scripts\activate && python main.py"
+start "AI_BACKEND" cmd /k "cd /d %PROJECT_ROOT%server && ..\.venv\Scripts\activate && python serve.py"
 
 echo        Waiting for AI backend to be ready...
 :wait_backend
@@ -0,0 +1,201 @@
+# server/backfill.py — 이미지 벡터 백필 (스트리밍·배치·재개 가능)
+# id/filename/vector 컬럼만 배치 단위로 스캔해 0 벡터 행만 골라 임베딩하고,
+# 배치마다 merge_insert 한 번으로 반영합니다. 진행 상황은 체크포인트 파일에 저장되어 중단 후 이어서 실행됩니다.
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from db import scan_batches
+from embedder import encode_image_path
+from schema import VECTOR_DIM
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CHECKPOINT_PATH = PROJECT_ROOT / "data" / "backfill_embeddings.json"
+BACKFILL_BATCH_SIZE = 64
+SCAN_COLUMNS = ["id", "filename", "vector"]
+
+# 실행 중 진행 상황 (/backfill/embeddings/status 용)
+_progress: dict = {"running": False}
+
+
+def get_progress() -> dict:
+    return dict(_progress)
+
+
+def zero_vector_mask(vectors: pa.Array) -> np.ndarray:
+    """FixedSizeList 벡터 컬럼 → 0 벡터(또는 null) 여부 bool 배열."""
+    n = len(vectors)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    if isinstance(vectors, pa.ChunkedArray):
+        vectors = vectors.combine_chunks()
+    mask = np.asarray(vectors.is_null().to_numpy(zero_copy_only=False), dtype=bool)
+    flat = vectors.flatten().to_numpy(zero_copy_only=False)
+    if flat.size == n * VECTOR_DIM and not mask.any():
+        mat = flat.reshape(n, VECTOR_DIM)
+        return np.abs(mat).max(axis=1) < 1e-9
+    # null 이 섞여 있으면 flatten 길이가 달라지므로 행별 처리
+    out = mask.copy()
+    for i, v in enumerate(vectors.to_pylist()):
+        if v is not None:
+            out[i] = all(abs(float(x)) < 1e-9 for x in v)
+    return out
+
+
+def _load_checkpoint() -> dict:
+    try:
+        return json.loads(CHECKPOINT_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checkpoint(data: dict) -> None:
+    CHECKPOINT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CHECKPOINT_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, CHECKPOINT_PATH)
+
+
+def _clear_checkpoint() -> None:
+    try:
+        CHECKPOINT_PATH.unlink()
+    except OSError:
+        pass
+
+
+def write_vectors(table, ids: list[str], vectors: list[list[float]]) -> None:
+    """id → vector 를 merge_insert 한 번으로 반영 (배치당 Lance 버전 1개)."""
+    flat = pa.array(np.asarray(vectors, dtype=np.float32).reshape(-1), type=pa.float32())
+    data = pa.table({
+        "id": pa.array(ids, type=pa.string()),
+        "vector": pa.FixedSizeListArray.from_arrays(flat, VECTOR_DIM),
+    })
+    table.merge_insert("id").when_matched_update_all().execute(data)
+
+
+async def run_backfill(
+    table,
+    upload_dir: Path,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    reset: bool = False,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """0 벡터 행을 배치로 임베딩해 반영. 결과: updated/skipped/failed/seconds/imagesPerSecond."""
+    if reset:
+        _clear_checkpoint()
+    ckpt = _load_checkpoint()
+    # 이전 실행에서 파일 없음/실패로 끝난 id 는 다시 시도하지 않음 (reset 으로 초기화)
+    done_ids = set(ckpt.get("skip_ids", []))
+    stats = {
+        "updated": int(ckpt.get("updated", 0)),
+        "skipped": 0,
+        "failed": int(ckpt.get("failed", 0)),
+    }
+    started = time.perf_counter()
+    embedded = 0
+
+    _progress.clear()
+    _progress.update({"running": True, "resumed": bool(ckpt), **stats, "imagesPerSecond": 0.0})
+    try:
+        for batch in scan_batches(table, SCAN_COLUMNS, batch_size):
+            ids = [str(x) if x is not None else None for x in batch.column("id").to_pylist()]
+            filenames = batch.column("filename").to_pylist()
+            zero = zero_vector_mask(batch.column("vector"))
+
+            todo: list[tuple[str, Path]] = []
+            for row_id, filename, is_zero in zip(ids, filenames, zero):
+                if row_id is None or not filename or not is_zero or row_id in done_ids:
+                    stats["skipped"] += 1
+                    continue
+                path = upload_dir / str(filename).strip()
+                if not path.exists():
+                    stats["skipped"] += 1
+                    done_ids.add(row_id)
+                    continue
+                todo.append((row_id, path))
+            if not todo:
+                continue
+
+            vecs = await asyncio.gather(*(encode_image_path(p) for _, p in todo), return_exceptions=True)
+            ok_ids, ok_vecs = [], []
+            for (row_id, _), vec in zip(todo, vecs):
+                if isinstance(vec, list) and len(vec) == VECTOR_DIM:
+                    ok_ids.append(row_id)
+                    ok_vecs.append(vec)
+                else:
+                    stats["failed"] += 1
+                    done_ids.add(row_id)
+            if ok_ids:
+                try:
+                    await asyncio.to_thread(write_vectors, table, ok_ids, ok_vecs)
+                    stats["updated"] += len(ok_ids)
+                except Exception as e:
+                    print(f"Backfill write failed: {e}")
+                    stats["failed"] += len(ok_ids)
+                    done_ids.update(ok_ids)
+            embedded += len(todo)
+
+            elapsed = time.perf_counter() - started
+            rate = embedded / elapsed if elapsed > 0 else 0.0
+            _save_checkpoint({"updated": stats["updated"], "failed": stats["failed"], "skip_ids": sorted(done_ids)})
+            _progress.update({**stats, "imagesPerSecond": round(rate, 2)})
+            if on_progress is not None:
+                on_progress(get_progress())
+            print(f"Backfill: updated {stats['updated']}, failed {stats['failed']} ({rate:.1f} img/s)")
+    finally:
+        _progress["running"] = False
+
+    elapsed = time.perf_counter() - started
+    _clear_checkpoint()
+    result = {
+        **stats,
+        "seconds": round(elapsed, 2),
+        "imagesPerSecond": round(embedded / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    _progress.update(result)
+    return result
+
+
+def write_phashes(table, ids: list[str], hashes: list[int]) -> None:
+    data = pa.table({
+        "id": pa.array(ids, type=pa.string()),
+        "phash": pa.array(hashes, type=pa.int64()),
+    })
+    table.merge_insert("id").when_matched_update_all().execute(data)
+
+
+async def run_phash_backfill(table, upload_dir: Path, batch_size: int = BACKFILL_BATCH_SIZE) -> dict:
+    """phash 가 비어 있는 행의 지각 해시를 배치로 계산해 반영. 결과: updated/skipped/failed 와 (id, hash) 목록."""
+    from phash import phash_path
+
+    stats = {"updated": 0, "skipped": 0, "failed": 0}
+    computed: list[tuple[str, int]] = []
+    for batch in scan_batches(table, ["id", "filename", "phash"], batch_size):
+        todo: list[tuple[str, Path]] = []
+        for row_id, filename, h in zip(batch.column("id").to_pylist(), batch.column("filename").to_pylist(),
+                                       batch.column("phash").to_pylist()):
+            if row_id is None or not filename or h is not None:
+                stats["skipped"] += 1
+                continue
+            path = upload_dir / str(filename).strip()
+            if not path.exists():
+                stats["skipped"] += 1
+                continue
+            todo.append((str(row_id), path))
+        if not todo:
+            continue
+        hashes = await asyncio.gather(*(asyncio.to_thread(phash_path, p) for _, p in todo))
+        ok = [(row_id, h) for (row_id, _), h in zip(todo, hashes) if h is not None]
+        stats["failed"] += len(todo) - len(ok)
+        if ok:
+            await asyncio.to_thread(write_phashes, table, [i for i, _ in ok], [h for _, h in ok])
+            stats["updated"] += len(ok)
+            computed.extend(ok)
+    return {**stats, "hashes": computed}
@@ -0,0 +1,68 @@
+# server/convert.py — 이미지 포맷 변환 (단건·일괄 공용)
+# 한 번 디코딩한 이미지로 변환본 저장과 썸네일(여러 크기) 생성을 모두 하고,
+# 벡터·pHash 계산용으로 기본 썸네일 크기 이미지를 돌려줘 호출자가 결과 파일을 다시 읽지 않게 합니다.
+#
+# 일괄 변환은 디코딩·인코딩(CPU, 이미지마다 독립)을 프로세스 풀에 나눠 GIL 없이 병렬로 처리합니다.
+# 풀은 spawn 방식이라 워커는 서버 프로세스 메모리(모델·DB 연결·스레드)를 복사하지 않지만, 시작할 때 부모의 __main__ 을
+# 다시 실행합니다. 그래서 서버는 serve.py(모든 import 가 __main__ 가드 안)를 __main__ 으로 띄우고, 워커는 이 모듈과
+# derivatives.py 만 불러옵니다. 워커는 처음 한 번만 뜬 뒤 작업 간 재사용됩니다.
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from derivatives import THUMB_MAX_SIZE, make_derivatives
+
+CONVERT_WORKERS = int(os.environ.get("CONVERT_WORKERS", str(max(1, min(8, (os.cpu_count() or 2) - 1)))))
+FORMAT_EXTENSIONS = {"png": ".png", "jpg": ".jpg", "webp": ".webp"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def convert_file(src_path: Path, new_path: Path, thumb_path: Path, fmt: str, quality: int) -> tuple[int, int, Image.Image]:
+    """PIL로 포맷 변환·저장 후 같은 디코딩 결과로 썸네일 생성.
+
+    (width, height, 기본 썸네일 크기 RGB 이미지) 반환. 프로세스 풀 워커에서도 그대로 호출됨.
+    """
+    img = Image.open(src_path)
+    # RGBA → RGB (jpg는 알파 채널 미지원)
+    if fmt == "jpg" and img.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        background.paste(img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None)
+        img = background
+    elif fmt != "jpg" and img.mode == "P":
+        img = img.convert("RGBA")
+
+    width, height = img.size
+
+    if fmt == "jpg":
+        img.save(new_path, "JPEG", quality=quality, optimize=True)
+    elif fmt == "webp":
+        img.save(new_path, "WEBP", quality=quality, method=4)
+    else:  # png
+        img.save(new_path, "PNG", optimize=True)
+
+    # 썸네일 생성 (알파는 흰 배경으로 합성)
+    derivatives = make_derivatives(img, thumb_path)
+    return width, height, derivatives[THUMB_MAX_SIZE]
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """일괄 변환용 프로세스 풀 (처음 쓸 때 생성, 작업 간 공유)."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=max(1, CONVERT_WORKERS), mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
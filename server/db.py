@@ -1,10 +1,14 @@
 # server/db.py — LanceDB 연결, 테이블 생성
 
+import threading
+from datetime import timedelta
 from pathlib import Path
+from typing import Optional
 
 import lancedb
+import pyarrow as pa
 
-from schema import ImageRow, VECTOR_DIM
+from schema import ImageRow, PUBLIC_COLUMNS, VECTOR_DIM
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DB_DIR = PROJECT_ROOT / "data" / "gallery"
@@ -13,25 +17,136 @@ DB_DIR = PROJECT_ROOT / "data" / "gallery"
 ZERO_VECTOR = [0.0] * VECTOR_DIM
 
 
+# 다른 핸들/프로세스의 쓰기를 읽기에 반영하는 주기. 같은 핸들로 쓴 내용은 즉시 보임.
+READ_CONSISTENCY_SECONDS = 1.0
+
+# 프로세스 공용 연결·테이블 핸들 (FastAPI 동기 스레드풀에서 공유)
+_handle_lock = threading.Lock()
+_db: Optional[lancedb.db.DBConnection] = None
+_table = None
+
+# id 스칼라 인덱스를 확인(또는 생성)했으면 True. 이후 쓰기마다 list_indices 를 다시 부르지 않음
+_id_index_lock = threading.Lock()
+_id_index_ready = False
+
+
 def _connect() -> lancedb.db.DBConnection:
     DB_DIR.mkdir(parents=True, exist_ok=True)
-    return lancedb.connect(str(DB_DIR))
+    return lancedb.connect(
+        str(DB_DIR),
+        read_consistency_interval=timedelta(seconds=READ_CONSISTENCY_SECONDS),
+    )
 
 
 def _table_exists(db: lancedb.db.DBConnection) -> bool:
     return "images" in db.table_names()
 
 
+def _get_db() -> lancedb.db.DBConnection:
+    global _db
+    if _db is None:
+        with _handle_lock:
+            if _db is None:
+                _db = _connect()
+    return _db
+
+
 def ensure_migrated() -> None:
-    """LanceDB 연결 후 images 테이블이 없으면 스키마로 생성."""
-    db = _connect()
-    if not _table_exists(db):
-        db.create_table("images", schema=ImageRow)
+    """LanceDB 연결 후 images 테이블이 없으면 스키마로 생성. 누락 컬럼 추가, id 스칼라 인덱스 보장."""
+    table = get_table()
+    if "phash" not in table.schema.names:
+        table.add_columns({"phash": "CAST(NULL AS BIGINT)"})
+        print("Added phash column to images table")
+    ensure_id_index(table)
 
 
 def get_table():
-    """테이블 반환. 호출 전 ensure_migrated() 가 불려 있어야 함."""
-    db = _connect()
-    if not _table_exists(db):
-        db.create_table("images", schema=ImageRow)
-    return db.open_table("images")
+    """캐시된 images 테이블 핸들 반환 (없으면 스키마로 생성).
+
+    연결·open_table 은 프로세스당 한 번만 하고, 최신 버전 반영은 read_consistency_interval 폴링에 맡깁니다.
+    """
+    global _db, _table
+    if _table is None:
+        with _handle_lock:
+            if _table is None:
+                # _get_db() 는 같은 (재진입 불가) 잠금을 잡으므로 여기서는 직접 연결
+                if _db is None:
+                    _db = _connect()
+                db = _db
+                if not _table_exists(db):
+                    db.create_table("images", schema=ImageRow)
+                _table = db.open_table("images")
+    return _table
+
+
+def refresh_table() -> None:
+    """외부에서 테이블을 바꾼 직후 즉시 최신 버전을 보고 싶을 때 호출."""
+    if _table is not None:
+        _table.checkout_latest()
+
+
+def scan_batches(table, columns: list[str], batch_size: int = 1024):
+    """컬럼 프로젝션으로 테이블을 RecordBatch 단위 스트리밍 (전체 to_pandas 회피)."""
+    try:
+        ds = table.to_lance()
+        yield from ds.to_batches(columns=columns, batch_size=batch_size)
+    except (AttributeError, ImportError):
+        yield from table.to_arrow().select(columns).to_batches(max_chunksize=batch_size)
+
+
+def id_predicate(image_id: str) -> str:
+    """id 일치 SQL 조건 (작은따옴표 이스케이프)."""
+    safe_id = str(image_id).strip().replace("'", "''")
+    return f"id = '{safe_id}'"
+
+
+def upsert_rows(table, rows: list[dict]) -> None:
+    """id 기준 추가 또는 교체 (클라이언트가 정한 id 로 다시 보내도 행이 중복되지 않음)."""
+    # dict 목록 그대로 넘기면 일부 LanceDB 버전이 nullable 차이로 거부 → 테이블 스키마로 Arrow 변환
+    data = pa.Table.from_pylist(rows, schema=table.schema)
+    table.merge_insert("id").when_matched_update_all().when_not_matched_insert_all().execute(data)
+
+
+def ensure_id_index(table) -> bool:
+    """id 컬럼에 BTREE 스칼라 인덱스가 없으면 생성 (단건 조회를 전체 스캔 대신 인덱스로).
+
+    시작 시와 쓰기 후(vector_index.schedule_reindex_check) 호출. 한 번 확인·생성되면 이후 호출은 바로 반환.
+    인덱스가 있으면 True.
+    """
+    global _id_index_ready
+    if _id_index_ready:
+        return True
+    with _id_index_lock:
+        if _id_index_ready:
+            return True
+        try:
+            for idx in table.list_indices():
+                if "id" in list(getattr(idx, "columns", []) or []):
+                    _id_index_ready = True
+                    return True
+            if table.count_rows() == 0:
+                # 빈 테이블에는 인덱싱할 데이터가 없으므로 첫 추가 후 다시 시도
+                return False
+            table.create_scalar_index("id", index_type="BTREE")
+            _id_index_ready = True
+            print("Created BTREE index on images.id")
+        except Exception as e:
+            print(f"id index creation skipped: {e}")
+    return _id_index_ready
+
+
+def get_image_row(image_id: str, columns: Optional[list[str]] = None, table=None) -> Optional[dict]:
+    """id 로 이미지 한 건 조회. columns 로 필요한 컬럼만 읽음 (기본: 내부 컬럼 제외 전체). 없으면 None."""
+    if not image_id or not str(image_id).strip():
+        return None
+    if table is None:
+        table = get_table()
+    if columns is None:
+        columns = list(PUBLIC_COLUMNS)
+    query = table.search().where(id_predicate(image_id)).select(list(columns)).limit(1)
+    rows = query.to_list()
+    if not rows:
+        return None
+    row = rows[0]
+    row.pop("_distance", None)
+    return row
@@ -0,0 +1,215 @@
+# server/dedup.py — 중복 이미지 후보 탐색 엔진 (블록 단위 행렬 연산)
+# 벡터 행렬을 한 번만 연속 float32 배열로 읽어, 메모리 한도 안에서 블록별로 쌍별 거리를 계산하고
+# 임계값 이하 쌍을 배열 기반 union-find 로 묶습니다.
+#
+# 벤치마크 (기존 방식: 이미지마다 table.search 한 번):
+#   python dedup.py --bench --n 5000
+
+import time
+from typing import Literal
+
+import numpy as np
+
+from db import scan_batches
+from schema import VECTOR_DIM
+
+DEDUP_MAX_MEMORY_MB = 256
+Metric = Literal["l2", "cosine"]
+
+
+def load_vector_matrix(table, batch_size: int = 8192) -> tuple[np.ndarray, np.ndarray]:
+    """(ids, float32 행렬[N, VECTOR_DIM]) 반환. 0 벡터 행은 제외."""
+    ids: list[np.ndarray] = []
+    mats: list[np.ndarray] = []
+    for batch in scan_batches(table, ["id", "vector"], batch_size):
+        vec_col = batch.column("vector")
+        if len(vec_col) == 0 or vec_col.null_count:
+            # null 이 섞인 배치는 드물어 행별 변환으로 처리
+            rows = [(i, v) for i, v in zip(batch.column("id").to_pylist(), vec_col.to_pylist()) if v is not None]
+            if not rows:
+                continue
+            batch_ids = np.asarray([str(i) for i, _ in rows], dtype=object)
+            mat = np.asarray([v for _, v in rows], dtype=np.float32)
+        else:
+            batch_ids = np.asarray([str(i) for i in batch.column("id").to_pylist()], dtype=object)
+            mat = vec_col.flatten().to_numpy(zero_copy_only=False).astype(np.float32, copy=False)
+            mat = mat.reshape(len(batch_ids), VECTOR_DIM)
+        nonzero = np.abs(mat).max(axis=1) >= 1e-9
+        ids.append(batch_ids[nonzero])
+        mats.append(mat[nonzero])
+    if not mats:
+        return np.zeros(0, dtype=object), np.zeros((0, VECTOR_DIM), dtype=np.float32)
+    return np.concatenate(ids), np.ascontiguousarray(np.concatenate(mats), dtype=np.float32)
+
+
+def _block_rows(n: int, max_memory_mb: float) -> int:
+    """블록 하나(행 B × 열 N 거리 행렬 + 임시 배열 ~3배)가 max_memory_mb 안에 들어가는 B."""
+    per_row = max(1, n) * 4 * 3
+    return max(1, min(n, int(max_memory_mb * 1024 * 1024 // per_row)))
+
+
+def find_duplicate_edges(
+    mat: np.ndarray,
+    threshold: float,
+    metric: Metric = "l2",
+    max_memory_mb: float = DEDUP_MAX_MEMORY_MB,
+) -> tuple[np.ndarray, np.ndarray]:
+    """거리 < threshold 인 (i, j) 쌍 (i < j) 의 인덱스 배열.
+
+    metric="l2": LanceDB _distance 와 같은 제곱 L2 거리. metric="cosine": 1 - 코사인 유사도 (정규화 후 내적).
+    """
+    n = mat.shape[0]
+    if n < 2:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    if metric == "cosine":
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        mat = np.ascontiguousarray(mat / norms, dtype=np.float32)
+    sq = np.einsum("ij,ij->i", mat, mat)
+
+    block = _block_rows(n, max_memory_mb)
+    out_a: list[np.ndarray] = []
+    out_b: list[np.ndarray] = []
+    for start in range(0, n, block):
+        end = min(n, start + block)
+        # 상삼각만: 열은 start 부터
+        dots = mat[start:end] @ mat[start:].T
+        if metric == "cosine":
+            dist = 1.0 - dots
+        else:
+            dist = sq[start:end, None] + sq[None, start:] - 2.0 * dots
+        rows, cols = np.nonzero(dist < threshold)
+        cols = cols + start
+        rows = rows + start
+        keep = cols > rows
+        out_a.append(rows[keep])
+        out_b.append(cols[keep])
+    return np.concatenate(out_a).astype(np.int64), np.concatenate(out_b).astype(np.int64)
+
+
+def connected_components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """배열 기반 union-find (hooking + pointer jumping). 각 원소의 루트(=그룹 내 최소 인덱스) 반환."""
+    parent = np.arange(n, dtype=np.int64)
+    if len(a) == 0:
+        return parent
+    while True:
+        pa, pb = parent[a], parent[b]
+        lo, hi = np.minimum(pa, pb), np.maximum(pa, pb)
+        diff = lo != hi
+        if not diff.any():
+            return parent
+        # 루트 hi 를 더 작은 루트 lo 에 연결 (parent[x] <= x 유지 → 사이클 없음)
+        np.minimum.at(parent, hi[diff], lo[diff])
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+def group_duplicates(
+    ids: np.ndarray,
+    mat: np.ndarray,
+    threshold: float,
+    max_groups: int,
+    metric: Metric = "l2",
+    max_memory_mb: float = DEDUP_MAX_MEMORY_MB,
+) -> list[list[str]]:
+    """2장 이상인 중복 그룹(id 리스트)을 큰 그룹 순으로 최대 max_groups 개."""
+    a, b = find_duplicate_edges(mat, threshold, metric, max_memory_mb)
+    if len(a) == 0:
+        return []
+    roots = connected_components(len(ids), a, b)
+    members = np.unique(np.concatenate([a, b]))
+    member_roots = roots[members]
+    order = np.argsort(member_roots, kind="stable")
+    members, member_roots = members[order], member_roots[order]
+    splits = np.nonzero(np.diff(member_roots))[0] + 1
+    groups = [ids[g].tolist() for g in np.split(members, splits) if len(g) >= 2]
+    groups.sort(key=lambda g: -len(g))
+    return groups[:max_groups]
+
+
+def find_duplicate_groups(table, threshold: float, max_groups: int, max_memory_mb: float = DEDUP_MAX_MEMORY_MB):
+    ids, mat = load_vector_matrix(table)
+    return group_duplicates(ids, mat, threshold, max_groups, "l2", max_memory_mb)
+
+
+def _legacy_find_groups(table, ids: np.ndarray, mat: np.ndarray, threshold: float) -> list[list[str]]:
+    """기존 구현 (이미지마다 ANN 질의 limit 40) — 벤치마크 비교용."""
+    parent: dict[str, str] = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for vid, vec in zip(ids, mat):
+        safe_id = str(vid).replace("'", "''")
+        near = table.search(vec.tolist()).where(f"id != '{safe_id}'").limit(40).to_list()
+        for r in near:
+            if r["_distance"] < threshold:
+                ra, rb = find(str(vid)), find(str(r["id"]))
+                if ra != rb:
+                    parent[ra] = rb
+    groups: dict[str, list[str]] = {}
+    for x in list(parent):
+        groups.setdefault(find(x), []).append(x)
+    return [g for g in groups.values() if len(g) >= 2]
+
+
+def _bench(n: int, dup_ratio: float, threshold: float, max_memory_mb: float) -> None:
+    import tempfile
+
+    import lancedb
+
+    from schema import ImageRow
+
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(n, VECTOR_DIM)).astype(np.float32) * 0.5
+    n_dup = int(n * dup_ratio)
+    src = rng.integers(0, n - n_dup, size=n_dup)
+    base[n - n_dup:] = base[src] + rng.normal(scale=0.005, size=(n_dup, VECTOR_DIM)).astype(np.float32)
+    ids = np.asarray([str(1_700_000_000_000 + i) for i in range(n)], dtype=object)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = lancedb.connect(tmp)
+        rows = [{
+            "id": i, "filename": f"{i}.png", "thumbnail": f"{i}.webp", "originalName": f"{i}.png",
+            "tags": [], "width": None, "height": None, "notes": "", "createdAt": "", "vector": v.tolist(), "phash": None,
+        } for i, v in zip(ids, base)]
+        table = db.create_table("images", schema=ImageRow)
+        table.add(rows)
+
+        t0 = time.perf_counter()
+        load_ids, load_mat = load_vector_matrix(table)
+        t1 = time.perf_counter()
+        new_groups = group_duplicates(load_ids, load_mat, threshold, 10**9, "l2", max_memory_mb)
+        t2 = time.perf_counter()
+        old_groups = _legacy_find_groups(table, load_ids, load_mat, threshold)
+        t3 = time.perf_counter()
+
+    norm = lambda gs: sorted(sorted(g) for g in gs)  # noqa: E731
+    print(f"images={n} planted_dups={n_dup} threshold={threshold} max_memory_mb={max_memory_mb}")
+    print(f"blocked matrix: load {t1 - t0:.2f}s + groups {t2 - t1:.2f}s -> {len(new_groups)} groups")
+    print(f"legacy per-row search: {t3 - t2:.2f}s -> {len(old_groups)} groups")
+    print(f"speedup: {(t3 - t2) / max(t2 - t0, 1e-9):.1f}x, identical groups: {norm(new_groups) == norm(old_groups)}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="중복 탐색 엔진 벤치마크")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--n", type=int, default=5000)
+    parser.add_argument("--dup-ratio", type=float, default=0.05)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--max-memory-mb", type=float, default=DEDUP_MAX_MEMORY_MB)
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.n, args.dup_ratio, args.threshold, args.max_memory_mb)
+    else:
+        parser.print_help()
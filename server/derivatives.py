@@ -0,0 +1,99 @@
+# server/derivatives.py — 썸네일 등 축소 파생 이미지를 한 번의 디코딩으로 여러 크기 생성
+# 가장 큰 크기는 원본에서 Image.reduce(정수 배 박스 축소)로 먼저 줄인 뒤 LANCZOS 로 맞추고,
+# 작은 크기는 바로 위 크기 결과에서 이어 줄입니다. 알파는 첫 축소 후 한 번만 흰 배경에 합성하고,
+# WebP 인코딩은 크기별로 스레드에서 동시에 수행합니다 (Pillow 인코더는 GIL 을 놓음).
+#
+# 파일 이름: 기본 크기(THUMB_MAX_SIZE)는 행의 thumbnail 값 그대로 ({id}.webp), 나머지는 {id}_{크기}.webp
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+from PIL import Image
+
+from image_loader import flatten_to_rgb
+
+THUMB_MAX_SIZE = 400  # 갤러리 기본 썸네일 (행의 thumbnail 파일)
+THUMB_SIZES = tuple(sorted({int(s) for s in os.environ.get("THUMB_SIZES", "200,400,1200").split(",") if s.strip()}
+                           | {THUMB_MAX_SIZE}))
+THUMB_WEBP_QUALITY = 75
+REDUCING_GAP = 2.0  # reduce 후 최종 리샘플 전 남겨 둘 배율 (Pillow thumbnail 의 reducing_gap 과 같은 의미)
+
+_pool = ThreadPoolExecutor(max_workers=max(2, len(THUMB_SIZES)), thread_name_prefix="derivatives")
+
+
+def derivative_path(thumb_path: Path, size: int) -> Path:
+    """기본 썸네일 경로 → size 크기 파생 이미지 경로."""
+    if size == THUMB_MAX_SIZE:
+        return thumb_path
+    return thumb_path.with_name(f"{thumb_path.stem}_{size}{thumb_path.suffix}")
+
+
+def remove_derivatives(thumb_path: Path) -> list[Path]:
+    """기본 썸네일(thumb_path) 외 크기별 파생 이미지 삭제. 없는 파일은 무시하고, 지운 경로 반환."""
+    removed = []
+    for size in THUMB_SIZES:
+        path = derivative_path(thumb_path, size)
+        if path == thumb_path:
+            continue
+        try:
+            path.unlink()
+            removed.append(path)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _to_image(src: Union[Image.Image, np.ndarray]) -> Image.Image:
+    if isinstance(src, Image.Image):
+        return src
+    arr = np.ascontiguousarray(src)
+    if arr.ndim == 2:
+        return Image.fromarray(arr, "L")
+    return Image.fromarray(arr, "RGBA" if arr.shape[2] == 4 else "RGB")
+
+
+def shrink(img: Image.Image, max_size: int) -> Image.Image:
+    """긴 변이 max_size 이하가 되도록 축소: 정수 배 reduce 로 먼저 줄이고 LANCZOS 로 마무리. 작으면 그대로."""
+    w, h = img.size
+    if max(w, h) <= max_size:
+        return img
+    scale = max_size / max(w, h)
+    target = (max(1, round(w * scale)), max(1, round(h * scale)))
+    factor = int(max(w, h) / (max_size * REDUCING_GAP))
+    if factor > 1:
+        img = img.reduce(factor)
+    return img.resize(target, Image.Resampling.LANCZOS)
+
+
+def _save(img: Image.Image, path: Path, quality: int) -> Path:
+    tmp = path.with_name(path.name + ".tmp")
+    img.save(tmp, "WEBP", quality=quality)
+    os.replace(tmp, path)
+    return path
+
+
+def make_derivatives(src: Union[Image.Image, np.ndarray], thumb_path: Path,
+                     sizes: tuple[int, ...] = THUMB_SIZES, quality: int = THUMB_WEBP_QUALITY) -> dict[int, Image.Image]:
+    """이미지(PIL 또는 RGB/RGBA 배열)에서 sizes 크기 WebP 파생 이미지를 모두 저장.
+
+    크기 → 저장한 RGB 이미지 반환 (가장 큰 것을 pHash·미리보기 등에 재사용 가능).
+    """
+    img = _to_image(src)
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = img.convert("RGBA")  # 팔레트·1비트 등은 reduce/LANCZOS 불가
+    thumb_path.parent.mkdir(parents=True, exist_ok=True)
+    out: dict[int, Image.Image] = {}
+    current = img
+    for size in sorted(sizes, reverse=True):
+        current = shrink(current, size)
+        if not out:
+            current = flatten_to_rgb(current)  # 가장 큰 크기로 줄인 뒤 한 번만
+        out[size] = current
+    futures = [_pool.submit(_save, im, derivative_path(thumb_path, size), quality) for size, im in out.items()]
+    for f in futures:
+        f.result()
+    return out
+
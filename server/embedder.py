@@ -1,42 +1,221 @@
 # server/embedder.py — CLIP 이미지 임베딩 (유사 이미지 검색용)
+# 동시에 들어온 인코딩 요청은 마이크로 배칭 큐에서 모아 model.encode 한 번으로 처리합니다.
 import asyncio
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from sentence_transformers import SentenceTransformer
+import onnx_backend
+from image_loader import CLIP_DECODE_SIDE, load_rgb
+from model_registry import registry
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 # CLIP ViT-B/32 → 512차원 (schema.VECTOR_DIM과 일치) (VECTOR_DIM과 일치)
 CLIP_MODEL_ID = "clip-ViT-B-32"
+# CLIP_MODEL_ID 이미지 벡터 공간에 맞춰 학습된 다국어 텍스트 인코더 (한국어 검색어 지원)
+CLIP_TEXT_MODEL_ID = os.environ.get("CLIP_TEXT_MODEL_ID", "clip-ViT-B-32-multilingual-v1")
+TEXT_QUERY_CACHE_SIZE = 256
+
+# 마이크로 배칭 튜닝값 (환경 변수로 덮어쓰기 가능)
+# - 배치 크기↑/대기 시간↑: 처리량 우선, 배치 크기↓/대기 시간↓: 지연 우선
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "16"))
+EMBED_BATCH_WAIT_MS = float(os.environ.get("EMBED_BATCH_WAIT_MS", "20"))
+EMBED_QUEUE_MAXSIZE = int(os.environ.get("EMBED_QUEUE_MAXSIZE", "256"))
+
+_text_cache: "OrderedDict[str, list[float]]" = OrderedDict()
+
+
+def _load_image_model():
+    """INFERENCE_BACKEND=onnx 면 ONNX Runtime 인코더, 아니면 SentenceTransformer."""
+    if onnx_backend.use_onnx():
+        return onnx_backend.OnnxClipImageEncoder(CLIP_MODEL_ID)
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(CLIP_MODEL_ID)
 
-_image_model: Optional[SentenceTransformer] = None
-_model_lock: Optional[asyncio.Lock] = None
 
+def _load_text_model():
+    from sentence_transformers import SentenceTransformer
 
-def _get_lock() -> asyncio.Lock:
-    global _model_lock
-    if _model_lock is None:
-        _model_lock = asyncio.Lock()
-    return _model_lock
+    return SentenceTransformer(CLIP_TEXT_MODEL_ID)
 
 
-async def get_image_model() -> SentenceTransformer:
-    global _image_model
-    lock = _get_lock()
-    async with lock:
-        if _image_model is None:
-            _image_model = await asyncio.to_thread(SentenceTransformer, CLIP_MODEL_ID)
-    return _image_model
+registry.register("clip_image", _load_image_model, idle_timeout=None, size_hint_mb=600)
+# 텍스트 모델이 이미지 모델과 같으면(PyTorch 백엔드) 같은 인스턴스를 공유
+if CLIP_TEXT_MODEL_ID == CLIP_MODEL_ID and not onnx_backend.use_onnx():
+    TEXT_MODEL_NAME = "clip_image"
+else:
+    TEXT_MODEL_NAME = "clip_text"
+    registry.register("clip_text", _load_text_model, idle_timeout=600, size_hint_mb=600)
 
 
-def _encode_path_sync(path: Path, model: SentenceTransformer) -> list[float]:
-    from PIL import Image
+def _to_list(vec) -> list[float]:
+    if hasattr(vec, "tolist"):
+        return vec.tolist()
+    return list(vec)
 
+
+def _load_rgb(path: Path):
+    """CLIP 입력 해상도에 맞춰 축소 디코딩한 RGB (image_loader). 실패 시 None."""
+    try:
+        return load_rgb(path, CLIP_DECODE_SIDE)
+    except Exception:
+        return None
+
+
+def _encode_path_sync(path: Path, model: "SentenceTransformer") -> list[float]:
+    img = _load_rgb(path)
+    if img is None:
+        return []
     try:
-        img = Image.open(path).convert("RGB")
-        vec = model.encode(img)
-        if hasattr(vec, "tolist"):
-            return vec.tolist()
-        return list(vec)
+        return _to_list(model.encode(img))
+    except Exception:
+        return []
+
+
+def _encode_batch_sync(images: list, model: "SentenceTransformer") -> list[list[float]]:
+    """여러 이미지를 한 번의 model.encode 로 인코딩. 실패 시 이미지별로 재시도."""
+    try:
+        vecs = model.encode(images, batch_size=len(images), show_progress_bar=False)
+        return [_to_list(v) for v in vecs]
+    except Exception:
+        out = []
+        for img in images:
+            try:
+                out.append(_to_list(model.encode(img)))
+            except Exception:
+                out.append([])
+        return out
+
+
+class EmbedBatcher:
+    """CLIP 인코딩 요청을 모아 배치로 처리하는 비동기 큐.
+
+    max_batch_size 개가 모이거나 첫 요청 후 max_wait_ms 가 지나면 한 번에 인코딩하고
+    각 호출자의 future 를 결과로 완료합니다. 큐가 max_queue 만큼 차면 submit 이 대기합니다.
+    max_batch_size·max_wait_ms 는 워커가 다음 배치를 모을 때 다시 읽으므로 실행 중에 바꿔도 됩니다.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float, max_queue: int):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(0, max_queue))
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, image) -> list[float]:
+        """PIL 이미지 한 장을 큐에 넣고 벡터를 기다림."""
+        if self._closed:
+            return await get_batcher().submit(image)
+        self._ensure_worker()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, fut))
+        return await fut
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def close(self) -> None:
+        """새 요청은 받지 않고, 이미 큐에 있는 요청을 모두 처리한 뒤 워커 종료 (큐 크기 변경 시)."""
+        self._closed = True
+        try:
+            self._queue.put_nowait(None)  # 빈 큐에서 대기 중인 워커 깨우기
+        except asyncio.QueueFull:
+            pass  # 꽉 차 있으면 워커가 비울 때까지 돌다가 종료
+
+    async def _run(self) -> None:
+        while not (self._closed and self._queue.empty()):
+            batch = [item for item in await self._collect() if item is not None]
+            pending = [(img, fut) for img, fut in batch if not fut.cancelled()]
+            if not pending:
+                continue
+            try:
+                async with registry.use("clip_image") as model:
+                    vecs = await asyncio.to_thread(_encode_batch_sync, [img for img, _ in pending], model)
+            except BaseException as e:
+                # 취소(서버 종료)여도 이 배치를 기다리는 호출자는 반드시 깨움
+                for _, fut in pending:
+                    if not fut.done():
+                        fut.set_exception(e if isinstance(e, Exception) else RuntimeError("Embedding worker stopped"))
+                if not isinstance(e, Exception):
+                    raise
+                continue
+            self.batches += 1
+            self.items += len(pending)
+            for (_, fut), vec in zip(pending, vecs):
+                if not fut.done():
+                    fut.set_result(vec)
+
+    def stats(self) -> dict:
+        return {
+            "maxBatchSize": self.max_batch_size,
+            "maxWaitMs": self.max_wait_ms,
+            "queueDepth": self._queue.qsize(),
+            "maxQueue": self._queue.maxsize,
+            "batches": self.batches,
+            "items": self.items,
+        }
+
+
+_batcher: Optional[EmbedBatcher] = None
+
+
+def get_batcher() -> EmbedBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = EmbedBatcher(EMBED_BATCH_SIZE, EMBED_BATCH_WAIT_MS, EMBED_QUEUE_MAXSIZE)
+    return _batcher
+
+
+def configure_batching(
+    batch_size: Optional[int] = None,
+    wait_ms: Optional[float] = None,
+    queue_maxsize: Optional[int] = None,
+) -> dict:
+    """배칭 파라미터 변경. 이벤트 루프에서 호출.
+
+    배치 크기·대기 시간은 워커가 다음 배치부터 바로 반영. 큐 크기를 바꾸면 새 배처를 만들고,
+    기존 배처는 이미 받은 요청을 모두 처리한 뒤 끝남 (처리 중인 배치를 끊지 않음).
+    """
+    global EMBED_BATCH_SIZE, EMBED_BATCH_WAIT_MS, EMBED_QUEUE_MAXSIZE, _batcher
+    if batch_size is not None:
+        EMBED_BATCH_SIZE = max(1, int(batch_size))
+    if wait_ms is not None:
+        EMBED_BATCH_WAIT_MS = max(0.0, float(wait_ms))
+    if queue_maxsize is not None:
+        EMBED_QUEUE_MAXSIZE = max(0, int(queue_maxsize))
+    if _batcher is not None:
+        _batcher.max_batch_size = EMBED_BATCH_SIZE
+        _batcher.max_wait_ms = EMBED_BATCH_WAIT_MS
+        if queue_maxsize is not None and _batcher._queue.maxsize != EMBED_QUEUE_MAXSIZE:
+            _batcher.close()
+            _batcher = None
+    return get_batcher().stats()
+
+
+async def encode_image(image) -> list[float]:
+    """PIL 이미지 → 512차원 벡터 (배칭 큐 경유). 실패 시 빈 리스트."""
+    try:
+        return await get_batcher().submit(image)
     except Exception:
         return []
 
@@ -45,6 +224,27 @@ async def encode_image_path(image_path: Path) -> list[float]:
     """이미지 경로 → 512차원 벡터. 실패 시 빈 리스트."""
     if not image_path.exists():
         return []
-    model = await get_image_model()
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, _encode_path_sync, image_path, model)
+    img = await asyncio.to_thread(_load_rgb, image_path)
+    if img is None:
+        return []
+    return await encode_image(img)
+
+
+async def encode_text(text: str) -> list[float]:
+    """검색어 → CLIP 이미지 공간의 512차원 벡터 (LRU 캐시). 실패 시 빈 리스트."""
+    key = text.strip()
+    if not key:
+        return []
+    cached = _text_cache.get(key)
+    if cached is not None:
+        _text_cache.move_to_end(key)
+        return cached
+    try:
+        async with registry.use(TEXT_MODEL_NAME) as model:
+            vec = _to_list(await asyncio.to_thread(model.encode, key))
+    except Exception:
+        return []
+    _text_cache[key] = vec
+    while len(_text_cache) > TEXT_QUERY_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return vec
@@ -0,0 +1,139 @@
+# server/image_loader.py — 모델 입력용 축소 디코딩 (CLIP 224, WD14 448, 썸네일)
+# 모델은 어차피 224·448 로 줄여 쓰므로 원본 해상도로 디코딩하지 않습니다.
+#   JPEG : draft 모드로 디코더가 DCT 단계에서 1/2·1/4·1/8 로 줄여 디코딩
+#   그 외: 디코딩 후 Image.reduce(정수 배 박스 축소)로 먼저 줄임
+# 어느 쪽이든 짧은 변은 요청한 min_side 이상으로 남기고 (최종 리샘플은 모델 전처리기가),
+# EXIF 회전과 알파(흰 배경 합성)는 모든 경로에서 같은 방식으로 처리합니다.
+#
+# 벤치마크: python server/image_loader.py --bench [--dir public/uploads] [--n 20]
+
+import io
+from pathlib import Path
+from typing import Union
+
+from PIL import Image
+
+REDUCING_GAP = 2.0  # 모델 입력 크기 대비 디코딩 해상도 여유 (Pillow thumbnail 의 reducing_gap 과 같은 의미)
+CLIP_INPUT_SIZE = 224
+TAGGER_INPUT_SIZE = 448
+CLIP_DECODE_SIDE = int(CLIP_INPUT_SIZE * REDUCING_GAP)
+TAGGER_DECODE_SIDE = int(TAGGER_INPUT_SIZE * REDUCING_GAP)
+
+# EXIF Orientation(0x0112) → 바로 세우는 변환 (ImageOps.exif_transpose 와 같은 표)
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+ImageSource = Union[str, Path, bytes, Image.Image]
+
+
+def flatten_to_rgb(img: Image.Image) -> Image.Image:
+    """알파(투명도 포함 팔레트 포함)를 흰 배경에 합성한 RGB. 알파가 없으면 RGB 변환만."""
+    if img.mode == "P" and "transparency" in img.info:
+        img = img.convert("RGBA")
+    if img.mode in ("RGBA", "LA", "PA", "RGBa", "La"):
+        img = img.convert("RGBA")
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img, mask=img.getchannel("A"))
+        return bg
+    return img if img.mode == "RGB" else img.convert("RGB")
+
+
+def _open(src: ImageSource) -> Image.Image:
+    if isinstance(src, Image.Image):
+        return src
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(src))
+    return Image.open(src)
+
+
+def decode_reduced(src: ImageSource, min_side: int) -> tuple[tuple[int, int], Image.Image]:
+    """짧은 변이 min_side 이상인 범위에서 가장 작게 디코딩한 RGB 이미지.
+
+    반환: (파일에 기록된 원본 크기 (회전 전), EXIF 회전·알파 합성을 적용한 RGB 이미지). 실패 시 예외.
+    """
+    img = _open(src)
+    size = img.size
+    orientation = img.getexif().get(0x0112, 1)
+    if img.format == "JPEG":
+        img.draft("RGB", (min_side, min_side))  # 두 변 모두 min_side 이상이 되는 가장 큰 1/2^n 축소
+    img.load()
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = flatten_to_rgb(img)  # 팔레트·CMYK·16비트 등은 reduce 불가 → 먼저 RGB 로
+    factor = min(img.size) // min_side if min_side > 0 else 1
+    if factor > 1:
+        img = img.reduce(factor)
+    transpose = _ORIENTATION_TRANSPOSE.get(orientation)
+    if transpose is not None:
+        img = img.transpose(transpose)
+    return size, flatten_to_rgb(img)
+
+
+def load_rgb(src: ImageSource, min_side: int) -> Image.Image:
+    """decode_reduced 의 이미지만. 실패 시 예외."""
+    return decode_reduced(src, min_side)[1]
+
+
+def _bench(image_dir: Path, n: int, size: str) -> None:
+    import tempfile
+    import time
+
+    paths = sorted(p for p in image_dir.iterdir() if p.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp"))[:n] \
+        if image_dir.is_dir() else []
+    tmp = None
+    if not paths:
+        import numpy as np
+
+        w, h = (int(v) for v in size.lower().split("x"))
+        tmp = tempfile.TemporaryDirectory()
+        # 사진에 가까운 부드러운 그라데이션 + 잡음 (순수 잡음은 JPEG 디코딩이 비정상적으로 느림)
+        yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+        base = np.stack([xx / w * 255, yy / h * 255, (xx + yy) / (w + h) * 255], axis=-1)
+        arr = np.clip(base + np.random.default_rng(0).normal(0, 8, base.shape), 0, 255).astype(np.uint8)
+        paths = [Path(tmp.name) / "synthetic.jpg", Path(tmp.name) / "synthetic.png"]
+        Image.fromarray(arr).save(paths[0], quality=90)
+        Image.fromarray(arr).save(paths[1], compress_level=1)
+        print(f"No images in {image_dir}; using synthetic {w}x{h} JPEG/PNG")
+
+    def full(p: Path) -> Image.Image:
+        with Image.open(p) as img:
+            return img.convert("RGB")
+
+    cases = [("full decode + convert", full),
+             (f"reduced (CLIP, >= {CLIP_DECODE_SIDE})", lambda p: load_rgb(p, CLIP_DECODE_SIDE)),
+             (f"reduced (WD14, >= {TAGGER_DECODE_SIDE})", lambda p: load_rgb(p, TAGGER_DECODE_SIDE))]
+    print(f"images={len(paths)}")
+    for p in paths:
+        with Image.open(p) as probe:
+            print(f"{p.name} ({probe.format} {probe.size[0]}x{probe.size[1]})")
+        for label, fn in cases:
+            fn(p)  # 워밍업 (파일 캐시)
+            started = time.perf_counter()
+            repeat = 3
+            for _ in range(repeat):
+                out = fn(p)
+            ms = (time.perf_counter() - started) / repeat * 1000
+            print(f"  {label:<28} {ms:8.1f} ms/img  -> {out.size[0]}x{out.size[1]}")
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="모델 입력용 축소 디코딩 벤치마크 (이미지당 디코딩 시간)")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--dir", type=Path, default=Path(__file__).resolve().parent.parent / "public" / "uploads")
+    parser.add_argument("--n", type=int, default=20)
+    parser.add_argument("--size", default="6000x4000", help="이미지가 없을 때 만들 합성 이미지 크기 (WxH)")
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.dir, args.n, args.size)
+    else:
+        parser.print_help()
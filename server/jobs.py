@@ -0,0 +1,312 @@
+# server/jobs.py — 무거운 이미지 작업(업스케일·변환·누끼·백필)용 프로세스 내 작업 큐
+# 작업은 data/jobs.sqlite3 의 jobs 테이블에 기록되고, 요청은 jobId 만 받아 바로 돌아갑니다.
+# 종류(kind)별 동시 실행 수 제한과 우선순위(클수록 먼저)가 있으며, 진행률·결과·오류는 /jobs/{id} 로 조회합니다.
+# 취소는 협조적입니다: 대기 중이면 즉시 취소되고, 실행 중이면 핸들러가 ctx.progress()/ctx.check() 를 부를 때 멈춥니다.
+# 서버 재시작 시 대기 중이던 작업은 다시 큐에 넣고, 실행 중이던 작업은 중단(failed)으로 표시합니다.
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+JOBS_DB_PATH = PROJECT_ROOT / "data" / "jobs.sqlite3"
+
+# 종류별 동시 실행 수 (JOB_CONCURRENCY="upscale=1,convert=2" 처럼 덮어쓰기)
+DEFAULT_CONCURRENCY = {"upscale": 1, "convert": 2, "convert-batch": 1, "remove-bg": 1, "backfill-embeddings": 1}
+JOB_RETENTION_DAYS = 7  # 끝난 작업 기록 보관 기간
+PROGRESS_WRITE_INTERVAL = 1.0  # 진행률을 DB 에 쓰는 최소 간격 (초). 메모리 상태는 매번 갱신
+
+ACTIVE_STATES = ("queued", "running")
+FINAL_STATES = ("succeeded", "failed", "cancelled")
+
+_COLUMNS = ("id", "kind", "status", "priority", "params", "progress", "detail", "result", "error",
+            "createdAt", "startedAt", "finishedAt")
+_JSON_COLUMNS = ("params", "detail", "result")
+
+
+class JobError(Exception):
+    """핸들러가 사용자에게 보여 줄 실패 사유와 함께 작업을 끝낼 때."""
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _parse_concurrency(spec: str) -> dict[str, int]:
+    out: dict[str, int] = {}
+    for part in spec.split(","):
+        kind, _, n = part.partition("=")
+        if kind.strip() and n.strip().isdigit():
+            out[kind.strip()] = max(1, int(n))
+    return out
+
+
+class JobContext:
+    """핸들러에 넘기는 작업 핸들. progress()/check() 는 워커 스레드에서도 호출 가능."""
+
+    def __init__(self, queue: "JobQueue", job_id: str):
+        self._queue = queue
+        self.id = job_id
+        self.cancelled = threading.Event()
+        self._last_write = 0.0
+
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+    def progress(self, fraction: Optional[float] = None, **detail) -> None:
+        """진행률(0~1, 모르면 None)과 부가 정보 갱신. 취소 요청이 있으면 JobCancelled."""
+        self.check()
+        now = time.monotonic()
+        write = now - self._last_write >= PROGRESS_WRITE_INTERVAL
+        if write:
+            self._last_write = now
+        self._queue._set_progress(self.id, fraction, detail, write)
+
+
+Handler = Callable[[JobContext, dict], Awaitable[Any]]
+
+
+class JobQueue:
+    """kind → (핸들러, 동시 실행 수). 예약·실행은 이벤트 루프에서, DB 접근은 잠금으로 직렬화."""
+
+    def __init__(self, db_path: Path = JOBS_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._handlers: dict[str, tuple[Handler, int, int]] = {}
+        self._pending: list[tuple[int, int, str, str]] = []  # (-priority, 순번, kind, id)
+        self._seq = itertools.count()
+        self._running: dict[str, int] = {}
+        self._contexts: dict[str, JobContext] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._live: dict[str, dict] = {}  # 실행 중 작업의 최신 진행률 (DB 쓰기 간격 사이 조회용)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        overrides = _parse_concurrency(os.environ.get("JOB_CONCURRENCY", ""))
+        self._concurrency = {**DEFAULT_CONCURRENCY, **overrides}
+
+    # ── DB ──
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, priority INTEGER NOT NULL,"
+                " params TEXT, progress REAL, detail TEXT, result TEXT, error TEXT,"
+                " createdAt TEXT NOT NULL, startedAt TEXT, finishedAt TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, kind)")
+            self._db = db
+        return self._db
+
+    def _update(self, job_id: str, **fields) -> None:
+        for key in _JSON_COLUMNS:
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key], ensure_ascii=False)
+        sets = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._conn().execute(f"UPDATE jobs SET {sets} WHERE id = ?", (*fields.values(), job_id))
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> dict:
+        job = {k: row[k] for k in _COLUMNS}
+        for key in _JSON_COLUMNS:
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+    # ── 등록·시작 ──
+
+    def register(self, kind: str, handler: Handler, concurrency: Optional[int] = None, priority: int = 0) -> None:
+        """kind 작업의 핸들러 등록. priority 는 submit 에서 생략했을 때의 기본 우선순위."""
+        limit = concurrency or self._concurrency.get(kind, 1)
+        self._handlers[kind] = (handler, max(1, limit), priority)
+        self._running.setdefault(kind, 0)
+
+    def start(self) -> None:
+        """이벤트 루프에서 한 번 호출. 오래된 기록 정리, 중단된 작업 표시, 대기 작업 재등록."""
+        self._loop = asyncio.get_running_loop()
+        cutoff = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() - JOB_RETENTION_DAYS * 86400))
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM jobs WHERE status IN (?, ?, ?) AND finishedAt < ?", (*FINAL_STATES, cutoff))
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Interrupted by server restart', finishedAt = ?"
+                " WHERE status = 'running'", (_now(),)
+            )
+            queued = db.execute("SELECT id, kind, priority FROM jobs WHERE status = 'queued' ORDER BY createdAt").fetchall()
+        for row in queued:
+            if row["kind"] in self._handlers:
+                heapq.heappush(self._pending, (-row["priority"], next(self._seq), row["kind"], row["id"]))
+            else:
+                self._update(row["id"], status="failed", error=f"Unknown job kind: {row['kind']}", finishedAt=_now())
+        if queued:
+            print(f"[jobs] resumed {len(queued)} queued job(s)")
+        self._dispatch()
+
+    # ── 제출·조회·취소 ──
+
+    def submit(self, kind: str, params: dict, priority: Optional[int] = None) -> dict:
+        """작업을 큐에 넣고 작업 기록 반환. 이벤트 루프에서 호출."""
+        if kind not in self._handlers:
+            raise KeyError(f"Unknown job kind: {kind}")
+        if priority is None:
+            priority = self._handlers[kind][2]
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn().execute(
+                "INSERT INTO jobs (id, kind, status, priority, params, createdAt) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, priority, json.dumps(params, ensure_ascii=False), _now()),
+            )
+        heapq.heappush(self._pending, (-priority, next(self._seq), kind, job_id))
+        self._dispatch()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            live = dict(self._live.get(job_id, {}))
+        if row is None:
+            return None
+        job = self._row_to_job(row)
+        if job["status"] == "running" and live:
+            job.update(live)
+        return job
+
+    def list_jobs(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> list[dict]:
+        where, args = [], []
+        if status:
+            where.append("status = ?")
+            args.append(status)
+        if kind:
+            where.append("kind = ?")
+            args.append(kind)
+        sql = "SELECT * FROM jobs" + (f" WHERE {' AND '.join(where)}" if where else "")
+        sql += " ORDER BY createdAt DESC, rowid DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn().execute(sql, (*args, limit)).fetchall()
+            live = {k: dict(v) for k, v in self._live.items()}
+        jobs = [self._row_to_job(r) for r in rows]
+        for job in jobs:
+            if job["status"] == "running" and job["id"] in live:
+                job.update(live[job["id"]])
+        return jobs
+
+    def active(self, kind: str) -> Optional[dict]:
+        """kind 의 대기·실행 중 작업 중 가장 먼저 제출된 것 (없으면 None)."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT id FROM jobs WHERE kind = ? AND status IN (?, ?) ORDER BY createdAt, rowid LIMIT 1",
+                (kind, *ACTIVE_STATES),
+            ).fetchone()
+        return self.get(row["id"]) if row is not None else None
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """대기 중이면 바로 취소, 실행 중이면 취소 요청만 표시 (핸들러가 다음 진행 보고 때 멈춤). 이벤트 루프에서 호출.
+
+        대기 → 취소 전환은 status='queued' 조건부 UPDATE 로 해서, 그 사이 _dispatch 가 시작시킨 작업을 덮어쓰지 않음.
+        """
+        with self._lock:
+            cur = self._conn().execute(
+                "UPDATE jobs SET status = 'cancelled', finishedAt = ? WHERE id = ? AND status = 'queued'",
+                (_now(), job_id),
+            )
+            cancelled_queued = cur.rowcount == 1
+        if not cancelled_queued:
+            ctx = self._contexts.get(job_id)
+            if ctx is not None:
+                ctx.cancelled.set()
+        return self.get(job_id)
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        """kind → {queued, running}."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT kind, status, COUNT(*) AS n FROM jobs WHERE status IN (?, ?) GROUP BY kind, status",
+                ACTIVE_STATES,
+            ).fetchall()
+        out: dict[str, dict[str, int]] = {}
+        for row in rows:
+            out.setdefault(row["kind"], {"queued": 0, "running": 0})[row["status"]] = row["n"]
+        return out
+
+    # ── 실행 ──
+
+    def _set_progress(self, job_id: str, fraction: Optional[float], detail: dict, write: bool) -> None:
+        fields = {"progress": None if fraction is None else round(max(0.0, min(1.0, fraction)), 4),
+                  "detail": detail or None}
+        with self._lock:
+            self._live[job_id] = fields
+        if write:
+            self._update(job_id, **fields)
+
+    def _dispatch(self) -> None:
+        """동시 실행 한도 안에서 우선순위 순으로 대기 작업 시작."""
+        if self._loop is None:
+            return
+        deferred = []
+        while self._pending:
+            entry = heapq.heappop(self._pending)
+            _, _, kind, job_id = entry
+            handler, limit, _ = self._handlers[kind]
+            if self._running[kind] >= limit:
+                deferred.append(entry)
+                continue
+            with self._lock:
+                # 대기 중일 때만 실행으로 전환 (cancel 의 조건부 UPDATE 와 둘 중 하나만 성공)
+                db = self._conn()
+                cur = db.execute(
+                    "UPDATE jobs SET status = 'running', startedAt = ? WHERE id = ? AND status = 'queued'",
+                    (_now(), job_id),
+                )
+                row = db.execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone() if cur.rowcount == 1 else None
+            if row is None:  # 그새 취소됨
+                continue
+            self._running[kind] += 1
+            ctx = self._contexts[job_id] = JobContext(self, job_id)
+            task = self._loop.create_task(self._run(kind, handler, ctx, json.loads(row["params"] or "{}")))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        for entry in deferred:
+            heapq.heappush(self._pending, entry)
+
+    async def _run(self, kind: str, handler: Handler, ctx: JobContext, params: dict) -> None:
+        started = time.perf_counter()
+        try:
+            result = await handler(ctx, params)
+            self._update(ctx.id, status="succeeded", progress=1.0, result=result, finishedAt=_now())
+            outcome = "succeeded"
+        except JobCancelled:
+            self._update(ctx.id, status="cancelled", finishedAt=_now())
+            outcome = "cancelled"
+        except Exception as e:
+            if not isinstance(e, JobError):
+                traceback.print_exc()
+            self._update(ctx.id, status="failed", error=str(e) or type(e).__name__, finishedAt=_now())
+            outcome = "failed"
+        finally:
+            self._running[kind] -= 1
+            self._contexts.pop(ctx.id, None)
+            with self._lock:
+                self._live.pop(ctx.id, None)
+            self._dispatch()
+        print(f"[jobs] {kind} {ctx.id} {outcome} in {time.perf_counter() - started:.1f}s")
+
+
+queue = JobQueue()
@@ -0,0 +1,155 @@
+# server/listing.py — /images 목록 조회 (keyset 페이지네이션, 컬럼 프로젝션, 버전 기반 변경분)
+# id 정렬 순서는 테이블 버전별로 id 컬럼만 읽어 캐시하고, 페이지 행은 id IN (...) 조건과 프로젝션으로 가져옵니다.
+
+import threading
+from bisect import bisect_left
+from typing import Optional
+
+from db import scan_batches
+from schema import PUBLIC_COLUMNS
+
+# vector·phash 를 제외한 목록 기본 컬럼
+LIST_COLUMNS = list(PUBLIC_COLUMNS)
+# id IN (...) 조건 하나에 넣는 최대 id 수
+FETCH_CHUNK = 500
+
+_order_lock = threading.Lock()
+_order_cache: dict = {"version": None, "ids": None, "keys": None}
+
+
+class VersionGone(Exception):
+    """since 로 받은 테이블 버전이 없음 (정리됐거나 알 수 없는 버전) → 전체 목록을 다시 받아야 함."""
+
+
+def _id_key(value) -> tuple[bool, int, str]:
+    """정렬 키. 숫자 id(타임스탬프)는 값 순, 숫자가 아닌 id 는 그보다 뒤(오래된 쪽)에 문자열 순. 서로 다른 id 는 키도 다름."""
+    s = str(value)
+    try:
+        return True, int(s), s
+    except ValueError:
+        return False, 0, s
+
+
+def _sorted_ids(table) -> tuple[list[str], list[tuple]]:
+    """(최신순 id 목록, 오름차순 정렬 키 목록). 테이블 버전이 바뀔 때만 id 컬럼을 다시 읽음."""
+    version = table.version
+    with _order_lock:
+        if _order_cache["version"] == version and _order_cache["ids"] is not None:
+            return _order_cache["ids"], _order_cache["keys"]
+    ids: list[str] = []
+    for batch in scan_batches(table, ["id"], 8192):
+        ids.extend(str(x) for x in batch.column("id").to_pylist() if x is not None)
+    ids.sort(key=_id_key, reverse=True)
+    asc_keys = [_id_key(x) for x in reversed(ids)]
+    with _order_lock:
+        _order_cache.update({"version": version, "ids": ids, "keys": asc_keys})
+    return ids, asc_keys
+
+
+def _in_predicate(ids) -> str:
+    quoted = ", ".join("'" + str(i).replace("'", "''") + "'" for i in ids)
+    return f"id IN ({quoted})"
+
+
+def _normalize_rows(rows: list[dict]) -> list[dict]:
+    for d in rows:
+        d.pop("_distance", None)
+        if "notes" in d and d["notes"] is None:
+            d["notes"] = ""
+        if "tags" in d and hasattr(d["tags"], "tolist"):
+            d["tags"] = d["tags"].tolist()
+    return rows
+
+
+def fetch_rows_by_ids(table, ids, columns: list[str]) -> list[dict]:
+    """ids 순서대로 행 반환 (없는 id 는 생략)."""
+    if len(ids) == 0:
+        return []
+    cols = list(dict.fromkeys(["id", *columns]))
+    by_id: dict[str, dict] = {}
+    for start in range(0, len(ids), FETCH_CHUNK):
+        chunk = ids[start:start + FETCH_CHUNK]
+        rows = table.search().where(_in_predicate(chunk)).select(cols).limit(len(chunk)).to_list()
+        by_id.update((str(r.get("id")), r) for r in _normalize_rows(rows))
+    out = []
+    for i in ids:
+        row = by_id.get(str(i))
+        if row is None:
+            continue
+        if "id" not in columns:
+            row = {k: v for k, v in row.items() if k != "id"}
+        out.append(row)
+    return out
+
+
+def resolve_columns(columns: Optional[str]) -> list[str]:
+    """쉼표 구분 컬럼 목록 → 유효 컬럼 리스트 (vector·phash 는 목록에서 제공하지 않음)."""
+    if not columns:
+        return list(LIST_COLUMNS)
+    requested = [c.strip() for c in columns.split(",") if c.strip()]
+    return [c for c in requested if c in LIST_COLUMNS] or list(LIST_COLUMNS)
+
+
+def list_all(table, columns: list[str]) -> list[dict]:
+    """전체 목록 (id 최신순). 내부 컬럼(vector·phash)은 읽지 않음."""
+    rows: list[dict] = []
+    cols = list(dict.fromkeys(["id", *columns]))
+    for batch in scan_batches(table, cols, 8192):
+        rows.extend(batch.to_pylist())
+    _normalize_rows(rows)
+    rows.sort(key=lambda x: _id_key(x.get("id")), reverse=True)
+    if "id" not in columns:
+        rows = [{k: v for k, v in r.items() if k != "id"} for r in rows]
+    return rows
+
+
+def list_page(table, limit: int, after_id: Optional[str], columns: list[str]) -> dict:
+    """id 최신순 keyset 페이지. after_id 보다 오래된(작은) id 부터 limit 개."""
+    sorted_ids, asc_keys = _sorted_ids(table)
+    start = 0
+    if after_id:
+        # after_id 보다 작은 키의 개수 = 최신순 목록에서 그 다음 위치까지 남은 개수
+        start = len(sorted_ids) - bisect_left(asc_keys, _id_key(after_id))
+    page_ids = sorted_ids[start:start + limit]
+    images = fetch_rows_by_ids(table, page_ids, columns)
+    has_more = start + limit < len(sorted_ids)
+    return {
+        "images": images,
+        "next_cursor": str(page_ids[-1]) if has_more and len(page_ids) else None,
+        "version": table.version,
+    }
+
+
+def list_changes_since(table, since_version: int, columns: list[str]) -> dict:
+    """since_version 이후 추가·수정된 행과 삭제된 id.
+
+    Lance 는 추가·수정 행을 새 fragment 에 쓰므로, 해당 버전에 없던 fragment 의 행을 변경분으로 봅니다.
+    (compaction 이후에는 전체가 변경분으로 보일 수 있음)
+    정리(cleanup)됐거나 현재보다 새로운 버전이면 VersionGone.
+    """
+    current = table.version
+    if since_version > current:
+        raise VersionGone(f"Unknown table version {since_version} (current {current})")
+    if since_version == current:
+        return {"images": [], "deleted": [], "version": current}
+    ds = table.to_lance()
+    try:
+        old = ds.checkout_version(since_version)
+    except Exception as e:
+        raise VersionGone(f"Table version {since_version} is no longer available: {e}") from e
+    old_frag_ids = {f.fragment_id for f in old.get_fragments()}
+    new_frags = [f for f in ds.get_fragments() if f.fragment_id not in old_frag_ids]
+
+    changed_ids: list[str] = []
+    for frag in new_frags:
+        for batch in frag.to_batches(columns=["id"]):
+            changed_ids.extend(str(x) for x in batch.column("id").to_pylist() if x is not None)
+
+    old_ids = {str(x) for x in old.to_table(columns=["id"]).column("id").to_pylist()}
+    new_ids = {str(x) for x in ds.to_table(columns=["id"]).column("id").to_pylist()}
+    changed_ids.sort(key=_id_key, reverse=True)
+    return {
+        "images": fetch_rows_by_ids(table, changed_ids, columns),
+        "deleted": sorted(old_ids - new_ids, key=_id_key, reverse=True),
+        "version": current,
+    }
@@ -1,6 +1,17 @@
 # server/main.py — FastAPI 백엔드 (태깅, 시맨틱 검색, LanceDB 이미지 API, 터널 URL)
 
-# basicsr + 최신 torchvision 호환성 패치 (import 전에 실행 필수)
+# python main.py 로 실행해도 serve.py 를 __main__ 으로 실행 (일괄 변환 spawn 워커가 이 파일을 다시 실행하지 않도록)
+if __name__ == "__main__":
+  import os
+  import runpy
+  runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "serve.py"), run_name="__main__")
+  raise SystemExit
+
+# 모듈별 import 시간 측정 (다른 import 보다 먼저). torch·cv2·모델 라이브러리는 처음 쓸 때 import
+import startup
+startup.install_import_timer()
+
+# basicsr + 최신 torchvision 호환성 패치 (basicsr import 전에 실행 필수 → Real-ESRGAN 로드 시 호출)
 import sys
 import importlib
 
@@ -20,84 +31,95 @@ def _patch_basicsr_torchvision():
   except Exception:
     pass
 
-_patch_basicsr_torchvision()
-
 import asyncio
-import gc
+import json
+import math
 import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, Literal
-from io import BytesIO
+from typing import Callable, Optional, Literal
 
-import torch
 from PIL import Image
-from fastapi import FastAPI, UploadFile, File, Query
+from fastapi import FastAPI, UploadFile, File, Form, Query
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer, util
-from tagger import WD14Eva02Tagger
-from tunnel import start_tunnel, get_tunnel_url
-
-from db import ensure_migrated, get_table
-from embedder import encode_image_path
+from tunnel import get_tunnel_url
+
+from db import ensure_migrated, get_table, get_image_row, id_predicate, upsert_rows
+from model_registry import registry as model_registry
+from sam_cache import SamEmbeddingCache
+from mask_codec import downscale_mask, encode_mask
+from upscale_engine import needs_streaming, upscale_file
+from jobs import JobCancelled, JobContext, JobError, queue as job_queue
+from embedder import encode_image, encode_image_path, encode_text, configure_batching, get_batcher
 from contextlib import asynccontextmanager
-from schema import VECTOR_DIM
+from schema import VECTOR_DIM, INTERNAL_COLUMNS
+from tag_vectors import TagVectorStore
+from listing import LIST_COLUMNS, VersionGone, resolve_columns, list_all, list_page, list_changes_since, fetch_rows_by_ids
+from vector_index import index_status, maybe_reindex, schedule_reindex_check, startup_check, vector_search
+from dedup import DEDUP_MAX_MEMORY_MB, find_duplicate_groups
+from tag_ops import normalize_tag, remove_tags, rename_tags
+from backfill import BACKFILL_BATCH_SIZE, run_backfill, run_phash_backfill, get_progress as get_backfill_progress
+from phash import PHashIndex, phash_image, phash_path
+from derivatives import THUMB_SIZES, make_derivatives, remove_derivatives
+from image_loader import TAGGER_DECODE_SIDE, decode_reduced
+from convert import FORMAT_EXTENSIONS, convert_file, get_pool as get_convert_pool, shutdown_pool as shutdown_convert_pool
+from tag_index import TagBitmapIndex, TagQueryError
+from tag_stats import TagStats
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 UPLOAD_DIR = PROJECT_ROOT / "public" / "uploads"
 THUMB_DIR = PROJECT_ROOT / "public" / "thumbnails"
-THUMB_MAX_SIZE = 400
-THUMB_WEBP_QUALITY = 75
+
+# 파생 이미지(변환·업스케일·누끼) 생성 시 원본에서 읽는 컬럼
+SOURCE_ROW_COLUMNS = ["id", "filename", "originalName", "tags"]
 
 # 마이그레이션 후 이미지 행 삽입용 0 벡터
 ZERO_VECTOR = [0.0] * VECTOR_DIM
 
-# WD14 태거: 업로드(/tag) 시에만 로드, 유휴 시 언로드
-_tagger: Optional[WD14Eva02Tagger] = None
-_tagger_lock: Optional[asyncio.Lock] = None
-_tagger_unload_handle: Optional[asyncio.TimerHandle] = None
+# WD14 태거: 업로드(/tag) 시에만 로드, 유휴 시 언로드 (model_registry 가 관리)
 TAGGER_IDLE_UNLOAD_SECONDS = 120
+TAGGER_BATCH_SIZE = 8
 
 
-def _get_tagger_lock() -> asyncio.Lock:
-    global _tagger_lock
-    if _tagger_lock is None:
-        _tagger_lock = asyncio.Lock()
-    return _tagger_lock
+def _load_tagger():
+  from tagger import WD14Eva02Tagger
+  return WD14Eva02Tagger()
 
 
-async def get_or_load_tagger() -> WD14Eva02Tagger:
-    global _tagger
-    lock = _get_tagger_lock()
-    async with lock:
-        if _tagger is None:
-            _tagger = await asyncio.to_thread(WD14Eva02Tagger)
-    return _tagger
+model_registry.register("tagger", _load_tagger, idle_timeout=TAGGER_IDLE_UNLOAD_SECONDS, size_hint_mb=1300)
 
 
-def _do_unload_tagger() -> None:
-    global _tagger, _tagger_unload_handle
-    _tagger = None
-    _tagger_unload_handle = None
-    gc.collect()
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
-    print("WD14 unloaded.")
+def _load_tag_indexes() -> None:
+  try:
+    tag_index.load(get_table())
+    tag_stats.load(tag_index.all_tags())
+  finally:
+    tag_writes.flush()
 
 
-def schedule_tagger_unload() -> None:
-    global _tagger_unload_handle
-    if _tagger_unload_handle is not None:
-        _tagger_unload_handle.cancel()
-    loop = asyncio.get_running_loop()
-    _tagger_unload_handle = loop.call_later(TAGGER_IDLE_UNLOAD_SECONDS, _do_unload_tagger)
+def _load_phash_index() -> None:
+  try:
+    phash_index.load(get_table())
+  finally:
+    phash_writes.flush()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    ensure_migrated()
-    yield
+  # 서버가 먼저 응답하도록 준비 작업은 백그라운드에서 (/health 의 subsystems 로 상태 확인)
+  startup.uninstall_import_timer()
+  startup.print_import_report()
+  db_ready = startup.start_subsystem("db", ensure_migrated)
+  startup.start_subsystem("tagVectors", tag_vector_store.load)
+  startup.start_subsystem("phashIndex", _load_phash_index, after=db_ready)
+  startup.start_subsystem("tagIndex", _load_tag_indexes, after=db_ready)
+  startup.start_subsystem("vectorIndex", lambda: startup_check(get_table()), after=db_ready)
+  job_queue.start()
+  yield
+  shutdown_convert_pool()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -108,7 +130,55 @@ app.add_middleware(
   allow_headers=["*"],
 )
 
-text_model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+TEXT_MODEL_ID = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def _load_text_model():
+  from sentence_transformers import SentenceTransformer
+  return SentenceTransformer(TEXT_MODEL_ID)
+
+
+model_registry.register("text", _load_text_model, idle_timeout=600, size_hint_mb=500)
+
+
+def _encode_texts(texts: list[str]):
+  with model_registry.acquire("text") as text_model:
+    return text_model.encode(texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False)
+
+
+# 지각 해시 해밍 거리 인덱스 (정확·재인코딩 중복 탐지)
+phash_index = PHashIndex()
+# 태그 → 행 번호 비트맵 역색인 (/query)
+tag_index = TagBitmapIndex()
+# 태그별 이미지 수·동시 출현 수 (/tags). tag_index 변경분으로 증분 갱신
+tag_stats = TagStats()
+# 색인 로드 중 들어온 쓰기는 로드가 끝난 뒤 적용 (load() 가 상태를 새로 만들기 때문)
+phash_writes = startup.WriteBuffer()
+tag_writes = startup.WriteBuffer()
+
+
+def _index_added_row(row: dict) -> None:
+  """새로 추가된 행을 메모리 색인(pHash·태그·태그 통계)에 반영."""
+  phash_writes.run(lambda: phash_index.add(row["id"], row.get("phash")))
+  tag_writes.run(lambda: tag_stats.apply(*tag_index.set_tags(row["id"], row.get("tags"))))
+
+
+def _not_ready(*names: str) -> Optional[JSONResponse]:
+  """names 서브시스템 중 아직 준비되지 않은 것이 있으면 503 (부분 결과를 완전한 결과처럼 돌려주지 않도록)."""
+  pending = {name: startup.state(name) for name in names if startup.state(name) != "ready"}
+  if not pending:
+    return None
+  return JSONResponse(
+    status_code=503,
+    content={"error": "Index is still loading", "subsystems": pending},
+    headers={"Retry-After": "2"},
+  )
+
+# 태그 임베딩은 한 번만 계산해 디스크에 캐시 (/search_semantic 에서 재사용)
+tag_vector_store = TagVectorStore(
+  TEXT_MODEL_ID,
+  _encode_texts,
+)
 
 
 class SearchRequest(BaseModel):
@@ -122,6 +192,15 @@ class ImageUpdateBody(BaseModel):
   tags: list[str] | None = None
 
 
+class IngestItem(BaseModel):
+  id: str
+  filename: str
+  thumbnail: str
+  originalName: str
+  createdAt: str
+  notes: str = ""
+
+
 class ImageCreateBody(BaseModel):
   id: str
   filename: str
@@ -138,6 +217,23 @@ class BulkRemoveTagsBody(BaseModel):
   tag_names: list[str]
 
 
+class RenameTagsBody(BaseModel):
+  renames: dict[str, str]
+
+
+class EmbedBatchingBody(BaseModel):
+  batch_size: int | None = None
+  wait_ms: float | None = None
+  queue_maxsize: int | None = None
+
+
+class SearchTextRequest(BaseModel):
+  query: str
+  limit: int = 50
+  offset: int = 0
+  min_score: float = 0.2  # 코사인 유사도 하한
+
+
 class SearchSimilarRequest(BaseModel):
   imageId: str
   limit: int = 20
@@ -149,6 +245,13 @@ class ConvertRequest(BaseModel):
   quality: int = 85  # 1-100, used for jpg/webp
 
 
+class ConvertBatchRequest(BaseModel):
+  imageIds: list[str] = []
+  tagQuery: Optional[str] = None  # 불리언 태그 식 (/query 와 같은 문법). imageIds 와 함께 주면 합집합
+  format: Literal["png", "jpg", "webp"]
+  quality: int = 85
+
+
 class UpscaleRequest(BaseModel):
   imageId: str
   scale: float = 2.0  # 1.5 ~ 4.0
@@ -164,19 +267,21 @@ class RemoveBgRequest(BaseModel):
   imageId: str
   points: list[PointLabel]
   mode: Literal["extract", "remove"] = "extract"
+  sessionId: str = ""  # 편집기 세션 (같은 세션의 이전 마스크 로짓을 이어서 사용)
 
 
 class RemoveBgPreviewRequest(BaseModel):
   imageId: str
   points: list[PointLabel]
   mode: Literal["extract", "remove"] = "extract"
+  sessionId: str = ""  # 편집기 세션 (같은 세션의 이전 마스크 로짓을 이어서 사용)
+  maxSize: Optional[int] = None  # 표시 크기 (긴 변 px). 마스크를 이 크기 이하로 줄여 보냄
+  encoding: Literal["png", "rle", "bits"] = "png"  # png=JSON(base64), rle/bits=application/octet-stream
 
 
 # Real-ESRGAN PyTorch 업스케일러 (지연 로딩)
-import cv2
 import numpy as np
 
-_upscaler_cache: dict = {}
 _upscaler_lock: Optional[asyncio.Lock] = None
 
 def _get_upscaler_lock() -> asyncio.Lock:
@@ -186,15 +291,13 @@ def _get_upscaler_lock() -> asyncio.Lock:
   return _upscaler_lock
 
 
-def get_realesrgan_upscaler():
-  """RealESRGANer 인스턴스를 캐시에서 가져오거나 새로 생성. (anime 4x 모델 단일 사용)"""
+def _load_realesrgan_upscaler():
+  """RealESRGANer 인스턴스 생성. (anime 4x 모델 단일 사용)"""
+  import torch
+  _patch_basicsr_torchvision()
   from realesrgan import RealESRGANer
   from basicsr.archs.rrdbnet_arch import RRDBNet
   
-  cache_key = "anime_x4"
-  if cache_key in _upscaler_cache:
-    return _upscaler_cache[cache_key]
-  
   device = "cuda" if torch.cuda.is_available() else "cpu"
   
   # anime 4x 모델 (outscale로 1.5x~4.0x 자유롭게 조절)
@@ -212,40 +315,31 @@ def get_realesrgan_upscaler():
     device=device,
   )
   
-  _upscaler_cache[cache_key] = upsampler
   print(f"Loaded RealESRGAN model: anime x4 on {device}")
   return upsampler
 
 
-def run_realesrgan_pytorch(input_path: Path, output_path: Path, scale: float) -> bool:
-  """PyTorch 기반 Real-ESRGAN으로 업스케일. scale: 1.5 ~ 4.0"""
+# 가중치는 작지만 타일 처리 작업 메모리가 커서 크기 힌트를 넉넉히 잡음
+model_registry.register("realesrgan", _load_realesrgan_upscaler, idle_timeout=300, size_hint_mb=1024)
+
+
+def run_realesrgan_pytorch(input_path: Path, output_path: Path, scale: float,
+                           on_progress: Optional[Callable[[float], None]] = None) -> Optional[dict]:
+  """타일 스트리밍 Real-ESRGAN 업스케일 (upscale_engine). scale: 1.5 ~ 4.0
+
+  반환: {width, height, tile, workers, preview(RGB 배열)} 또는 실패 시 None. 작업 취소는 JobCancelled 로 전달.
+  """
   try:
-    img = cv2.imread(str(input_path), cv2.IMREAD_UNCHANGED)
-    if img is None:
-      print(f"Failed to read image: {input_path}")
-      return False
-    
-    # RGBA -> BGR 변환 (알파 채널이 있으면 제거)
-    if img.ndim == 3 and img.shape[2] == 4:
-      img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-    
-    upsampler = get_realesrgan_upscaler()
-    output, _ = upsampler.enhance(img, outscale=scale)
-    
-    output_ext = output_path.suffix.lower()
-    if output_ext == ".webp":
-      cv2.imwrite(str(output_path), output, [cv2.IMWRITE_WEBP_QUALITY, 95])
-    elif output_ext == ".jpg" or output_ext == ".jpeg":
-      cv2.imwrite(str(output_path), output, [cv2.IMWRITE_JPEG_QUALITY, 95])
-    else:
-      cv2.imwrite(str(output_path), output)
-    
-    return output_path.exists()
+    with model_registry.acquire("realesrgan") as upsampler:
+      return upscale_file(upsampler, input_path, output_path, scale,
+                          preview_max_size=max(THUMB_SIZES), on_progress=on_progress)
+  except JobCancelled:
+    raise
   except Exception as e:
     print(f"RealESRGAN error: {e}")
     import traceback
     traceback.print_exc()
-    return False
+    return None
 
 
 @app.post("/bulk-remove-tags")
@@ -253,84 +347,251 @@ def bulk_remove_tags(body: BulkRemoveTagsBody):
   """제외 목록 태그를 모든 이미지에서 완전 일치로 제거."""
   if not body.tag_names:
     return {"success": True, "updated": 0}
-  exclude_set = {t.strip().lower() for t in body.tag_names if t and str(t).strip()}
-  if not exclude_set:
-    return {"success": True, "updated": 0}
-  table = get_table()
-  df = table.to_pandas()
-  if df.empty:
-    return {"success": True, "updated": 0}
-  if "tags" not in df.columns:
+  updated = remove_tags(get_table(), body.tag_names)
+  mapping = {t: None for t in body.tag_names}
+  tag_writes.run(lambda: tag_stats.apply_many(tag_index.rewrite(mapping)))
+  return {"success": True, "updated": updated}
+
+
+@app.post("/tags/rename")
+def rename_tags_endpoint(body: RenameTagsBody):
+  """태그 이름 변경·병합. renames: {기존 태그: 새 태그}. 여러 태그를 같은 새 태그로 매핑하면 병합."""
+  if not body.renames:
     return {"success": True, "updated": 0}
-  updated = 0
-  for _, row in df.iterrows():
-    row_id = row.get("id")
-    if row_id is None:
-      continue
-    tags = row.get("tags")
-    if hasattr(tags, "tolist"):
-      tags = tags.tolist()
-    if not isinstance(tags, list):
-      continue
-    new_tags = [t for t in tags if str(t).strip().lower() not in exclude_set]
-    if new_tags == tags:
-      continue
-    safe_id = str(row_id).replace("'", "''")
-    pred = f"id = '{safe_id}'"
-    table.update(where=pred, values={"tags": new_tags})
-    updated += 1
+  updated = rename_tags(get_table(), body.renames)
+  mapping = {k: v for k, v in body.renames.items() if v and str(v).strip()}
+  tag_writes.run(lambda: tag_stats.apply_many(tag_index.rewrite(mapping)))
   return {"success": True, "updated": updated}
 
 
+@app.get("/tags")
+def list_tags(limit: int = Query(100, ge=1, le=10000)):
+  """이미지 수 상위 태그 (태그 클라우드·제외 태그 설정용)."""
+  busy = _not_ready("tagIndex")
+  if busy is not None:
+    return busy
+  return {"tags": tag_stats.top(limit), "totalTags": tag_stats.total_tags(), "images": len(tag_index)}
+
+
+@app.get("/tags/related")
+def related_tags(tag: str, limit: int = Query(20, ge=1, le=200)):
+  """tag 와 함께 자주 붙는 태그 (동시 출현 수 순, score=Jaccard)."""
+  busy = _not_ready("tagIndex")
+  if busy is not None:
+    return busy
+  key = normalize_tag(tag)
+  return {"tag": key, "count": tag_stats.count(key), "related": tag_stats.related(key, limit)}
+
+
 @app.get("/health")
 def health():
-  """run.bat 등에서 AI 서버 준비 여부 확인용."""
-  return {"ok": True}
+  """run.bat 등에서 AI 서버 준비 여부 확인용. ready 는 모든 서브시스템 준비 완료, models 는 로드된 모델."""
+  return {
+    "ok": True,
+    "ready": startup.all_ready(),
+    "subsystems": startup.subsystems(),
+    "models": {name: info["loaded"] for name, info in model_registry.stats()["models"].items()},
+  }
 
 
 @app.post("/tag")
 async def get_tags(file: UploadFile = File(...), threshold: float = Query(0.35)):
-  tagger = await get_or_load_tagger()
   contents = await file.read()
-  tags = await asyncio.to_thread(tagger.predict, contents, threshold)
-  schedule_tagger_unload()
+  async with model_registry.use("tagger") as tagger:
+    tags = await asyncio.to_thread(tagger.predict, contents, threshold)
   return {"tags": tags}
 
 
+@app.post("/tag/batch")
+async def get_tags_batch(files: list[UploadFile] = File(...), threshold: float = Query(0.35)):
+  """여러 이미지를 한 번에 태깅. results[i] 는 files[i] 의 태그 리스트."""
+  contents = [await f.read() for f in files]
+  async with model_registry.use("tagger") as tagger:
+    results = await asyncio.to_thread(tagger.predict_batch, contents, threshold, TAGGER_BATCH_SIZE)
+  return {"results": results}
+
+
+DEFAULT_TAG = "untagged"
+
+
+def _public_row(row: dict) -> dict:
+  """응답용 행 (vector·phash 제외)."""
+  return {k: v for k, v in row.items() if k not in INTERNAL_COLUMNS}
+
+
+# 인제스트 디코딩 해상도: 태거 입력과 가장 큰 썸네일 모두에 충분한 짧은 변
+INGEST_DECODE_SIDE = max(TAGGER_DECODE_SIDE, max(THUMB_SIZES))
+
+
+def _decode_for_ingest(data: bytes):
+  """업로드 바이트를 한 번만, 필요한 해상도로만 디코딩. (원본 크기, EXIF 회전·알파 합성 적용 RGB) 반환."""
+  try:
+    return decode_reduced(data, INGEST_DECODE_SIDE)
+  except Exception as e:
+    print(f"Ingest decode failed: {e}")
+    return None, None
+
+
+@app.post("/ingest")
+async def ingest_images(
+  files: list[UploadFile] = File(...),
+  metadata: str = Form(...),
+  threshold: float = Form(0.35),
+  exclude_tags: str = Form("[]"),
+  write_thumbnail: bool = Form(True),
+):
+  """업로드 이미지를 한 번만 디코딩해 태깅·CLIP 임베딩·썸네일 생성 후 LanceDB에 등록.
+
+  metadata: files 와 같은 순서의 IngestItem JSON 배열. exclude_tags: 제외 태그 JSON 배열.
+  같은 id 로 다시 보내면 기존 행을 교체 (재시도해도 중복 행 없음).
+  """
+  try:
+    items = [IngestItem(**m) for m in json.loads(metadata)]
+    exclude_set = {str(t).strip().lower() for t in json.loads(exclude_tags) if str(t).strip()}
+  except Exception as e:
+    return JSONResponse(status_code=400, content={"error": f"Invalid metadata: {e}"})
+  if len(items) != len(files):
+    return JSONResponse(status_code=400, content={"error": "files and metadata length mismatch"})
+
+  contents = [await f.read() for f in files]
+  decoded = await asyncio.gather(*(asyncio.to_thread(_decode_for_ingest, c) for c in contents))
+  rgb_images = [rgb for _, rgb in decoded]
+
+  async with model_registry.use("tagger") as tagger:
+    tag_task = asyncio.to_thread(tagger.predict_images, rgb_images, threshold, TAGGER_BATCH_SIZE)
+    vec_tasks = [encode_image(rgb) if rgb is not None else asyncio.sleep(0, result=[]) for rgb in rgb_images]
+    hash_task = asyncio.gather(*(
+      asyncio.to_thread(phash_image, rgb) if rgb is not None else asyncio.sleep(0, result=None)
+      for rgb in rgb_images
+    ))
+    tag_lists, hashes, *vectors = await asyncio.gather(tag_task, hash_task, *vec_tasks)
+
+  if write_thumbnail:
+    thumb_jobs = [
+      asyncio.to_thread(make_derivatives, rgb, THUMB_DIR / item.thumbnail)
+      for item, rgb in zip(items, rgb_images) if rgb is not None
+    ]
+    for res in await asyncio.gather(*thumb_jobs, return_exceptions=True):
+      if isinstance(res, Exception):
+        print(f"Thumbnail creation failed: {res}")
+
+  rows = []
+  for item, (size, _), tags, vec, h in zip(items, decoded, tag_lists, vectors, hashes):
+    tags = [t for t in tags if t != "error" and t.strip().lower() not in exclude_set]
+    rows.append({
+      "id": item.id,
+      "filename": item.filename,
+      "thumbnail": item.thumbnail,
+      "originalName": item.originalName,
+      "tags": tags or [DEFAULT_TAG],
+      "width": size[0] if size else None,
+      "height": size[1] if size else None,
+      "notes": item.notes or "",
+      "createdAt": item.createdAt,
+      "vector": vec if vec and len(vec) == VECTOR_DIM else ZERO_VECTOR,
+      "phash": h,
+    })
+  table = get_table()
+  # id 는 업로드 쪽에서 정함 → 응답을 못 받은 업로드가 /images 로 다시 등록해도 중복 행이 생기지 않게 upsert
+  upsert_rows(table, rows)
+  for r in rows:
+    _index_added_row(r)
+  schedule_reindex_check(table)
+  return {"success": True, "images": [_public_row(r) for r in rows]}
+
+
 @app.post("/search_semantic")
 async def search_semantic(req: SearchRequest):
   if not req.query or not req.all_tags:
     return {"match_tags": []}
 
-  query_vec = text_model.encode(req.query, convert_to_tensor=True)
-  tag_vecs = text_model.encode(req.all_tags, convert_to_tensor=True)
-  cos_scores = util.cos_sim(query_vec, tag_vecs)[0]
-
-  th = req.similarity_threshold
-  match_tags = [req.all_tags[i] for i, score in enumerate(cos_scores) if score > th]
+  match_tags = await asyncio.to_thread(
+    tag_vector_store.match, req.query, req.all_tags, req.similarity_threshold
+  )
   return {"match_tags": match_tags}
 
 
+@app.post("/search_text")
+async def search_text(req: SearchTextRequest):
+  """검색어 → CLIP 텍스트 벡터 → images.vector 코사인 검색. {results: [{id, score}], next_offset}."""
+  if not req.query or not req.query.strip():
+    return {"results": [], "next_offset": None}
+  vec = await encode_text(req.query)
+  if not vec:
+    return {"results": [], "next_offset": None}
+  limit = max(1, min(int(req.limit), 200))
+  offset = max(0, int(req.offset))
+  table = get_table()
+  try:
+    # 코사인은 인덱스(l2) 대상이 아니므로 vector_search 가 전수 검색으로 처리
+    rows = await asyncio.to_thread(
+      lambda: vector_search(table, vec, metric="cosine").select(["id"]).limit(offset + limit + 1).to_list()
+    )
+  except Exception as e:
+    print(f"Text search failed: {e}")
+    return JSONResponse(status_code=500, content={"error": f"Text search failed: {e}"})
+  # 아직 임베딩되지 않은 행(ZERO_VECTOR)은 코사인 거리가 NaN → 정렬 맨 뒤로 가며, 여기서 제외
+  rows = [r for r in rows if r.get("_distance") is not None and math.isfinite(float(r["_distance"]))]
+  results = []
+  for r in rows[offset:offset + limit]:
+    score = 1.0 - float(r["_distance"])
+    if score < req.min_score:
+      break
+    results.append({"id": str(r["id"]), "score": round(score, 4)})
+  has_more = len(results) == limit and len(rows) > offset + limit
+  return {"results": results, "next_offset": offset + limit if has_more else None}
+
+
+@app.get("/query")
+def query_images(
+  q: str = Query("", description="불리언 태그 식 (예: long hair AND NOT hat)"),
+  limit: int = Query(100, ge=1, le=1000),
+  cursor: int | None = Query(None, ge=0, description="이전 페이지 next_cursor"),
+  columns: str | None = Query(None, description="쉼표 구분 컬럼 목록. ids_only=true 면 무시"),
+  ids_only: bool = Query(False),
+):
+  """태그 비트맵 역색인으로 불리언 태그 질의. 최신순 {images | ids, total, next_cursor}."""
+  busy = _not_ready("tagIndex")
+  if busy is not None:
+    return busy
+  try:
+    page = tag_index.query(q, limit, cursor)
+  except TagQueryError as e:
+    return JSONResponse(status_code=400, content={"error": str(e)})
+  if ids_only:
+    return page
+  images = fetch_rows_by_ids(get_table(), page["ids"], resolve_columns(columns))
+  return {"images": images, "total": page["total"], "next_cursor": page["next_cursor"]}
+
+
 @app.get("/images")
-def list_images():
-  """LanceDB images 테이블 목록. id 기준 최신순, vector 제외."""
+def list_images(
+  limit: int | None = Query(None, ge=1, le=1000, description="페이지 크기 (없으면 전체 배열)"),
+  after_id: str | None = Query(None, description="이전 페이지 next_cursor"),
+  columns: str | None = Query(None, description="쉼표 구분 컬럼 목록 (vector 제외)"),
+  since: int | None = Query(None, ge=0, description="이 테이블 버전 이후 변경분만"),
+):
+  """LanceDB images 테이블 목록. id 기준 최신순, vector 제외.
+
+  파라미터가 없으면 기존처럼 전체 배열을 반환하고, limit/after_id 면 {images, next_cursor, version},
+  since 면 {images, deleted, version} 을 반환 (그 버전이 정리됐거나 알 수 없으면 410 → 전체를 다시 받을 것).
+  """
   table = get_table()
-  df = table.to_pandas()
-  df = df.drop(columns=["vector"], errors="ignore")
-  df["notes"] = df["notes"].fillna("")
-  rows = df.to_dict("records")
-  for d in rows:
-    if "tags" in d and hasattr(d["tags"], "tolist"):
-      d["tags"] = d["tags"].tolist()
-  out = sorted(rows, key=lambda x: int(x.get("id", 0) or 0), reverse=True)
-  return out
+  cols = resolve_columns(columns)
+  if since is not None:
+    try:
+      return list_changes_since(table, since, cols)
+    except VersionGone as e:
+      return JSONResponse(status_code=410, content={"error": str(e)})
+  if limit is not None or after_id:
+    return list_page(table, limit or 200, after_id, cols)
+  return list_all(table, cols)
 
 
 @app.patch("/images/{image_id}")
 def update_image(image_id: str, body: ImageUpdateBody):
   table = get_table()
-  safe_id = image_id.replace("'", "''")
-  pred = f"id = '{safe_id}'"
+  pred = id_predicate(image_id)
   values = {}
   if body.notes is not None:
     values["notes"] = body.notes
@@ -338,23 +599,37 @@ def update_image(image_id: str, body: ImageUpdateBody):
     values["tags"] = body.tags
   if values:
     table.update(where=pred, values=values)
+  if body.tags is not None:
+    tags = body.tags
+    tag_writes.run(lambda: tag_stats.apply(*tag_index.set_tags(image_id, tags)))
   return {"success": True}
 
 
 @app.delete("/images")
 def delete_image(id: str):
+  """행 삭제와 크기별 파생 썸네일({id}_{크기}.webp) 삭제. 원본·기본 썸네일 파일은 Next.js 쪽에서 지움."""
   table = get_table()
-  safe_id = id.replace("'", "''")
-  table.delete(f"id = '{safe_id}'")
-  return {"success": True}
+  row = get_image_row(id, ["thumbnail"], table)
+  table.delete(id_predicate(id))
+  phash_writes.run(lambda: phash_index.remove(id))
+  tag_writes.run(lambda: tag_stats.apply(tag_index.remove(id), ()))
+  sam_cache.discard(id)
+  thumbnail = Path(str((row or {}).get("thumbnail") or f"{id}.webp")).name
+  removed = remove_derivatives(THUMB_DIR / thumbnail)
+  return {"success": True, "removedDerivatives": [p.name for p in removed]}
 
 
 @app.post("/images")
 async def create_image(body: ImageCreateBody):
+  """메타데이터 한 건 등록 (/ingest 실패 시 업로드 쪽 대체 경로). 같은 id 가 있으면 교체."""
   vector = ZERO_VECTOR
+  phash = None
   image_path = UPLOAD_DIR / body.filename
   if image_path.exists():
-    vec = await encode_image_path(image_path)
+    vec, phash = await asyncio.gather(
+      encode_image_path(image_path),
+      asyncio.to_thread(phash_path, image_path),
+    )
     if vec and len(vec) == VECTOR_DIM:
       vector = vec
   row = {
@@ -368,9 +643,12 @@ async def create_image(body: ImageCreateBody):
     "notes": body.notes or "",
     "createdAt": body.createdAt,
     "vector": vector,
+    "phash": phash,
   }
   table = get_table()
-  table.add([row])
+  upsert_rows(table, [row])
+  _index_added_row(row)
+  schedule_reindex_check(table)
   return {"success": True}
 
 
@@ -385,19 +663,28 @@ def _is_zero_vector(vec) -> bool:
     return True
 
 
+@app.get("/embedder/batching")
+def embedder_batching():
+  """CLIP 마이크로 배칭 설정·통계."""
+  return get_batcher().stats()
+
+
+@app.patch("/embedder/batching")
+async def update_embedder_batching(body: EmbedBatchingBody):
+  """CLIP 마이크로 배칭 파라미터 조정 (지연 vs 처리량)."""
+  return configure_batching(body.batch_size, body.wait_ms, body.queue_maxsize)
+
+
 @app.post("/search_similar")
 def search_similar(req: SearchSimilarRequest):
   """이미지 ID로 유사 이미지 검색. LanceDB vector search."""
   if not req.imageId or not req.imageId.strip():
     return {"results": []}
   table = get_table()
-  df = table.to_pandas()
-  if df.empty:
+  row = get_image_row(req.imageId, ["vector"], table=table)
+  if row is None:
     return {"results": []}
-  row = df[df["id"].astype(str) == str(req.imageId).strip()]
-  if row.empty:
-    return {"results": []}
-  vec = row.iloc[0].get("vector")
+  vec = row.get("vector")
   if _is_zero_vector(vec):
     return {"results": []}
   if hasattr(vec, "tolist"):
@@ -409,7 +696,7 @@ def search_similar(req: SearchSimilarRequest):
   safe_id = str(req.imageId).replace("'", "''")
   limit = max(1, min(int(req.limit), 50))
   rs = (
-    table.search(vec)
+    vector_search(table, vec)
     .where(f"id != '{safe_id}'")
     .limit(limit + 1)
   )
@@ -428,320 +715,364 @@ def search_similar(req: SearchSimilarRequest):
   return {"results": rows}
 
 
-def _find_duplicate_groups(table, df_with_vectors, threshold: float, max_groups: int):
-  """벡터 거리 기준으로 중복 후보 그룹을 찾아 반환. (연결 요소)"""
-  import pandas as pd
-  edges = set()
-  id_to_vec = {}
-  for _, row in df_with_vectors.iterrows():
-    vid = str(row.get("id", ""))
-    vec = row.get("vector")
-    if _is_zero_vector(vec):
-      continue
-    if hasattr(vec, "tolist"):
-      vec = vec.tolist()
-    elif hasattr(vec, "__iter__") and not isinstance(vec, (str, bytes)):
-      vec = list(vec)
-    else:
-      continue
-    id_to_vec[vid] = vec
-
-  for vid, vec in id_to_vec.items():
-    safe_id = vid.replace("'", "''")
-    try:
-      rs = (
-        table.search(vec)
-        .where(f"id != '{safe_id}'")
-        .limit(40)
-      )
-      near_df = rs.to_pandas()
-    except Exception:
-      near_df = pd.DataFrame()
-    if near_df.empty or "_distance" not in near_df.columns:
-      continue
-    for _, r in near_df.iterrows():
-      d = r.get("_distance")
-      if d is None:
-        continue
-      try:
-        dist = float(d)
-      except (TypeError, ValueError):
-        continue
-      if dist < threshold:
-        other = str(r.get("id", ""))
-        if other and other != vid:
-          edge = (min(vid, other), max(vid, other))
-          edges.add(edge)
-
-  # Union-Find for connected components
-  parent = {}
+def _merge_groups(*group_lists: list[list[str]]) -> list[list[str]]:
+  """공통 id 를 가진 그룹끼리 합침 (큰 그룹 순)."""
+  parent: dict[str, str] = {}
   def find(x):
-    if x not in parent:
-      parent[x] = x
-    if parent[x] != x:
-      parent[x] = find(parent[x])
-    return parent[x]
-  def union(a, b):
-    pa, pb = find(a), find(b)
-    if pa != pb:
-      parent[pa] = pb
-  for a, b in edges:
-    union(a, b)
-  groups = {}
-  for uid in parent:
-    root = find(uid)
-    if root not in groups:
-      groups[root] = []
-    groups[root].append(uid)
-  # Only groups with at least 2 images
-  group_list = [g for g in groups.values() if len(g) >= 2]
-  group_list.sort(key=lambda g: -len(g))
-  return group_list[:max_groups]
+    parent.setdefault(x, x)
+    while parent[x] != x:
+      parent[x] = parent[parent[x]]
+      x = parent[x]
+    return x
+  for groups in group_lists:
+    for g in groups:
+      for other in g[1:]:
+        ra, rb = find(g[0]), find(other)
+        if ra != rb:
+          parent[ra] = rb
+  merged: dict[str, list[str]] = {}
+  for x in list(parent):
+    merged.setdefault(find(x), []).append(x)
+  out = [g for g in merged.values() if len(g) >= 2]
+  out.sort(key=lambda g: -len(g))
+  return out
 
 
 @app.get("/duplicate-candidates")
 def duplicate_candidates(
   threshold: float = Query(0.2, ge=0.05, le=1.0, description="L2 distance threshold"),
   max_groups: int = Query(50, ge=1, le=200, description="Max number of groups to return"),
+  max_memory_mb: float = Query(DEDUP_MAX_MEMORY_MB, ge=16, le=4096, description="Pairwise block memory budget"),
+  mode: Literal["all", "phash", "vector"] = Query("all", description="phash: 지각 해시만 (빠름), vector: CLIP 벡터만"),
+  phash_distance: int = Query(4, ge=0, le=16, description="pHash Hamming distance threshold"),
 ):
-  """CLIP 벡터 거리 기준 중복 후보 그룹 반환."""
+  """지각 해시(정확·재인코딩 사본)와 CLIP 벡터 거리 기준 중복 후보 그룹 반환."""
+  busy = _not_ready("phashIndex") if mode != "vector" else None
+  if busy is not None:
+    return busy
   table = get_table()
-  df = table.to_pandas()
-  if df.empty:
-    return {"groups": []}
-  df_with_vec = df[df.apply(lambda r: not _is_zero_vector(r.get("vector")), axis=1)]
-  if df_with_vec.empty:
+  hash_groups = phash_index.groups(phash_distance) if mode != "vector" else []
+  vector_groups = find_duplicate_groups(table, threshold, max_groups, max_memory_mb) if mode != "phash" else []
+  group_ids = _merge_groups(hash_groups, vector_groups)[:max_groups]
+  if not group_ids:
     return {"groups": []}
-  group_ids = _find_duplicate_groups(table, df_with_vec, threshold, max_groups)
-  # Build id -> row (without vector) for lookup
-  df_no_vec = df.drop(columns=["vector"], errors="ignore")
-  df_no_vec["notes"] = df_no_vec.get("notes", "").fillna("")
-  id_to_row = {}
-  for _, r in df_no_vec.iterrows():
-    id_to_row[str(r.get("id", ""))] = r.to_dict()
+  all_ids = [iid for ids in group_ids for iid in ids]
+  id_to_row = {str(r["id"]): r for r in fetch_rows_by_ids(table, all_ids, LIST_COLUMNS)}
   out_groups = []
   for ids in group_ids:
-    rows = []
-    for iid in ids:
-      row = id_to_row.get(iid)
-      if row is None:
-        continue
-      if "tags" in row and hasattr(row["tags"], "tolist"):
-        row["tags"] = row["tags"].tolist()
-      rows.append(row)
+    rows = [id_to_row[iid] for iid in ids if iid in id_to_row]
     if len(rows) >= 2:
       out_groups.append(rows)
   return {"groups": out_groups}
 
 
 @app.post("/backfill/embeddings")
-async def backfill_embeddings():
-  """기존 이미지에 대해 public/uploads 파일이 있으면 CLIP 벡터 계산 후 LanceDB에 반영."""
-  table = get_table()
-  df = table.to_pandas()
-  if df.empty:
-    return {"updated": 0, "skipped": 0, "failed": 0}
-  updated = 0
-  skipped = 0
-  failed = 0
-  for _, row in df.iterrows():
-    id_val = row.get("id")
-    filename = row.get("filename")
-    if id_val is None or not filename:
-      skipped += 1
-      continue
-    path = UPLOAD_DIR / str(filename).strip()
-    if not path.exists():
-      skipped += 1
-      continue
-    if not _is_zero_vector(row.get("vector")):
-      skipped += 1
-      continue
-    try:
-      vec = await encode_image_path(path)
-      if vec and len(vec) == VECTOR_DIM:
-        safe_id = str(id_val).replace("'", "''")
-        table.update(where=f"id = '{safe_id}'", values={"vector": vec})
-        updated += 1
-      else:
-        failed += 1
-    except Exception:
-      failed += 1
-  return {"updated": updated, "skipped": skipped, "failed": failed}
+async def backfill_embeddings(
+  reset: bool = Query(False, description="체크포인트 무시하고 처음부터"),
+  batch_size: int = Query(BACKFILL_BATCH_SIZE, ge=1, le=512),
+):
+  """0 벡터 이미지에 대해 public/uploads 파일로 CLIP 벡터를 배치 계산해 LanceDB에 반영. 중단 시 이어서 실행.
 
+  작업 큐에 넣고 jobId 반환 (진행 상황은 /jobs/{id} 또는 /backfill/embeddings/status).
+  이미 대기·실행 중인 백필 작업이 있으면 같은 0 벡터 행을 다시 임베딩하지 않도록 409 와 그 jobId.
+  """
+  active = job_queue.active("backfill-embeddings")
+  if active is not None:
+    return JSONResponse(status_code=409, content={"error": "Embedding backfill already queued or running",
+                                                  "jobId": active["id"], "status": active["status"]})
+  return _job_response(job_queue.submit("backfill-embeddings", {"reset": reset, "batch_size": batch_size}))
 
-@app.post("/convert")
-async def convert_image(body: ConvertRequest):
-  """이미지를 다른 포맷으로 변환해 새 이미지로 갤러리에 추가."""
+
+async def _backfill_embeddings_job(ctx: JobContext, params: dict) -> dict:
   table = get_table()
-  df = table.to_pandas()
-  
-  # 원본 이미지 찾기
-  row = df[df["id"].astype(str) == str(body.imageId).strip()]
-  if row.empty:
+  result = await run_backfill(
+    table, UPLOAD_DIR, batch_size=params.get("batch_size", BACKFILL_BATCH_SIZE), reset=params.get("reset", False),
+    on_progress=lambda p: ctx.progress(None, **p),
+  )
+  schedule_reindex_check(table)
+  return result
+
+
+# /backfill/phash 실행 중 여부 (이벤트 루프에서만 읽고 씀 → 검사와 설정 사이에 끼어들 수 없음)
+_phash_backfill_running = False
+
+
+@app.post("/backfill/phash")
+async def backfill_phash():
+  """phash 가 없는 기존 이미지의 지각 해시를 계산해 LanceDB와 해시 인덱스에 반영. 이미 실행 중이면 409."""
+  global _phash_backfill_running
+  if _phash_backfill_running:
+    return JSONResponse(status_code=409, content={"error": "pHash backfill already running"})
+  _phash_backfill_running = True
+  try:
+    result = await run_phash_backfill(get_table(), UPLOAD_DIR)
+  finally:
+    _phash_backfill_running = False
+  for image_id, h in result.pop("hashes"):
+    phash_writes.run(lambda image_id=image_id, h=h: phash_index.add(image_id, h))
+  return result
+
+
+@app.get("/backfill/embeddings/status")
+def backfill_embeddings_status():
+  """백필 진행 상황 (처리 건수, 초당 이미지 수)."""
+  return get_backfill_progress()
+
+
+def _find_source(image_id: str, table=None):
+  """원본 행과 파일 경로. 없으면 404 JSONResponse."""
+  src_row = get_image_row(image_id, SOURCE_ROW_COLUMNS, table=table or get_table())
+  if src_row is None:
     return JSONResponse(status_code=404, content={"error": "Image not found"})
-  
-  src_row = row.iloc[0]
-  src_filename = src_row.get("filename")
-  src_path = UPLOAD_DIR / str(src_filename)
-  
+  src_path = UPLOAD_DIR / str(src_row.get("filename"))
   if not src_path.exists():
     return JSONResponse(status_code=404, content={"error": "Image file not found"})
-  
-  # 새 ID 생성 (현재 타임스탬프)
-  import time
-  new_id = str(int(time.time() * 1000))
-  
-  # 포맷별 확장자 및 저장 옵션
-  fmt = body.format.lower()
-  ext_map = {"png": ".png", "jpg": ".jpg", "webp": ".webp"}
-  new_ext = ext_map.get(fmt, ".png")
-  new_filename = f"{new_id}{new_ext}"
-  new_path = UPLOAD_DIR / new_filename
-  
-  # PIL로 변환
-  try:
-    img = Image.open(src_path)
-    # RGBA → RGB (jpg는 알파 채널 미지원)
-    if fmt == "jpg" and img.mode in ("RGBA", "LA", "P"):
-      background = Image.new("RGB", img.size, (255, 255, 255))
-      if img.mode == "P":
-        img = img.convert("RGBA")
-      background.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
-      img = background
-    elif fmt != "jpg" and img.mode == "P":
-      img = img.convert("RGBA")
-    
-    width, height = img.size
-    
-    # 저장
-    save_kwargs = {}
-    if fmt == "jpg":
-      save_kwargs = {"quality": body.quality, "optimize": True}
-      img.save(new_path, "JPEG", **save_kwargs)
-    elif fmt == "webp":
-      save_kwargs = {"quality": body.quality, "method": 4}
-      img.save(new_path, "WEBP", **save_kwargs)
-    else:  # png
-      img.save(new_path, "PNG", optimize=True)
-    
-    # 썸네일 생성
-    thumb_filename = f"{new_id}.webp"
-    thumb_path = THUMB_DIR / thumb_filename
-    thumb_img = img.copy()
-    thumb_img.thumbnail((THUMB_MAX_SIZE, THUMB_MAX_SIZE), Image.Resampling.LANCZOS)
-    if thumb_img.mode in ("RGBA", "LA"):
-      # webp는 RGBA 지원하지만 배경 흰색으로 변환
-      bg = Image.new("RGB", thumb_img.size, (255, 255, 255))
-      bg.paste(thumb_img, mask=thumb_img.split()[-1] if thumb_img.mode == "RGBA" else None)
-      thumb_img = bg
-    thumb_img.save(thumb_path, "WEBP", quality=THUMB_WEBP_QUALITY)
-    
-  except Exception as e:
-    return JSONResponse(status_code=500, content={"error": f"Conversion failed: {str(e)}"})
-  
-  # 원본 이름에 포맷 정보 추가
-  src_original = src_row.get("originalName", "image")
-  src_base = Path(src_original).stem
-  new_original = f"{src_base}_converted{new_ext}"
-  
-  # 원본 태그 복사
+  return src_row, src_path
+
+
+def _job_source(image_id: str, table) -> tuple[dict, Path]:
+  """작업 실행 시점의 원본 (대기 중 삭제됐으면 JobError)."""
+  found = _find_source(image_id, table)
+  if isinstance(found, JSONResponse):
+    raise JobError(json.loads(found.body)["error"])
+  return found
+
+
+_id_lock = threading.Lock()
+_last_image_id = 0
+
+
+def _image_id_taken(image_id: str) -> bool:
+  # Node 업로드도 Date.now()+index 로 id 를 만듦 → 썸네일(두 경로 모두 {id}.webp)이나 DB 행이 있으면 사용 중
+  return (THUMB_DIR / f"{image_id}.webp").exists() or get_image_row(image_id, ["id"]) is not None
+
+
+def _new_image_id() -> str:
+  """새 이미지 id (밀리초 타임스탬프, 목록 정렬 키). 프로세스 안에서 단조 증가하고, 이미 쓰인 id 는 건너뜀."""
+  global _last_image_id
+  with _id_lock:
+    candidate = max(int(time.time() * 1000), _last_image_id + 1)
+    while _image_id_taken(str(candidate)):
+      candidate += 1
+    _last_image_id = candidate
+    return str(candidate)
+
+
+def _job_response(job: dict) -> JSONResponse:
+  return JSONResponse(status_code=202, content={"jobId": job["id"], "status": job["status"]})
+
+
+def _source_tags(src_row: dict) -> list:
   src_tags = src_row.get("tags")
   if hasattr(src_tags, "tolist"):
     src_tags = src_tags.tolist()
-  if not isinstance(src_tags, list):
-    src_tags = []
-  
-  # CLIP 벡터 계산
-  vector = ZERO_VECTOR
-  try:
-    vec = await encode_image_path(new_path)
-    if vec and len(vec) == VECTOR_DIM:
-      vector = vec
-  except Exception:
-    pass
-  
-  # LanceDB에 등록
-  new_row = {
+  return src_tags if isinstance(src_tags, list) else []
+
+
+@app.post("/convert")
+async def convert_image(body: ConvertRequest, priority: Optional[int] = Query(None, description="작업 우선순위 (클수록 먼저)")):
+  """이미지를 다른 포맷으로 변환해 새 이미지로 갤러리에 추가. 작업 큐에 넣고 jobId 반환 (결과는 /jobs/{id})."""
+  found = _find_source(body.imageId)
+  if isinstance(found, JSONResponse):
+    return found
+  return _job_response(job_queue.submit("convert", body.model_dump(), priority))
+
+
+async def _converted_row(new_id: str, new_ext: str, src_row: dict, width: int, height: int, small: Image.Image) -> dict:
+  """변환본 행. 벡터·pHash 는 convert_file 이 돌려준 썸네일 크기 이미지로 계산 (결과 파일 재디코딩 없음)."""
+  # 원본 이름에 포맷 정보 추가
+  src_base = Path(src_row.get("originalName") or "image").stem
+  vec, phash = await asyncio.gather(encode_image(small), asyncio.to_thread(phash_image, small))
+  return {
     "id": new_id,
-    "filename": new_filename,
-    "thumbnail": thumb_filename,
-    "originalName": new_original,
-    "tags": src_tags,
+    "filename": f"{new_id}{new_ext}",
+    "thumbnail": f"{new_id}.webp",
+    "originalName": f"{src_base}_converted{new_ext}",
+    "tags": _source_tags(src_row),  # 원본 태그 복사
     "width": width,
     "height": height,
     "notes": "",
-    "createdAt": __import__("datetime").datetime.now().isoformat(),
-    "vector": vector,
+    "createdAt": datetime.now().isoformat(),
+    "vector": vec if vec and len(vec) == VECTOR_DIM else ZERO_VECTOR,
+    "phash": phash,
   }
-  table.add([new_row])
-  
-  # 응답 (vector 제외)
-  response_row = {k: v for k, v in new_row.items() if k != "vector"}
-  return {"success": True, "image": response_row}
 
 
-@app.post("/upscale")
-async def upscale_image(body: UpscaleRequest):
-  """Real-ESRGAN (PyTorch)으로 이미지 업스케일 후 새 이미지로 갤러리에 추가."""
-  import time
+async def _convert_job(ctx: JobContext, params: dict) -> dict:
+  body = ConvertRequest(**params)
+  table = get_table()
+  src_row, src_path = _job_source(body.imageId, table)
+  
+  new_id = _new_image_id()
+  
+  fmt = body.format.lower()
+  new_ext = FORMAT_EXTENSIONS.get(fmt, ".png")
+  
+  try:
+    width, height, small = await asyncio.to_thread(
+      convert_file, src_path, UPLOAD_DIR / f"{new_id}{new_ext}", THUMB_DIR / f"{new_id}.webp", fmt, body.quality
+    )
+  except Exception as e:
+    raise JobError(f"Conversion failed: {str(e)}")
+  ctx.progress(0.5, step="embedding")
   
+  # LanceDB에 등록
+  new_row = await _converted_row(new_id, new_ext, src_row, width, height, small)
+  await asyncio.to_thread(table.add, [new_row])
+  _index_added_row(new_row)
+  schedule_reindex_check(table)
+  
+  # 결과 (vector·phash 제외)
+  return {"success": True, "image": _public_row(new_row)}
+
+
+@app.post("/convert/batch")
+async def convert_batch(body: ConvertBatchRequest, priority: Optional[int] = Query(None, description="작업 우선순위 (클수록 먼저)")):
+  """여러 이미지(id 목록 또는 태그 식)를 한 작업으로 변환. 작업 큐에 넣고 jobId 반환.
+
+  진행 중에는 /jobs/{id} 의 detail.items 에 이미지별 결과가 끝나는 순서대로 쌓임.
+  """
+  ids = list(dict.fromkeys(body.imageIds))
+  if body.tagQuery is not None and body.tagQuery.strip():
+    busy = _not_ready("tagIndex")
+    if busy is not None:
+      return busy
+    try:
+      cursor = None
+      while True:
+        page = tag_index.query(body.tagQuery, 1000, cursor)
+        ids.extend(page["ids"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+          break
+    except TagQueryError as e:
+      return JSONResponse(status_code=400, content={"error": str(e)})
+    ids = list(dict.fromkeys(ids))
+  if not ids:
+    return JSONResponse(status_code=400, content={"error": "No images to convert"})
+  params = {**body.model_dump(exclude={"tagQuery"}), "imageIds": ids}
+  return _job_response(job_queue.submit("convert-batch", params, priority))
+
+
+async def _convert_batch_job(ctx: JobContext, params: dict) -> dict:
+  """디코딩·인코딩은 프로세스 풀에서 병렬로, 벡터는 임베딩 배처로 모아 계산하고, 새 행은 끝에 한 번에 등록."""
+  body = ConvertBatchRequest(**params)
   table = get_table()
-  df = table.to_pandas()
+  fmt = body.format.lower()
+  new_ext = FORMAT_EXTENSIONS.get(fmt, ".png")
+  src_rows = await asyncio.to_thread(fetch_rows_by_ids, table, body.imageIds, SOURCE_ROW_COLUMNS)
+  found = {str(r["id"]) for r in src_rows}
+  total = len(body.imageIds)
   
-  # 원본 이미지 찾기
-  row = df[df["id"].astype(str) == str(body.imageId).strip()]
-  if row.empty:
-    return JSONResponse(status_code=404, content={"error": "Image not found"})
+  items = [{"sourceId": i, "error": "Image not found"} for i in body.imageIds if i not in found]
+  rows: list[dict] = []
+  loop = asyncio.get_running_loop()
+  pool = get_convert_pool()
   
-  src_row = row.iloc[0]
-  src_filename = src_row.get("filename")
-  src_path = UPLOAD_DIR / str(src_filename)
+  async def convert_one(src_row: dict) -> dict:
+    src_path = UPLOAD_DIR / str(src_row.get("filename"))
+    if not src_path.exists():
+      raise FileNotFoundError("Image file not found")
+    new_id = _new_image_id()
+    width, height, small = await loop.run_in_executor(
+      pool, convert_file, src_path, UPLOAD_DIR / f"{new_id}{new_ext}", THUMB_DIR / f"{new_id}.webp", fmt, body.quality
+    )
+    row = await _converted_row(new_id, new_ext, src_row, width, height, small)
+    rows.append(row)
+    return row
   
-  if not src_path.exists():
-    return JSONResponse(status_code=404, content={"error": "Image file not found"})
+  async def tracked(src_row: dict, task: asyncio.Task) -> tuple[dict, Optional[dict], Optional[str]]:
+    try:
+      return src_row, await task, None
+    except Exception as e:
+      return src_row, None, f"Conversion failed: {e}"
   
-  # 새 파일 경로 (WebP로 저장하여 용량 절약)
-  new_id = str(int(time.time() * 1000))
-  new_filename = f"{new_id}.webp"
-  new_path = UPLOAD_DIR / new_filename
+  tasks = [loop.create_task(convert_one(r)) for r in src_rows]
+  cancelled = False
+  try:
+    for next_done in asyncio.as_completed([tracked(r, t) for r, t in zip(src_rows, tasks)]):
+      src_row, row, error = await next_done
+      if row is not None:
+        items.append({"sourceId": str(src_row["id"]), "id": row["id"], "filename": row["filename"]})
+      else:
+        items.append({"sourceId": str(src_row["id"]), "error": error})
+      ctx.progress(len(items) / total, done=len(items), total=total, converted=len(rows),
+                   failed=len(items) - len(rows), items=list(items))
+  except JobCancelled:
+    # 남은 변환은 버리고, 이미 끝난 변환본(rows)은 아래에서 등록
+    cancelled = True
+    for task in tasks:
+      task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+  
+  # LanceDB에 한 번에 등록
+  if rows:
+    await asyncio.to_thread(table.add, rows)
+    for row in rows:
+      _index_added_row(row)
+    schedule_reindex_check(table)
+  if cancelled:
+    raise JobCancelled()
+  
+  return {
+    "success": True,
+    "converted": len(rows),
+    "failed": len(items) - len(rows),
+    "items": items,
+    "images": [_public_row(r) for r in rows],
+  }
+
+
+@app.post("/upscale")
+async def upscale_image(body: UpscaleRequest, priority: Optional[int] = Query(None, description="작업 우선순위 (클수록 먼저)")):
+  """Real-ESRGAN (PyTorch)으로 이미지 업스케일 후 새 이미지로 갤러리에 추가. 작업 큐에 넣고 jobId 반환."""
+  found = _find_source(body.imageId)
+  if isinstance(found, JSONResponse):
+    return found
+  return _job_response(job_queue.submit("upscale", body.model_dump(), priority))
+
+
+async def _upscale_job(ctx: JobContext, params: dict) -> dict:
+  body = UpscaleRequest(**params)
+  table = get_table()
+  src_row, src_path = _job_source(body.imageId, table)
   
   # scale 범위 제한 (1.5 ~ 4.0)
   scale = max(1.5, min(4.0, body.scale))
   
-  # PyTorch Real-ESRGAN으로 업스케일 실행
+  # 새 파일 경로 (WebP로 저장하여 용량 절약, 메모리에 다 못 올릴 만큼 크면 PNG 스트리밍)
   try:
-    success = await asyncio.to_thread(
+    with Image.open(src_path) as probe:
+      src_width, src_height = probe.size
+  except Exception as e:
+    raise JobError(f"Failed to read image: {str(e)}")
+  out_ext = ".png" if needs_streaming(src_width, src_height, scale) else ".webp"
+  new_id = _new_image_id()
+  new_filename = f"{new_id}{out_ext}"
+  new_path = UPLOAD_DIR / new_filename
+  
+  # PyTorch Real-ESRGAN으로 업스케일 실행 (동시 업스케일은 한 번에 하나 — 메모리 예산 유지)
+  async with _get_upscaler_lock():
+    result = await asyncio.to_thread(
       run_realesrgan_pytorch,
       src_path,
       new_path,
-      scale
+      scale,
+      lambda f: ctx.progress(f * 0.9, step="upscale"),
     )
-    if not success:
-      return JSONResponse(status_code=500, content={"error": "Upscale failed"})
-  except Exception as e:
-    return JSONResponse(status_code=500, content={"error": f"Upscale failed: {str(e)}"})
+  if result is None:
+    raise JobError("Upscale failed")
+  ctx.progress(0.9, step="indexing")
   
-  # 결과 이미지 크기 확인
-  try:
-    result_img = Image.open(new_path)
-    width, height = result_img.size
-  except Exception as e:
-    return JSONResponse(status_code=500, content={"error": f"Failed to read result: {str(e)}"})
+  width, height = result["width"], result["height"]
+  # 큰 결과 파일을 다시 디코딩하지 않도록 엔진이 함께 만든 축소본으로 썸네일·벡터·pHash 계산
+  preview_img = Image.fromarray(result["preview"])
   
   # 썸네일 생성
   thumb_filename = f"{new_id}.webp"
   thumb_path = THUMB_DIR / thumb_filename
   try:
-    thumb_img = result_img.copy()
-    thumb_img.thumbnail((THUMB_MAX_SIZE, THUMB_MAX_SIZE), Image.Resampling.LANCZOS)
-    if thumb_img.mode == "RGBA":
-      bg = Image.new("RGB", thumb_img.size, (255, 255, 255))
-      bg.paste(thumb_img, mask=thumb_img.split()[-1])
-      thumb_img = bg
-    elif thumb_img.mode != "RGB":
-      thumb_img = thumb_img.convert("RGB")
-    thumb_img.save(thumb_path, "WEBP", quality=THUMB_WEBP_QUALITY)
+    await asyncio.to_thread(make_derivatives, preview_img, thumb_path)
   except Exception as e:
     print(f"Thumbnail creation failed: {e}")
   
@@ -749,45 +1080,39 @@ async def upscale_image(body: UpscaleRequest):
   src_original = src_row.get("originalName", "image")
   src_base = Path(src_original).stem
   scale_str = f"{scale:.1f}".rstrip('0').rstrip('.')  # 2.0 -> "2", 2.5 -> "2.5"
-  new_original = f"{src_base}_x{scale_str}.webp"
-  
-  src_tags = src_row.get("tags")
-  if hasattr(src_tags, "tolist"):
-    src_tags = src_tags.tolist()
-  if not isinstance(src_tags, list):
-    src_tags = []
+  new_original = f"{src_base}_x{scale_str}{out_ext}"
   
   # CLIP 벡터 계산
   vector = ZERO_VECTOR
   try:
-    vec = await encode_image_path(new_path)
+    vec = await encode_image(preview_img)
     if vec and len(vec) == VECTOR_DIM:
       vector = vec
   except Exception:
     pass
   
   # LanceDB에 등록
-  import datetime
   new_row = {
     "id": new_id,
     "filename": new_filename,
     "thumbnail": thumb_filename,
     "originalName": new_original,
-    "tags": src_tags,
+    "tags": _source_tags(src_row),
     "width": width,
     "height": height,
     "notes": "",
-    "createdAt": datetime.datetime.now().isoformat(),
+    "createdAt": datetime.now().isoformat(),
     "vector": vector,
+    "phash": await asyncio.to_thread(phash_image, preview_img),
   }
-  table.add([new_row])
+  await asyncio.to_thread(table.add, [new_row])
+  _index_added_row(new_row)
+  schedule_reindex_check(table)
   
-  response_row = {k: v for k, v in new_row.items() if k != "vector"}
-  return {"success": True, "image": response_row}
+  return {"success": True, "image": _public_row(new_row)}
 
 
 # MobileSAM 배경 제거 (지연 로딩)
-_mobilesam_model: dict = {}
 _mobilesam_lock: Optional[asyncio.Lock] = None
 
 def _get_mobilesam_lock() -> asyncio.Lock:
@@ -797,11 +1122,9 @@ def _get_mobilesam_lock() -> asyncio.Lock:
   return _mobilesam_lock
 
 
-def get_mobilesam():
-  """MobileSAM 모델을 캐시에서 가져오거나 새로 로드."""
-  if "predictor" in _mobilesam_model:
-    return _mobilesam_model["predictor"]
-  
+def _load_mobilesam():
+  """MobileSAM 모델 로드 (없으면 가중치 다운로드)."""
+  import torch
   from mobile_sam import sam_model_registry, SamPredictor
   
   device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -822,74 +1145,78 @@ def get_mobilesam():
   mobile_sam.eval()
   
   predictor = SamPredictor(mobile_sam)
-  _mobilesam_model["predictor"] = predictor
   print(f"Loaded MobileSAM on {device}")
   return predictor
 
 
-def run_mobilesam_segmentation(image_path: Path, points: list, output_path: Path, invert_mask: bool = False) -> bool:
-  """MobileSAM으로 세그멘테이션 수행 후 PNG with alpha로 저장."""
+model_registry.register("mobilesam", _load_mobilesam, idle_timeout=300, size_hint_mb=512)
+sam_cache = SamEmbeddingCache()
+
+
+def run_mobilesam_segmentation(image_path: Path, points: list, invert_mask: bool = False,
+                               image_id: str = "", session_id: str = "") -> Optional[np.ndarray]:
+  """MobileSAM으로 세그멘테이션 수행 후 알파를 채운 BGRA 배열 반환 (캐시된 임베딩·세션 로짓 재사용). 실패 시 None.
+
+  저장·썸네일은 save_segmentation 으로 (MobileSAM 잠금 밖에서).
+  """
+  import cv2
+
   try:
     img = cv2.imread(str(image_path))
     if img is None:
       print(f"Failed to read image: {image_path}")
-      return False
-    
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    
-    predictor = get_mobilesam()
-    predictor.set_image(img_rgb)
-    
-    input_points = np.array([[p["x"], p["y"]] for p in points])
-    input_labels = np.array([p["label"] for p in points])
-    
-    masks, scores, _ = predictor.predict(
-      point_coords=input_points,
-      point_labels=input_labels,
-      multimask_output=True,
-    )
+      return None
     
-    best_idx = np.argmax(scores)
-    mask = masks[best_idx]
+    with model_registry.acquire("mobilesam") as predictor:
+      sam_cache.prepare(predictor, image_id or str(image_path), image_path,
+                        lambda: cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+      mask = sam_cache.predict(predictor, image_id or str(image_path), session_id, points)
     
     if invert_mask:
       mask = ~mask
     
     img_rgba = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
     img_rgba[:, :, 3] = (mask * 255).astype(np.uint8)
-    
-    cv2.imwrite(str(output_path), img_rgba)
-    return output_path.exists()
+    return img_rgba
   except Exception as e:
     print(f"MobileSAM error: {e}")
     import traceback
     traceback.print_exc()
-    return False
+    return None
 
 
-def get_mobilesam_mask(image_path: Path, points: list, invert_mask: bool = False) -> Optional[np.ndarray]:
-  """MobileSAM으로 마스크만 반환 (미리보기용)."""
+def save_segmentation(img_bgra: np.ndarray, output_path: Path, thumb_path: Optional[Path] = None) -> bool:
+  """세그멘테이션 결과를 PNG with alpha로 저장. thumb_path 를 주면 같은 배열로 썸네일(여러 크기)도 생성."""
+  import cv2
+
   try:
+    cv2.imwrite(str(output_path), img_bgra)
+  except Exception as e:
+    print(f"Failed to save segmentation: {e}")
+    return False
+  if thumb_path is not None:
+    try:
+      make_derivatives(img_bgra[:, :, [2, 1, 0, 3]], thumb_path)
+    except Exception as e:
+      print(f"Thumbnail creation failed: {e}")
+  return output_path.exists()
+
+
+def get_mobilesam_mask(image_path: Path, points: list, invert_mask: bool = False,
+                       image_id: str = "", session_id: str = "") -> Optional[np.ndarray]:
+  """MobileSAM으로 마스크만 반환 (미리보기용). 임베딩이 캐시돼 있으면 이미지를 다시 읽지 않음."""
+  import cv2
+
+  def read_rgb():
     img = cv2.imread(str(image_path))
     if img is None:
-      return None
-    
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    
-    predictor = get_mobilesam()
-    predictor.set_image(img_rgb)
-    
-    input_points = np.array([[p["x"], p["y"]] for p in points])
-    input_labels = np.array([p["label"] for p in points])
-    
-    masks, scores, _ = predictor.predict(
-      point_coords=input_points,
-      point_labels=input_labels,
-      multimask_output=True,
-    )
-    
-    best_idx = np.argmax(scores)
-    mask = masks[best_idx]
+      raise ValueError(f"Failed to read image: {image_path}")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+  try:
+    with model_registry.acquire("mobilesam") as predictor:
+      sam_cache.prepare(predictor, image_id or str(image_path), image_path, read_rgb)
+      mask = sam_cache.predict(predictor, image_id or str(image_path), session_id, points)
     
     if invert_mask:
       mask = ~mask
@@ -902,7 +1229,7 @@ def get_mobilesam_mask(image_path: Path, points: list, invert_mask: bool = False
 
 @app.post("/remove-bg/preview")
 async def remove_bg_preview(body: RemoveBgPreviewRequest):
-  """MobileSAM으로 마스크 미리보기 (PNG 이미지로 반환)."""
+  """MobileSAM으로 마스크 미리보기. 표시 크기로 줄인 마스크를 PNG(JSON) 또는 rle/bits 바이너리로 반환."""
   from fastapi.responses import Response
   import base64
   
@@ -910,13 +1237,11 @@ async def remove_bg_preview(body: RemoveBgPreviewRequest):
     return JSONResponse(status_code=400, content={"error": "At least one point is required"})
   
   table = get_table()
-  df = table.to_pandas()
   
-  row = df[df["id"].astype(str) == str(body.imageId).strip()]
-  if row.empty:
+  src_row = get_image_row(body.imageId, SOURCE_ROW_COLUMNS, table=table)
+  if src_row is None:
     return JSONResponse(status_code=404, content={"error": "Image not found"})
   
-  src_row = row.iloc[0]
   src_filename = src_row.get("filename")
   src_path = UPLOAD_DIR / str(src_filename)
   
@@ -933,93 +1258,92 @@ async def remove_bg_preview(body: RemoveBgPreviewRequest):
         get_mobilesam_mask,
         src_path,
         points_data,
-        invert_mask
+        invert_mask,
+        body.imageId,
+        body.sessionId,
       )
       if mask is None:
         return JSONResponse(status_code=500, content={"error": "Preview failed"})
     except Exception as e:
       return JSONResponse(status_code=500, content={"error": f"Preview failed: {str(e)}"})
   
-  mask_img = (mask * 255).astype(np.uint8)
-  _, buffer = cv2.imencode('.png', mask_img)
-  mask_base64 = base64.b64encode(buffer).decode('utf-8')
+  source_height, source_width = mask.shape[:2]
+  mask = downscale_mask(mask, body.maxSize)
+  payload = encode_mask(mask, body.encoding)
+  height, width = mask.shape[:2]
   
-  return {"mask": mask_base64, "width": mask.shape[1], "height": mask.shape[0]}
+  if body.encoding != "png":
+    return Response(
+      content=payload,
+      media_type="application/octet-stream",
+      headers={
+        "X-Mask-Encoding": body.encoding,
+        "X-Mask-Width": str(width),
+        "X-Mask-Height": str(height),
+        "X-Source-Width": str(source_width),
+        "X-Source-Height": str(source_height),
+      },
+    )
+  
+  return {
+    "mask": base64.b64encode(payload).decode("utf-8"),
+    "width": width,
+    "height": height,
+    "sourceWidth": source_width,
+    "sourceHeight": source_height,
+  }
 
 
 @app.post("/remove-bg")
-async def remove_bg(body: RemoveBgRequest):
-  """MobileSAM으로 클릭 포인트 기반 객체 추출 후 PNG로 저장."""
-  import time
-  
+async def remove_bg(body: RemoveBgRequest, priority: Optional[int] = Query(None, description="작업 우선순위 (클수록 먼저)")):
+  """MobileSAM으로 클릭 포인트 기반 객체 추출 후 PNG로 저장. 작업 큐에 넣고 jobId 반환 (결과는 /jobs/{id})."""
   if not body.points:
     return JSONResponse(status_code=400, content={"error": "At least one point is required"})
   
+  found = _find_source(body.imageId)
+  if isinstance(found, JSONResponse):
+    return found
+  return _job_response(job_queue.submit("remove-bg", body.model_dump(), priority))
+
+
+async def _remove_bg_job(ctx: JobContext, params: dict) -> dict:
+  body = RemoveBgRequest(**params)
   table = get_table()
-  df = table.to_pandas()
-  
-  row = df[df["id"].astype(str) == str(body.imageId).strip()]
-  if row.empty:
-    return JSONResponse(status_code=404, content={"error": "Image not found"})
-  
-  src_row = row.iloc[0]
-  src_filename = src_row.get("filename")
-  src_path = UPLOAD_DIR / str(src_filename)
-  
-  if not src_path.exists():
-    return JSONResponse(status_code=404, content={"error": "Image file not found"})
+  src_row, src_path = _job_source(body.imageId, table)
   
-  new_id = str(int(time.time() * 1000))
+  new_id = _new_image_id()
   new_filename = f"{new_id}.png"
   new_path = UPLOAD_DIR / new_filename
+  thumb_filename = f"{new_id}.webp"
   
   points_data = [{"x": p.x, "y": p.y, "label": p.label} for p in body.points]
   invert_mask = body.mode == "remove"
   
   lock = _get_mobilesam_lock()
   async with lock:
-    try:
-      success = await asyncio.to_thread(
-        run_mobilesam_segmentation,
-        src_path,
-        points_data,
-        new_path,
-        invert_mask
-      )
-      if not success:
-        return JSONResponse(status_code=500, content={"error": "Segmentation failed"})
-    except Exception as e:
-      return JSONResponse(status_code=500, content={"error": f"Segmentation failed: {str(e)}"})
-  
-  try:
-    result_img = Image.open(new_path)
-    width, height = result_img.size
-  except Exception as e:
-    return JSONResponse(status_code=500, content={"error": f"Failed to read result: {str(e)}"})
+    result = await asyncio.to_thread(
+      run_mobilesam_segmentation,
+      src_path,
+      points_data,
+      invert_mask,
+      body.imageId,
+      body.sessionId,
+    )
+  # PNG 인코딩·썸네일은 잠금을 놓은 뒤 (다음 미리보기·누끼가 기다리지 않도록)
+  if result is None or not await asyncio.to_thread(save_segmentation, result, new_path, THUMB_DIR / thumb_filename):
+    raise JobError("Segmentation failed")
+  ctx.progress(0.5, step="indexing")
   
-  thumb_filename = f"{new_id}.webp"
-  thumb_path = THUMB_DIR / thumb_filename
   try:
-    thumb_img = result_img.copy()
-    thumb_img.thumbnail((THUMB_MAX_SIZE, THUMB_MAX_SIZE), Image.Resampling.LANCZOS)
-    if thumb_img.mode == "RGBA":
-      bg = Image.new("RGB", thumb_img.size, (255, 255, 255))
-      bg.paste(thumb_img, mask=thumb_img.split()[-1])
-      thumb_img = bg
-    thumb_img.save(thumb_path, "WEBP", quality=THUMB_WEBP_QUALITY)
+    with Image.open(new_path) as result_img:
+      width, height = result_img.size
   except Exception as e:
-    print(f"Thumbnail creation failed: {e}")
+    raise JobError(f"Failed to read result: {str(e)}")
   
   src_original = src_row.get("originalName", "image")
   src_base = Path(src_original).stem
   new_original = f"{src_base}_nukki.png"
   
-  src_tags = src_row.get("tags")
-  if hasattr(src_tags, "tolist"):
-    src_tags = src_tags.tolist()
-  if not isinstance(src_tags, list):
-    src_tags = []
-  
   vector = ZERO_VECTOR
   try:
     vec = await encode_image_path(new_path)
@@ -1028,23 +1352,80 @@ async def remove_bg(body: RemoveBgRequest):
   except Exception:
     pass
   
-  import datetime
   new_row = {
     "id": new_id,
     "filename": new_filename,
     "thumbnail": thumb_filename,
     "originalName": new_original,
-    "tags": src_tags,
+    "tags": _source_tags(src_row),
     "width": width,
     "height": height,
     "notes": "",
-    "createdAt": datetime.datetime.now().isoformat(),
+    "createdAt": datetime.now().isoformat(),
     "vector": vector,
+    "phash": await asyncio.to_thread(phash_path, new_path),
   }
-  table.add([new_row])
+  await asyncio.to_thread(table.add, [new_row])
+  _index_added_row(new_row)
+  schedule_reindex_check(table)
   
-  response_row = {k: v for k, v in new_row.items() if k != "vector"}
-  return {"success": True, "image": response_row}
+  return {"success": True, "image": _public_row(new_row)}
+
+
+# 작업 큐: 편집기에서 기다리는 누끼가 가장 먼저, 백필은 가장 나중
+job_queue.register("remove-bg", _remove_bg_job, priority=10)
+job_queue.register("convert", _convert_job, priority=5)
+job_queue.register("convert-batch", _convert_batch_job, priority=0)
+job_queue.register("upscale", _upscale_job, priority=0)
+job_queue.register("backfill-embeddings", _backfill_embeddings_job, priority=-10)
+
+
+@app.get("/jobs")
+def list_jobs(
+  status: Optional[Literal["queued", "running", "succeeded", "failed", "cancelled"]] = None,
+  kind: Optional[str] = None,
+  limit: int = Query(50, ge=1, le=500),
+):
+  """최근 작업 목록 (최신순)과 종류별 대기·실행 수."""
+  return {"jobs": job_queue.list_jobs(status, kind, limit), "active": job_queue.counts()}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+  """작업 상태: status(queued/running/succeeded/failed/cancelled), progress(0~1), detail, result, error."""
+  job = job_queue.get(job_id)
+  if job is None:
+    return JSONResponse(status_code=404, content={"error": "Job not found"})
+  return job
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+  """대기 중인 작업은 바로 취소, 실행 중인 작업은 다음 진행 보고 시점에 멈춤."""
+  job = job_queue.cancel(job_id)
+  if job is None:
+    return JSONResponse(status_code=404, content={"error": "Job not found"})
+  return job
+
+
+@app.get("/admin/models")
+def models_status():
+  """모델 레지스트리 상태: 예산·사용량, 모델별 로드 여부·크기·참조 수, 최근 로드/언로드 이벤트, SAM 임베딩 캐시."""
+  return {**model_registry.stats(), "samEmbeddings": sam_cache.stats()}
+
+
+@app.get("/admin/index-status")
+def admin_index_status():
+  """벡터 ANN 인덱스 상태 (유무, 인덱싱/미인덱싱 행 수, 검색 파라미터)."""
+  return index_status(get_table())
+
+
+@app.post("/admin/reindex")
+def admin_reindex(force: bool = Query(True, description="임계값과 무관하게 재빌드")):
+  """벡터 ANN 인덱스 (재)빌드. 빌드가 끝날 때까지 대기."""
+  table = get_table()
+  maybe_reindex(table, force=force)
+  return index_status(table)
 
 
 @app.get("/tunnel-url")
@@ -1053,10 +1434,3 @@ def tunnel_url():
   url = get_tunnel_url()
   return {"url": url}
 
-
-if __name__ == "__main__":
-  import uvicorn
-
-  # Next.js(3000)로 퀵 터널 연결 → 폰에서 같은 갤러리 접속 가능
-  threading.Thread(target=lambda: start_tunnel("http://localhost:3000"), daemon=True).start()
-  uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,58 @@
+# server/mask_codec.py — 누끼 미리보기 마스크의 축소와 작은 바이너리 인코딩
+# 미리보기는 클라이언트 표시 크기로 줄인 마스크를 런 길이(rle) 또는 비트 패킹(bits)으로 보내고,
+# 원본 해상도 마스크는 최종 /remove-bg 결과 PNG 에만 씁니다.
+#
+#   rle  : 행 우선으로 펼친 마스크의 연속 구간 길이 (uint32 little-endian). 0(배경) 구간부터 시작해 0/1 이 번갈아 나옴.
+#   bits : 행 우선 1비트/픽셀 (np.packbits, 상위 비트 먼저). 마지막 바이트의 남는 비트는 0.
+
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+PREVIEW_MASK_MAX_SIZE = 2048  # 미리보기 마스크 긴 변 상한 (클라이언트가 더 크게 요청해도)
+MASK_ENCODINGS = ("png", "rle", "bits")
+
+
+def downscale_mask(mask: np.ndarray, max_size: Optional[int] = None) -> np.ndarray:
+    """긴 변이 max_size(없으면 PREVIEW_MASK_MAX_SIZE) 이하가 되도록 면적 평균으로 축소한 bool 마스크."""
+    limit = min(max_size or PREVIEW_MASK_MAX_SIZE, PREVIEW_MASK_MAX_SIZE)
+    h, w = mask.shape[:2]
+    if max(h, w) <= limit:
+        return mask.astype(bool, copy=False)
+    scale = limit / max(h, w)
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    small = Image.fromarray(mask.astype(np.uint8) * 255).resize(size, Image.Resampling.BOX)
+    return np.asarray(small) >= 128
+
+
+def encode_rle(mask: np.ndarray) -> bytes:
+    flat = mask.ravel().astype(bool)
+    if flat.size == 0:
+        return b""
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], changes, [flat.size]))
+    counts = np.diff(bounds)
+    if flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts.astype("<u4").tobytes()
+
+
+def encode_bits(mask: np.ndarray) -> bytes:
+    return np.packbits(mask.ravel().astype(bool)).tobytes()
+
+
+def encode_png(mask: np.ndarray) -> bytes:
+    import io
+
+    buf = io.BytesIO()
+    Image.fromarray(mask.astype(np.uint8) * 255).save(buf, "PNG", optimize=False, compress_level=1)
+    return buf.getvalue()
+
+
+def encode_mask(mask: np.ndarray, encoding: str) -> bytes:
+    if encoding == "rle":
+        return encode_rle(mask)
+    if encoding == "bits":
+        return encode_bits(mask)
+    return encode_png(mask)
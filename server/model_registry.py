@@ -0,0 +1,216 @@
+# server/model_registry.py — 지연 로딩 모델 공용 레지스트리 (RAM 예산·LRU 축출·유휴 언로드·사용 중 고정)
+# 모델마다 로더와 유휴 시간을 등록해 두고 acquire()/use() 로 빌려 씁니다. 빌려 쓰는 동안은 참조 수로 고정되어
+# 축출되지 않고, 새 모델을 올릴 때 예산(MODEL_RAM_BUDGET_MB)을 넘으면 가장 오래 안 쓴 모델부터 내립니다.
+
+import asyncio
+import gc
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Optional
+
+MODEL_RAM_BUDGET_MB = int(os.environ.get("MODEL_RAM_BUDGET_MB", "6144"))
+REAPER_INTERVAL_SECONDS = 5.0
+EVENT_LOG_SIZE = 100
+
+MB = 1024 * 1024
+
+
+def estimate_size(model) -> int:
+    """모델이 차지하는 대략의 바이트 수 (torch 파라미터·버퍼, ONNX 그래프 크기)."""
+    try:
+        import torch
+    except ImportError:
+        torch = None
+    total = 0
+    seen: set[int] = set()
+    for obj in (model, getattr(model, "model", None), getattr(model, "session", None)):
+        if obj is None or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if torch is not None and isinstance(obj, torch.nn.Module):
+            tensors = list(obj.parameters()) + list(obj.buffers())
+            total += sum(t.numel() * t.element_size() for t in tensors)
+        else:
+            total += int(getattr(obj, "graph_bytes", 0) or 0)
+    return total
+
+
+class _Entry:
+    def __init__(self, name: str, loader: Callable[[], Any], idle_timeout: Optional[float], size_hint: int):
+        self.name = name
+        self.loader = loader
+        self.idle_timeout = idle_timeout
+        self.size_hint = size_hint
+        self.model: Any = None
+        self.size = 0
+        self.refs = 0
+        self.last_used = 0.0
+        self.loads = 0
+        self.load_lock = threading.Lock()
+
+
+class ModelRegistry:
+    """이름 → 지연 로딩 모델. 스레드 안전 (acquire 는 워커 스레드, use 는 이벤트 루프에서 사용)."""
+
+    def __init__(self, budget_mb: int = MODEL_RAM_BUDGET_MB):
+        self.budget_bytes = max(0, budget_mb) * MB
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._events: deque = deque(maxlen=EVENT_LOG_SIZE)
+        self._reaper: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any], idle_timeout: Optional[float] = None,
+                 size_hint_mb: float = 0) -> None:
+        """loader() 로 만드는 모델 등록. idle_timeout 초 동안 안 쓰면 언로드 (None 이면 예산 초과 시에만).
+
+        size_hint_mb 는 첫 로드 전 예산 계산용 크기이자, 파라미터 외 작업 메모리가 큰 모델의 최소 크기.
+        """
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(name, loader, idle_timeout, int(size_hint_mb * MB))
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.model is not None
+
+    def _used_locked(self) -> int:
+        return sum(e.size for e in self._entries.values() if e.model is not None)
+
+    def _event(self, kind: str, entry: _Entry, seconds: float = 0.0, reason: str = "") -> None:
+        self._events.append({
+            "event": kind, "model": entry.name, "seconds": round(seconds, 3), "mb": round(entry.size / MB, 1),
+            "reason": reason, "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        detail = f" in {seconds:.1f}s" if kind == "load" else f" ({reason})"
+        print(f"[models] {kind} {entry.name}{detail}, {entry.size / MB:.0f} MB")
+
+    def _unload(self, entry: _Entry, reason: str) -> bool:
+        with self._lock:
+            if entry.model is None or entry.refs > 0:
+                return False
+            model, entry.model = entry.model, None
+        del model
+        gc.collect()
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        self._event("unload", entry, reason=reason)
+        return True
+
+    def _make_room(self, need: int, exclude: _Entry) -> None:
+        """사용량 + need 가 예산 안에 들어올 때까지 고정되지 않은 모델을 LRU 순으로 언로드."""
+        if not self.budget_bytes:
+            return
+        while True:
+            with self._lock:
+                if self._used_locked() + need <= self.budget_bytes:
+                    return
+                victims = sorted(
+                    (e for e in self._entries.values() if e.model is not None and e.refs == 0 and e is not exclude),
+                    key=lambda e: e.last_used,
+                )
+            if not victims:
+                if need:
+                    print(f"[models] over budget ({self.budget_bytes // MB} MB) with all models in use")
+                return
+            self._unload(victims[0], "budget")
+
+    def _load(self, entry: _Entry) -> None:
+        self._make_room(max(entry.size, entry.size_hint), exclude=entry)
+        started = time.perf_counter()
+        model = entry.loader()
+        seconds = time.perf_counter() - started
+        with self._lock:
+            entry.model = model
+            entry.size = max(estimate_size(model), entry.size_hint)
+            entry.last_used = time.monotonic()
+            entry.loads += 1
+        self._event("load", entry, seconds)
+        self._make_room(0, exclude=entry)
+
+    @contextmanager
+    def acquire(self, name: str):
+        """모델을 (필요하면 로드해) 빌려 씀. with 블록 동안은 축출·유휴 언로드되지 않음."""
+        entry = self._entries[name]
+        with entry.load_lock:
+            with self._lock:
+                entry.refs += 1
+            try:
+                if entry.model is None:
+                    self._load(entry)
+                model = entry.model
+            except BaseException:
+                with self._lock:
+                    entry.refs -= 1
+                raise
+        try:
+            yield model
+        finally:
+            with self._lock:
+                entry.refs -= 1
+                entry.last_used = time.monotonic()
+            # 모두 사용 중이라 예산을 넘긴 채 올렸던 경우, 고정이 풀리면 다시 맞춤
+            self._make_room(0, exclude=entry)
+            self._ensure_reaper()
+
+    @asynccontextmanager
+    async def use(self, name: str):
+        """acquire 의 비동기 버전. 로드·언로드는 워커 스레드에서 수행."""
+        cm = self.acquire(name)
+        model = await asyncio.to_thread(cm.__enter__)
+        try:
+            yield model
+        finally:
+            await asyncio.to_thread(cm.__exit__, None, None, None)
+
+    def unload(self, name: str, reason: str = "manual") -> bool:
+        return self._unload(self._entries[name], reason)
+
+    def _reap_loop(self) -> None:
+        while True:
+            time.sleep(REAPER_INTERVAL_SECONDS)
+            now = time.monotonic()
+            with self._lock:
+                idle = [
+                    e for e in self._entries.values()
+                    if e.model is not None and e.refs == 0 and e.idle_timeout is not None
+                    and now - e.last_used >= e.idle_timeout
+                ]
+            for entry in idle:
+                self._unload(entry, "idle")
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True, name="model-reaper")
+            self._reaper.start()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                e.name: {
+                    "loaded": e.model is not None,
+                    "mb": round(e.size / MB, 1),
+                    "refs": e.refs,
+                    "loads": e.loads,
+                    "idleTimeout": e.idle_timeout,
+                    "idleSeconds": round(now - e.last_used, 1) if e.model is not None else None,
+                }
+                for e in self._entries.values()
+            }
+            return {
+                "budgetMb": self.budget_bytes // MB,
+                "usedMb": round(self._used_locked() / MB, 1),
+                "models": models,
+                "events": list(self._events),
+            }
+
+
+registry = ModelRegistry()
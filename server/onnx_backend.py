@@ -0,0 +1,228 @@
+# server/onnx_backend.py — 태거(WD14 EVA02)·CLIP 이미지 인코더의 ONNX Runtime 추론 백엔드
+# 처음 한 번 PyTorch 모델을 ONNX 로 내보내 data/onnx/ 에 캐시하고, 이후에는 그래프만 읽어 ONNX Runtime 으로 실행합니다.
+# 선택: INFERENCE_BACKEND=torch|onnx, 스레드 수: ONNX_INTRA_OP_THREADS, 동적 int8 양자화: ONNX_QUANTIZE=1
+#
+# PyTorch 대비 일치도(태그 집합·벡터 코사인)와 처리량 비교:
+#   python onnx_backend.py --parity --images ../public/uploads --n 32
+
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ONNX_DIR = PROJECT_ROOT / "data" / "onnx"
+
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch").lower()  # torch | onnx
+ONNX_INTRA_OP_THREADS = int(os.environ.get("ONNX_INTRA_OP_THREADS", "0"))  # 0 = ONNX Runtime 기본값
+ONNX_QUANTIZE = os.environ.get("ONNX_QUANTIZE", "0").lower() in ("1", "true", "yes")
+ONNX_OPSET = 17
+
+
+def use_onnx() -> bool:
+    return INFERENCE_BACKEND == "onnx"
+
+
+def _slug(model_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model_id)
+
+
+def graph_path(model_id: str, quantized: bool = False) -> Path:
+    return ONNX_DIR / f"{_slug(model_id)}{'.int8' if quantized else ''}.onnx"
+
+
+def _export(module, dummy, path: Path, output_name: str) -> None:
+    """torch 모듈 → ONNX (배치 축 동적). 임시 파일에 쓴 뒤 교체."""
+    import torch
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.onnx")
+    module.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            module, (dummy,), str(tmp),
+            input_names=["pixel_values"], output_names=[output_name],
+            dynamic_axes={"pixel_values": {0: "batch"}, output_name: {0: "batch"}},
+            opset_version=ONNX_OPSET,
+        )
+    os.replace(tmp, path)
+
+
+def _quantize(src: Path, dst: Path) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp = dst.with_suffix(".tmp.onnx")
+    quantize_dynamic(str(src), str(tmp), weight_type=QuantType.QInt8)
+    os.replace(tmp, dst)
+
+
+def ensure_graph(model_id: str, export: Callable[[Path], None], quantize: Optional[bool] = None) -> Path:
+    """캐시된 그래프 경로. 없으면 export(path) 로 만들고, 양자화가 켜져 있으면 int8 그래프도 만듦."""
+    quantize = ONNX_QUANTIZE if quantize is None else quantize
+    fp32 = graph_path(model_id)
+    if not fp32.exists():
+        started = time.perf_counter()
+        export(fp32)
+        print(f"Exported {model_id} to ONNX in {time.perf_counter() - started:.1f}s -> {fp32}")
+    if not quantize:
+        return fp32
+    int8 = graph_path(model_id, quantized=True)
+    if not int8.exists():
+        _quantize(fp32, int8)
+        print(f"Quantized {model_id} (dynamic int8) -> {int8}")
+    return int8
+
+
+def make_session(path: Path, intra_op_threads: Optional[int] = None):
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    threads = ONNX_INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+    if threads > 0:
+        opts.intra_op_num_threads = threads
+    providers = [p for p in ("CUDAExecutionProvider", "CPUExecutionProvider") if p in ort.get_available_providers()]
+    session = ort.InferenceSession(str(path), sess_options=opts, providers=providers)
+    session.graph_bytes = path.stat().st_size  # model_registry 메모리 추정용
+    return session
+
+
+# ── WD14 태거 ──
+
+def tagger_session(model_id: str, load_torch_model: Callable[[], object], image_size: int = 448,
+                   quantize: Optional[bool] = None, intra_op_threads: Optional[int] = None):
+    """태거 ONNX 세션. 그래프가 캐시돼 있으면 PyTorch 모델을 읽지 않음."""
+    import torch
+
+    def export(path: Path) -> None:
+        model = load_torch_model().to("cpu")
+        _export(model, torch.zeros(1, 3, image_size, image_size), path, "logits")
+
+    return make_session(ensure_graph(model_id, export, quantize), intra_op_threads)
+
+
+# ── CLIP 이미지 인코더 ──
+
+def _clip_vision_module(st_model):
+    """SentenceTransformer CLIP 의 이미지 경로(get_image_features)만 감싼 torch 모듈."""
+    import torch
+
+    clip = st_model[0].model
+
+    class ClipVision(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.clip = clip
+
+        def forward(self, pixel_values):
+            return self.clip.get_image_features(pixel_values=pixel_values)
+
+    return ClipVision()
+
+
+class OnnxClipImageEncoder:
+    """SentenceTransformer.encode 와 같은 방식으로 쓰는 ONNX CLIP 이미지 인코더 (이미지 입력 전용).
+
+    전처리는 CLIPImageProcessor 기본값(224 중앙 크롭, OpenAI CLIP 평균·표준편차) = clip-ViT-B-32 설정.
+    """
+
+    def __init__(self, model_id: str, quantize: Optional[bool] = None, intra_op_threads: Optional[int] = None):
+        from transformers import CLIPImageProcessor
+
+        self.model_id = model_id
+        self.processor = CLIPImageProcessor()
+
+        def export(path: Path) -> None:
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            st = SentenceTransformer(model_id, device="cpu")
+            size = self.processor.crop_size["height"]
+            _export(_clip_vision_module(st), torch.zeros(1, 3, size, size), path, "image_embeds")
+
+        self.session = make_session(ensure_graph(model_id, export, quantize), intra_op_threads)
+
+    def encode(self, images, batch_size: int = 32, show_progress_bar: bool = False, **_kwargs) -> np.ndarray:
+        single = not isinstance(images, (list, tuple))
+        items = [images] if single else list(images)
+        out = []
+        for start in range(0, len(items), max(1, batch_size)):
+            pixels = self.processor(images=items[start:start + batch_size], return_tensors="np")["pixel_values"]
+            out.append(self.session.run(None, {"pixel_values": pixels.astype(np.float32)})[0])
+        vecs = np.concatenate(out) if out else np.zeros((0, 0), dtype=np.float32)
+        return vecs[0] if single else vecs
+
+
+# ── 일치도·처리량 비교 ──
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return np.einsum("ij,ij->i", a, b)
+
+
+def _timed(fn, *args) -> tuple[object, float]:
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def _parity(image_dir: Path, n: int, batch_size: int, threshold: float, quantize: bool) -> None:
+    from PIL import Image
+    from sentence_transformers import SentenceTransformer
+
+    from embedder import CLIP_MODEL_ID
+    from tagger import WD14Eva02Tagger
+
+    paths = sorted(p for p in image_dir.iterdir() if p.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp"))[:n]
+    if not paths:
+        print(f"No images in {image_dir}")
+        return
+    images = [Image.open(p).convert("RGB") for p in paths]
+    print(f"images={len(images)} batch_size={batch_size} quantize={quantize} threads={ONNX_INTRA_OP_THREADS or 'default'}")
+
+    # 태거
+    torch_tagger = WD14Eva02Tagger(backend="torch")
+    onnx_tagger = WD14Eva02Tagger(backend="onnx", quantize=quantize)
+    torch_tagger.predict_images(images[:1], threshold, batch_size)  # 워밍업
+    onnx_tagger.predict_images(images[:1], threshold, batch_size)
+    torch_tags, t_torch = _timed(torch_tagger.predict_images, images, threshold, batch_size)
+    onnx_tags, t_onnx = _timed(onnx_tagger.predict_images, images, threshold, batch_size)
+    exact = sum(set(a) == set(b) for a, b in zip(torch_tags, onnx_tags))
+    jaccard = np.mean([len(set(a) & set(b)) / max(1, len(set(a) | set(b))) for a, b in zip(torch_tags, onnx_tags)])
+    print(f"[tagger] identical tag sets {exact}/{len(images)}, mean Jaccard {jaccard:.4f}")
+    print(f"[tagger] torch {len(images) / t_torch:.2f} img/s, onnx {len(images) / t_onnx:.2f} img/s "
+          f"({t_torch / max(t_onnx, 1e-9):.2f}x)")
+    del torch_tagger, onnx_tagger
+
+    # CLIP
+    st = SentenceTransformer(CLIP_MODEL_ID)
+    onnx_clip = OnnxClipImageEncoder(CLIP_MODEL_ID, quantize=quantize)
+    st.encode(images[:1])
+    onnx_clip.encode(images[:1])
+    torch_vecs, t_torch = _timed(lambda: st.encode(images, batch_size=batch_size, show_progress_bar=False))
+    onnx_vecs, t_onnx = _timed(lambda: onnx_clip.encode(images, batch_size=batch_size))
+    cos = _cosine(np.asarray(torch_vecs, dtype=np.float32), onnx_vecs)
+    print(f"[clip] cosine vs torch: min {cos.min():.5f}, mean {cos.mean():.5f}")
+    print(f"[clip] torch {len(images) / t_torch:.2f} img/s, onnx {len(images) / t_onnx:.2f} img/s "
+          f"({t_torch / max(t_onnx, 1e-9):.2f}x)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ONNX Runtime 백엔드 일치도·처리량 비교")
+    parser.add_argument("--parity", action="store_true")
+    parser.add_argument("--images", default=str(PROJECT_ROOT / "public" / "uploads"))
+    parser.add_argument("--n", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--threshold", type=float, default=0.35)
+    parser.add_argument("--quantize", action="store_true", help="동적 int8 그래프로 비교")
+    args = parser.parse_args()
+    if args.parity:
+        _parity(Path(args.images), args.n, args.batch_size, args.threshold, args.quantize or ONNX_QUANTIZE)
+    else:
+        parser.print_help()
@@ -0,0 +1,189 @@
+# server/phash.py — 64비트 지각 해시(pHash)와 해밍 거리 인덱스 (정확·재인코딩 중복 탐지용)
+# 인덱스는 multi-index hashing: 64비트를 16비트 4조각으로 나눠 조각별 해시 테이블에 넣고,
+# 비둘기집 원리로 반경 r 이내 후보를 조각 단위 근사 일치로 찾은 뒤 전체 해밍 거리로 확인합니다.
+
+import threading
+from itertools import combinations
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from db import scan_batches
+
+HASH_SIZE = 8  # 8x8 = 64비트
+DCT_SIZE = 32
+CHUNKS = 4
+CHUNK_BITS = 64 // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    mat = np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+    mat[0] /= np.sqrt(2)
+    return mat * np.sqrt(2 / n)
+
+
+_DCT = _dct_matrix(DCT_SIZE)
+
+
+def to_signed(h: int) -> int:
+    """uint64 → int64 (LanceDB BIGINT 컬럼 저장용)."""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def to_unsigned(h: int) -> int:
+    return h + (1 << 64) if h < 0 else h
+
+
+def phash_image(img) -> int:
+    """PIL 이미지 → 64비트 pHash (signed int64). 32x32 회색조 DCT 저주파 8x8 의 중앙값 비교."""
+    from PIL import Image
+
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img, mask=img.split()[-1])
+        img = bg
+    if hasattr(img, "draft"):
+        img.draft("L", (DCT_SIZE * 4, DCT_SIZE * 4))
+    gray = img.convert("L").resize((DCT_SIZE, DCT_SIZE), Image.Resampling.LANCZOS)
+    pixels = np.asarray(gray, dtype=np.float64)
+    coeffs = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    low = coeffs.flatten()
+    bits = low > np.median(low[1:])
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return to_signed(value)
+
+
+def phash_path(path: Path) -> Optional[int]:
+    """이미지 파일 → pHash. 실패 시 None."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            return phash_image(img)
+    except Exception:
+        return None
+
+
+def hamming(a: int, b: int) -> int:
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
+
+
+def _chunks(h: int) -> list[int]:
+    u = to_unsigned(h)
+    return [(u >> (i * CHUNK_BITS)) & CHUNK_MASK for i in range(CHUNKS)]
+
+
+def _variants(chunk: int, radius: int):
+    """chunk 에서 radius 비트 이하로 다른 모든 값."""
+    yield chunk
+    for r in range(1, radius + 1):
+        for bits in combinations(range(CHUNK_BITS), r):
+            v = chunk
+            for b in bits:
+                v ^= 1 << b
+            yield v
+
+
+class PHashIndex:
+    """id → pHash 해밍 거리 인덱스 (multi-index hashing). 스레드 안전."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes: dict[str, int] = {}
+        self._tables: list[dict[int, set[str]]] = [dict() for _ in range(CHUNKS)]
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _remove_locked(self, image_id: str) -> None:
+        old = self._hashes.pop(image_id, None)
+        if old is None:
+            return
+        for table, c in zip(self._tables, _chunks(old)):
+            bucket = table.get(c)
+            if bucket is not None:
+                bucket.discard(image_id)
+                if not bucket:
+                    del table[c]
+
+    def add(self, image_id: str, h: Optional[int]) -> None:
+        if h is None:
+            return
+        image_id = str(image_id)
+        with self._lock:
+            self._remove_locked(image_id)
+            self._hashes[image_id] = int(h)
+            for table, c in zip(self._tables, _chunks(h)):
+                table.setdefault(c, set()).add(image_id)
+
+    def remove(self, image_id: str) -> None:
+        with self._lock:
+            self._remove_locked(str(image_id))
+
+    def load(self, table) -> None:
+        """테이블의 id/phash 컬럼으로 인덱스를 다시 채움."""
+        self.clear()
+        for batch in scan_batches(table, ["id", "phash"], 8192):
+            for image_id, h in zip(batch.column("id").to_pylist(), batch.column("phash").to_pylist()):
+                if image_id is not None and h is not None:
+                    self.add(str(image_id), h)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hashes.clear()
+            for table in self._tables:
+                table.clear()
+
+    def _query_locked(self, h: int, radius: int) -> list[tuple[str, int]]:
+        # 반경 radius 이내면 적어도 한 조각은 radius // CHUNKS 비트 이하로 다름 (비둘기집 원리)
+        sub_radius = radius // CHUNKS
+        candidates: set[str] = set()
+        for table, c in zip(self._tables, _chunks(h)):
+            for v in _variants(c, sub_radius):
+                bucket = table.get(v)
+                if bucket:
+                    candidates.update(bucket)
+        out = []
+        for cid in candidates:
+            d = hamming(h, self._hashes[cid])
+            if d <= radius:
+                out.append((cid, d))
+        out.sort(key=lambda x: x[1])
+        return out
+
+    def query(self, h: int, radius: int = 4) -> list[tuple[str, int]]:
+        """해밍 거리 radius 이내 (id, 거리) 목록 (가까운 순)."""
+        with self._lock:
+            return self._query_locked(int(h), radius)
+
+    def groups(self, radius: int = 4) -> list[list[str]]:
+        """해밍 거리 radius 이내로 연결된 그룹 (2장 이상, 큰 그룹 순)."""
+        parent: dict[str, str] = {}
+
+        def find(x: str) -> str:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        with self._lock:
+            for image_id, h in self._hashes.items():
+                for other, _ in self._query_locked(h, radius):
+                    if other != image_id:
+                        ra, rb = find(image_id), find(other)
+                        if ra != rb:
+                            parent[ra] = rb
+        grouped: dict[str, list[str]] = {}
+        for x in list(parent):
+            grouped.setdefault(find(x), []).append(x)
+        out = [g for g in grouped.values() if len(g) >= 2]
+        out.sort(key=lambda g: -len(g))
+        return out
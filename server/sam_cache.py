@@ -0,0 +1,160 @@
+# server/sam_cache.py — MobileSAM 이미지 임베딩 LRU 캐시와 클릭 세션별 저해상도 마스크 로짓
+# set_image()(ViT 인코더)는 이미지당 한 번만 돌리고, 같은 imageId 의 미리보기·최종 추출은 캐시된 임베딩을 복원해
+# 디코더만 실행합니다. 세션(sessionId)마다 직전 예측의 저해상도 로짓을 보관해, 포인트가 이어서 추가되면 mask_input 으로 넘깁니다.
+# 용량은 임베딩·로짓 텐서의 바이트 합으로 재고, MOBILESAM_CACHE_MB 를 넘으면 가장 오래 안 쓴 이미지부터 버립니다.
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+MOBILESAM_CACHE_MB = int(os.environ.get("MOBILESAM_CACHE_MB", "256"))
+SESSIONS_PER_IMAGE = 8  # 이미지당 보관할 클릭 세션 수
+
+MB = 1024 * 1024
+
+
+def _nbytes(t) -> int:
+    if t is None:
+        return 0
+    if hasattr(t, "element_size"):
+        return t.numel() * t.element_size()
+    return int(getattr(t, "nbytes", 0))
+
+
+class _Session:
+    def __init__(self, points: tuple, mask_input: Optional[np.ndarray], multimask: bool, logits: np.ndarray):
+        self.points = points  # ((x, y, label), ...)
+        self.mask_input = mask_input  # 이 예측에 넣었던 mask_input (같은 포인트 재요청 시 그대로 재현)
+        self.multimask = multimask
+        self.logits = logits  # 선택된 마스크의 저해상도 로짓 (256x256)
+
+    @property
+    def nbytes(self) -> int:
+        return _nbytes(self.mask_input) + _nbytes(self.logits)
+
+
+class _Embedding:
+    def __init__(self, features, original_size, input_size, mtime_ns: int):
+        self.features = features
+        self.original_size = original_size
+        self.input_size = input_size
+        self.mtime_ns = mtime_ns
+        self.sessions: OrderedDict[str, _Session] = OrderedDict()
+
+    @property
+    def nbytes(self) -> int:
+        return _nbytes(self.features) + sum(s.nbytes for s in self.sessions.values())
+
+
+class SamEmbeddingCache:
+    """imageId → SamPredictor 임베딩. 스레드 안전 (predictor 자체는 호출 측에서 직렬화)."""
+
+    def __init__(self, max_mb: int = MOBILESAM_CACHE_MB):
+        self.max_bytes = max(0, max_mb) * MB
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Embedding] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evict_locked(self, keep: str) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, entry = next(iter(self._entries.items()))
+            if key == keep:
+                self._entries.move_to_end(key)
+                continue
+            del self._entries[key]
+            self._bytes -= entry.nbytes
+            self.evictions += 1
+
+    def prepare(self, predictor, image_id: str, path: Path, read_rgb: Callable[[], np.ndarray]) -> bool:
+        """predictor 에 image_id 의 임베딩을 올림. 캐시에 있으면 복원(True), 없으면 read_rgb() 로 인코딩(False)."""
+        image_id = str(image_id)
+        mtime_ns = path.stat().st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(image_id)
+            if entry is not None and entry.mtime_ns == mtime_ns:
+                self._entries.move_to_end(image_id)
+                self.hits += 1
+                predictor.reset_image()
+                predictor.features = entry.features
+                predictor.original_size = entry.original_size
+                predictor.input_size = entry.input_size
+                predictor.is_image_set = True
+                return True
+            self.misses += 1
+
+        predictor.set_image(read_rgb())
+        entry = _Embedding(predictor.features, predictor.original_size, predictor.input_size, mtime_ns)
+        with self._lock:
+            old = self._entries.pop(image_id, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            if self.max_bytes:
+                self._entries[image_id] = entry
+                self._bytes += entry.nbytes
+                self._evict_locked(image_id)
+        return False
+
+    def predict(self, predictor, image_id: str, session_id: str, points: list) -> np.ndarray:
+        """prepare() 된 predictor 로 포인트 프롬프트 예측. 가장 점수가 높은 마스크(HxW bool) 반환.
+
+        같은 세션에서 이전 포인트에 이어 추가된 경우 직전 저해상도 로짓을 mask_input 으로 사용.
+        """
+        image_id = str(image_id)
+        prompt = tuple((float(p["x"]), float(p["y"]), int(p["label"])) for p in points)
+        with self._lock:
+            entry = self._entries.get(image_id)
+            state = entry.sessions.get(session_id) if entry is not None and session_id else None
+
+        if state is not None and state.points == prompt:
+            mask_input, multimask = state.mask_input, state.multimask
+        elif state is not None and prompt[:len(state.points)] == state.points:
+            mask_input, multimask = state.logits[None, :, :], False
+        else:
+            mask_input, multimask = None, True
+
+        masks, scores, logits = predictor.predict(
+            point_coords=np.array([[x, y] for x, y, _ in prompt]),
+            point_labels=np.array([label for _, _, label in prompt]),
+            mask_input=mask_input,
+            multimask_output=multimask,
+        )
+        best_idx = int(np.argmax(scores))
+
+        if session_id:
+            with self._lock:
+                entry = self._entries.get(image_id)
+                if entry is not None:
+                    old = entry.sessions.pop(session_id, None)
+                    session = _Session(prompt, mask_input, multimask, logits[best_idx].copy())
+                    entry.sessions[session_id] = session
+                    self._bytes += session.nbytes - (old.nbytes if old is not None else 0)
+                    while len(entry.sessions) > SESSIONS_PER_IMAGE:
+                        _, dropped = entry.sessions.popitem(last=False)
+                        self._bytes -= dropped.nbytes
+                    self._evict_locked(image_id)
+        return masks[best_idx]
+
+    def discard(self, image_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(str(image_id), None)
+            if entry is not None:
+                self._bytes -= entry.nbytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "images": len(self._entries),
+                "sessions": sum(len(e.sessions) for e in self._entries.values()),
+                "mb": round(self._bytes / MB, 1),
+                "maxMb": self.max_bytes // MB,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -22,3 +22,10 @@ class ImageRow(LanceModel):
     notes: str = ""
     createdAt: str
     vector: Vector(VECTOR_DIM)
+    # 64비트 지각 해시 (phash.py). 계산 전이거나 실패하면 None
+    phash: Optional[int] = None
+
+
+# API 응답에서 제외하는 내부 컬럼
+INTERNAL_COLUMNS = ("vector", "phash")
+PUBLIC_COLUMNS = [f for f in ImageRow.model_fields if f not in INTERNAL_COLUMNS]
@@ -0,0 +1,16 @@
+# server/serve.py — 백엔드 실행 진입점 (python serve.py, run.bat; python main.py 도 여기로 넘어옴)
+# 이 작은 파일을 __main__ 으로 둡니다. spawn 방식 프로세스 풀(일괄 변환)의 워커는 시작할 때 부모의 __main__ 을
+# 다시 실행하는데, main.py 가 __main__ 이면 워커마다 FastAPI 앱·작업 큐·모델 레지스트리를 다시 만들게 됩니다.
+# 여기서는 모든 import 가 __main__ 가드 안에 있어 워커는 convert.py·derivatives.py 만 불러옵니다.
+
+if __name__ == "__main__":
+    import threading
+
+    import uvicorn
+
+    from main import app
+    from tunnel import start_tunnel
+
+    # Next.js(3000)로 퀵 터널 연결 → 폰에서 같은 갤러리 접속 가능
+    threading.Thread(target=lambda: start_tunnel("http://localhost:3000"), daemon=True).start()
+    uvicorn.run(app, host="0.0.0.0", port=8000)
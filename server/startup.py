@@ -0,0 +1,135 @@
+# server/startup.py — 빠른 시작 지원: 모듈별 import 시간 측정과 서브시스템 준비 상태
+# main.py 맨 위에서 install_import_timer() 를 호출하면, 그 뒤 최상위에서 처음 import 되는 모듈마다
+# (하위 import 포함) 걸린 시간을 기록해 부팅 시 표로 출력합니다. 무거운 준비 작업은 start_subsystem() 으로
+# 백그라운드에서 돌리고, /health 는 subsystems() 로 서브시스템별 상태를 보여 줍니다.
+# 로드 중인 메모리 색인에 대한 쓰기는 WriteBuffer 에 모았다가 로드 직후 순서대로 적용합니다.
+
+import builtins
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+IMPORT_REPORT_MIN_MS = 5.0  # 이보다 짧은 import 는 표에서 생략
+
+_orig_import = builtins.__import__
+_local = threading.local()
+_import_times: dict[str, float] = {}
+_boot_started = time.perf_counter()
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # 상대 import·이미 로드된 모듈·다른 import 안에서 일어난 import 는 바깥 모듈 시간에 포함
+    if level != 0 or getattr(_local, "depth", 0) > 0 or name in sys.modules:
+        return _orig_import(name, globals, locals, fromlist, level)
+    _local.depth = 1
+    started = time.perf_counter()
+    try:
+        return _orig_import(name, globals, locals, fromlist, level)
+    finally:
+        _local.depth = 0
+        _import_times[name] = _import_times.get(name, 0.0) + time.perf_counter() - started
+
+
+def install_import_timer() -> None:
+    builtins.__import__ = _timed_import
+
+
+def uninstall_import_timer() -> None:
+    builtins.__import__ = _orig_import
+
+
+def import_times() -> dict[str, float]:
+    """모듈 → import 초 (오래 걸린 순)."""
+    return dict(sorted(_import_times.items(), key=lambda x: -x[1]))
+
+
+def print_import_report() -> None:
+    total = time.perf_counter() - _boot_started
+    rows = [(name, sec) for name, sec in import_times().items() if sec * 1000 >= IMPORT_REPORT_MIN_MS]
+    print(f"Startup imports ({total:.2f}s since boot):")
+    for name, sec in rows:
+        print(f"  {sec * 1000:8.1f} ms  {name}")
+
+
+# ── 서브시스템 준비 상태 ──
+
+_subsystems_lock = threading.Lock()
+_subsystems: dict[str, dict] = {}
+
+
+def _set(name: str, **fields) -> None:
+    with _subsystems_lock:
+        _subsystems.setdefault(name, {"state": "pending", "seconds": None, "error": None}).update(fields)
+
+
+def start_subsystem(name: str, fn: Callable[[], None], after: Optional[threading.Event] = None) -> threading.Event:
+    """fn 을 백그라운드 스레드에서 실행하고 상태를 기록. after 가 있으면 그 이벤트 이후 시작. 완료 이벤트 반환."""
+    done = threading.Event()
+    _set(name)
+
+    def run():
+        if after is not None:
+            after.wait()
+        _set(name, state="loading")
+        started = time.perf_counter()
+        try:
+            fn()
+            _set(name, state="ready", seconds=round(time.perf_counter() - started, 2))
+        except Exception as e:
+            traceback.print_exc()
+            _set(name, state="error", seconds=round(time.perf_counter() - started, 2), error=str(e))
+        finally:
+            done.set()
+
+    threading.Thread(target=run, daemon=True, name=f"startup-{name}").start()
+    return done
+
+
+def subsystems() -> dict[str, dict]:
+    with _subsystems_lock:
+        return {name: dict(info) for name, info in _subsystems.items()}
+
+
+def all_ready() -> bool:
+    with _subsystems_lock:
+        return all(info["state"] == "ready" for info in _subsystems.values())
+
+
+def state(name: str) -> str:
+    """서브시스템 상태: pending | loading | ready | error (등록 안 됐으면 unknown)."""
+    with _subsystems_lock:
+        info = _subsystems.get(name)
+        return info["state"] if info else "unknown"
+
+
+class WriteBuffer:
+    """메모리 색인 로드가 끝나기 전에 들어온 쓰기를 모아 두었다가 flush() 때 순서대로 적용.
+
+    load() 는 상태를 통째로 다시 만들므로 로드 중 직접 쓰면 사라집니다. 쓰기는 모두 멱등
+    (같은 행을 로드가 이미 읽었어도 다시 적용해 같은 결과)이어야 합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: list[Callable[[], None]] = []
+        self._open = False
+
+    def run(self, fn: Callable[[], None]) -> None:
+        with self._lock:
+            if not self._open:
+                self._pending.append(fn)
+                return
+            fn()
+
+    def flush(self) -> None:
+        """로드 직후 호출. 모아 둔 쓰기를 적용하고 이후 쓰기는 바로 실행."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            for fn in pending:
+                try:
+                    fn()
+                except Exception:
+                    traceback.print_exc()
+            self._open = True
@@ -0,0 +1,254 @@
+# server/tag_index.py — 태그 → 행 번호 압축 비트맵(Roaring) 역색인과 불리언 태그 질의
+# 시작 시 id/tags 컬럼으로 한 번 채우고, 쓰기 경로(main.py)에서 증분 갱신합니다.
+# 행 번호(ordinal)는 id 순서대로 부여하고 새 행은 뒤에 붙이므로, 큰 번호일수록 최신 이미지입니다.
+#
+# 질의 문법 (연산자는 대문자만 인식 — 태그는 소문자):
+#   long hair AND (red eyes OR blue eyes) AND NOT hat
+#   long hair & !hat | "hatsune miku (vocaloid)"
+#   공백으로 이어진 단어는 하나의 태그, 괄호가 들어간 태그는 따옴표로 감쌈. 우선순위: NOT > AND > OR
+
+import re
+import threading
+from typing import Optional
+
+from pyroaring import BitMap
+
+from db import scan_batches
+from tag_ops import normalize_mapping, normalize_tag
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|(&|\||!)|([^\s()&|!"]+))')
+_KEYWORDS = {"AND": "&", "OR": "|", "NOT": "!"}
+
+
+class TagQueryError(ValueError):
+    pass
+
+
+def _tokenize(expr: str) -> list[tuple[str, str]]:
+    """("op", "&|!()") 또는 ("tag", 이름) 토큰 목록. 연속된 단어는 공백으로 이어 하나의 태그로 합침."""
+    tokens: list[tuple[str, str]] = []
+    words: list[str] = []
+
+    def flush():
+        if words:
+            tokens.append(("tag", normalize_tag(" ".join(words))))
+            words.clear()
+
+    pos = 0
+    expr = expr.strip()
+    while pos < len(expr):
+        m = _TOKEN_RE.match(expr, pos)
+        if m is None or m.end() == pos:
+            raise TagQueryError(f"Unexpected character at {pos}: {expr[pos:pos + 10]!r}")
+        pos = m.end()
+        lpar, rpar, quoted, op, word = m.groups()
+        if word is not None and word not in _KEYWORDS:
+            words.append(word)
+            continue
+        flush()
+        if quoted is not None:
+            tokens.append(("tag", normalize_tag(re.sub(r"\\(.)", r"\1", quoted))))
+        elif lpar or rpar:
+            tokens.append(("op", lpar or rpar))
+        else:
+            tokens.append(("op", _KEYWORDS.get(word, op)))
+    flush()
+    return tokens
+
+
+class TagBitmapIndex:
+    """정규화된 태그 → 행 번호 BitMap. 스레드 안전."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bitmaps: dict[str, BitMap] = {}
+        self._all = BitMap()
+        self._ord_by_id: dict[str, int] = {}
+        self._ids: list[Optional[str]] = []  # 행 번호 → id (삭제된 번호는 None)
+        self._tags_by_id: dict[str, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    @staticmethod
+    def _normalize(tags) -> tuple[str, ...]:
+        return tuple(dict.fromkeys(normalize_tag(t) for t in (tags or []) if t and normalize_tag(t)))
+
+    def _unset_locked(self, image_id: str) -> Optional[int]:
+        ordinal = self._ord_by_id.get(image_id)
+        if ordinal is None:
+            return None
+        for tag in self._tags_by_id.pop(image_id, ()):
+            bm = self._bitmaps.get(tag)
+            if bm is not None:
+                bm.discard(ordinal)
+                if not bm:
+                    del self._bitmaps[tag]
+        return ordinal
+
+    def _set_locked(self, image_id: str, tags) -> tuple[str, ...]:
+        old = self._tags_by_id.get(image_id, ())
+        ordinal = self._unset_locked(image_id)
+        if ordinal is None:
+            ordinal = len(self._ids)
+            self._ids.append(image_id)
+            self._ord_by_id[image_id] = ordinal
+            self._all.add(ordinal)
+        norm = self._normalize(tags)
+        self._tags_by_id[image_id] = norm
+        for tag in norm:
+            bm = self._bitmaps.get(tag)
+            if bm is None:
+                bm = self._bitmaps[tag] = BitMap()
+            bm.add(ordinal)
+        return old
+
+    def set_tags(self, image_id: str, tags) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """행 추가 또는 태그 교체. (이전 태그, 새 태그) 반환 (정규화된 값)."""
+        image_id = str(image_id)
+        with self._lock:
+            old = self._set_locked(image_id, tags)
+            return old, self._tags_by_id[image_id]
+
+    def get_tags(self, image_id: str) -> tuple[str, ...]:
+        with self._lock:
+            return self._tags_by_id.get(str(image_id), ())
+
+    def remove(self, image_id: str) -> tuple[str, ...]:
+        """행 삭제. 삭제된 행의 태그 반환."""
+        image_id = str(image_id)
+        with self._lock:
+            old = self._tags_by_id.get(image_id, ())
+            ordinal = self._unset_locked(image_id)
+            if ordinal is None:
+                return ()
+            del self._ord_by_id[image_id]
+            self._ids[ordinal] = None
+            self._all.discard(ordinal)
+            return old
+
+    def rewrite(self, mapping: dict[str, Optional[str]]) -> list[tuple[tuple[str, ...], tuple[str, ...]]]:
+        """tag_ops.rewrite_tags 와 같은 매핑(기존 태그 → 새 태그, None 이면 제거)을 색인에 반영.
+
+        tag_ops 와 같이 한 번에 적용: 바꿀 태그의 비트맵을 모두 떼어 낸 뒤 대상에 합치므로
+        a→b, b→c 여도 a 는 b 로, b 는 c 로 갑니다 (순서대로 적용하면 a 가 c 까지 밀려감).
+        바뀐 행마다 (이전 태그, 새 태그) 목록 반환.
+        """
+        targets = {k: (normalize_tag(v) if v else None) for k, v in normalize_mapping(mapping).items()}
+        with self._lock:
+            popped = {old: self._bitmaps.pop(old) for old in targets if old in self._bitmaps}
+            if not popped:
+                return []
+            for old, bm in popped.items():
+                target = targets[old]
+                if target:
+                    merged = self._bitmaps.get(target)
+                    self._bitmaps[target] = bm if merged is None else merged | bm
+            changes = []
+            for ordinal in BitMap.union(*popped.values()):
+                image_id = self._ids[ordinal]
+                current = self._tags_by_id.get(image_id, ())
+                tags = [targets[t] if t in targets else t for t in current]
+                self._tags_by_id[image_id] = tuple(dict.fromkeys(t for t in tags if t))
+                changes.append((current, self._tags_by_id[image_id]))
+            return changes
+
+    def all_tags(self) -> list[tuple[str, ...]]:
+        """행별 정규화 태그 목록 (통계 초기화용)."""
+        with self._lock:
+            return list(self._tags_by_id.values())
+
+    def load(self, table) -> None:
+        """테이블의 id/tags 컬럼으로 색인을 다시 채움 (id 오름차순으로 행 번호 부여)."""
+        rows: list[tuple[str, list]] = []
+        for batch in scan_batches(table, ["id", "tags"], 8192):
+            for image_id, tags in zip(batch.column("id").to_pylist(), batch.column("tags").to_pylist()):
+                if image_id is not None:
+                    rows.append((str(image_id), tags or []))
+        rows.sort(key=lambda r: (len(r[0]), r[0]))
+        with self._lock:
+            self._bitmaps.clear()
+            self._all = BitMap()
+            self._ord_by_id.clear()
+            self._ids.clear()
+            self._tags_by_id.clear()
+            for image_id, tags in rows:
+                self._set_locked(image_id, tags)
+
+    # ── 질의 ──
+
+    def _eval_locked(self, tokens: list[tuple[str, str]]) -> BitMap:
+        pos = 0
+
+        def peek():
+            return tokens[pos] if pos < len(tokens) else (None, None)
+
+        def parse_or() -> BitMap:
+            nonlocal pos
+            result = parse_and()
+            while peek() == ("op", "|"):
+                pos += 1
+                result = result | parse_and()
+            return result
+
+        def parse_and() -> BitMap:
+            nonlocal pos
+            result = parse_not()
+            while True:
+                kind, value = peek()
+                if (kind, value) == ("op", "&"):
+                    pos += 1
+                elif not (kind == "tag" or value in ("!", "(")):
+                    return result
+                result = result & parse_not()  # 연산자 없이 이어지면 AND
+
+        def parse_not() -> BitMap:
+            nonlocal pos
+            if peek() == ("op", "!"):
+                pos += 1
+                return self._all - parse_not()
+            return parse_atom()
+
+        def parse_atom() -> BitMap:
+            nonlocal pos
+            kind, value = peek()
+            if kind == "tag":
+                pos += 1
+                return BitMap(self._bitmaps.get(value, BitMap()))
+            if (kind, value) == ("op", "("):
+                pos += 1
+                result = parse_or()
+                if peek() != ("op", ")"):
+                    raise TagQueryError("Missing ')'")
+                pos += 1
+                return result
+            raise TagQueryError(f"Unexpected token: {value!r}" if value else "Unexpected end of query")
+
+        result = parse_or()
+        if pos != len(tokens):
+            raise TagQueryError(f"Unexpected token: {tokens[pos][1]!r}")
+        return result
+
+    def query(self, expr: str, limit: int = 100, cursor: Optional[int] = None) -> dict:
+        """불리언 태그 식에 맞는 id (최신순) 페이지.
+
+        cursor 는 이전 페이지의 next_cursor (행 번호). 반환: {ids, total, next_cursor}
+        """
+        tokens = _tokenize(expr)
+        with self._lock:
+            result = self._eval_locked(tokens) if tokens else BitMap(self._all)
+            total = len(result)
+            end = result.rank(cursor - 1) if cursor is not None and cursor > 0 else (0 if cursor == 0 else total)
+            start = max(0, end - limit)
+            ordinals = [result[i] for i in range(end - 1, start - 1, -1)]
+            ids = [self._ids[o] for o in ordinals]
+        return {
+            "ids": ids,
+            "total": total,
+            "next_cursor": ordinals[-1] if start > 0 and ordinals else None,
+        }
+
+    def count(self, tag: str) -> int:
+        with self._lock:
+            bm = self._bitmaps.get(normalize_tag(tag))
+            return len(bm) if bm is not None else 0
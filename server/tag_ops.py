@@ -0,0 +1,110 @@
+# server/tag_ops.py — 태그 일괄 편집 (제거·이름 변경·병합)
+# id/tags 컬럼만 스캔해 Arrow compute 로 영향받는 행을 찾고, 변경된 행 전체를 merge_insert 한 번으로 반영합니다.
+
+from typing import Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from db import scan_batches
+
+SCAN_COLUMNS = ["id", "tags"]
+
+
+def normalize_tag(tag) -> str:
+    return str(tag).strip().lower()
+
+
+def normalize_mapping(mapping: dict[str, Optional[str]]) -> dict[str, Optional[str]]:
+    """{기존 태그: 새 태그} → 키는 normalize_tag, 값은 앞뒤 공백 제거 (빈 값·None 은 None = 제거).
+
+    매핑은 기존 태그에 한 번에 적용합니다 (a→b, b→c 를 함께 주면 a 는 c 가 아니라 b, b 는 c).
+    태그 색인(TagBitmapIndex.rewrite)도 같은 함수로 같은 의미를 씁니다.
+    """
+    out: dict[str, Optional[str]] = {}
+    for k, v in mapping.items():
+        key = normalize_tag(k) if k else ""
+        if key:
+            out[key] = v.strip() if isinstance(v, str) and v.strip() else None
+    return out
+
+
+def _rewrite_batch(batch: pa.RecordBatch, keys: pa.Array, targets: list[Optional[str]]):
+    """한 배치에서 변경되는 (id, 새 태그 리스트) 목록 반환."""
+    tags = batch.column("tags")
+    if len(tags) == 0 or len(tags.flatten()) == 0:
+        return []
+    values = tags.flatten()
+    norm = pc.utf8_lower(pc.utf8_trim_whitespace(values))
+    hit_idx = pc.index_in(norm, value_set=keys).to_numpy(zero_copy_only=False)
+    hit = ~np.isnan(hit_idx.astype(np.float64))
+    if not hit.any():
+        return []
+
+    parents = pc.list_parent_indices(tags).to_numpy()
+    changed_rows = np.unique(parents[hit])
+    offsets = tags.offsets.to_numpy()
+    base = offsets[0]
+    ids = batch.column("id")
+    value_list = values.to_pylist()
+    # 이름 변경이 있을 때만 병합으로 생긴 중복 태그를 정리
+    dedupe = any(t is not None for t in targets)
+
+    out = []
+    for row in changed_rows:
+        start, end = offsets[row] - base, offsets[row + 1] - base
+        new_tags: list[str] = []
+        seen: set[str] = set()
+        for i in range(start, end):
+            if hit[i]:
+                tag = targets[int(hit_idx[i])]
+                if tag is None:
+                    continue
+            else:
+                tag = value_list[i]
+            if dedupe:
+                key = normalize_tag(tag)
+                if key in seen:
+                    continue
+                seen.add(key)
+            new_tags.append(tag)
+        old_tags = value_list[start:end]
+        if new_tags != old_tags:
+            out.append((str(ids[int(row)].as_py()), new_tags))
+    return out
+
+
+def rewrite_tags(table, mapping: dict[str, Optional[str]], batch_size: int = 4096) -> int:
+    """mapping(정규화된 기존 태그 → 새 태그, None 이면 제거)을 모든 이미지에 적용. 변경된 이미지 수 반환.
+
+    태그 비교는 앞뒤 공백 제거·소문자 기준 완전 일치. 매핑은 한 번에 적용 (normalize_mapping 참고).
+    """
+    mapping = normalize_mapping(mapping)
+    if not mapping:
+        return 0
+    keys = pa.array(list(mapping.keys()), type=pa.string())
+    targets = list(mapping.values())
+
+    changed: list[tuple[str, list[str]]] = []
+    for batch in scan_batches(table, SCAN_COLUMNS, batch_size):
+        changed.extend(_rewrite_batch(batch, keys, targets))
+    if not changed:
+        return 0
+
+    data = pa.table({
+        "id": pa.array([c[0] for c in changed], type=pa.string()),
+        "tags": pa.array([c[1] for c in changed], type=pa.list_(pa.string())),
+    })
+    table.merge_insert("id").when_matched_update_all().execute(data)
+    return len(changed)
+
+
+def remove_tags(table, tag_names: list[str]) -> int:
+    """tag_names 를 모든 이미지에서 제거."""
+    return rewrite_tags(table, {t: None for t in tag_names if t and str(t).strip()})
+
+
+def rename_tags(table, renames: dict[str, str]) -> int:
+    """태그 이름 변경. 여러 태그를 같은 이름으로 매핑하면 병합되며 이미지 내 중복은 제거."""
+    return rewrite_tags(table, {k: v for k, v in renames.items() if v and str(v).strip()})
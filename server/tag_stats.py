@@ -0,0 +1,182 @@
+# server/tag_stats.py — 태그별 이미지 수와 태그 동시 출현(co-occurrence) 희소 행렬
+# 시작 시 한 번 희소 행렬 곱(Xᵀ·X)으로 만들고, 이후 쓰기 경로에서는 (이전 태그, 새 태그) 차이만 증분 반영합니다.
+# 증분분은 dict 델타에 쌓았다가 FOLD_THRESHOLD 를 넘으면 기본 행렬에 합칩니다.
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from itertools import permutations
+from typing import Iterable, Optional
+
+import numpy as np
+
+FOLD_THRESHOLD = 200_000  # 델타 항목 수가 이보다 많으면 기본 행렬에 합침
+TOP_RESORT_RATIO = 8  # 바뀐 태그가 정렬 목록의 1/8 을 넘으면 제자리 갱신 대신 전체 재정렬
+
+
+class TagStats:
+    """정규화된 태그 기준 이미지 수·동시 출현 수. 스레드 안전."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tag_ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._counts: list[int] = []
+        self._base = None  # scipy.sparse.csr_matrix (태그 x 태그, 대각 0)
+        self._delta: dict[int, dict[int, int]] = {}
+        self._delta_size = 0
+        # top() 정렬 캐시: (-count, name) 오름차순, 그 시점 count, 이후 count 가 바뀐 태그 (읽을 때 반영)
+        self._top: Optional[list[tuple[int, str]]] = None
+        self._top_counts: dict[int, int] = {}
+        self._dirty: set[int] = set()
+
+    def _tag_id(self, tag: str) -> int:
+        tid = self._tag_ids.get(tag)
+        if tid is None:
+            tid = self._tag_ids[tag] = len(self._names)
+            self._names.append(tag)
+            self._counts.append(0)
+        return tid
+
+    def load(self, rows: Iterable[Iterable[str]]) -> None:
+        """행별 (정규화·중복 제거된) 태그 목록으로 통계를 다시 계산."""
+        from scipy import sparse
+
+        with self._lock:
+            self._tag_ids.clear()
+            self._names.clear()
+            self._counts.clear()
+            indptr = [0]
+            indices: list[int] = []
+            for tags in rows:
+                indices.extend(self._tag_id(t) for t in tags)
+                indptr.append(len(indices))
+            n_tags = len(self._names)
+            x = sparse.csr_matrix(
+                (np.ones(len(indices), dtype=np.int32), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+                shape=(len(indptr) - 1, n_tags),
+            )
+            co = (x.T @ x).tocsr()
+            self._counts = [int(c) for c in co.diagonal()]
+            co.setdiag(0)
+            co.eliminate_zeros()
+            self._base = co
+            self._delta.clear()
+            self._delta_size = 0
+            self._top = None
+            self._dirty.clear()
+
+    def _fold_locked(self) -> None:
+        from scipy import sparse
+
+        n = len(self._names)
+        rows, cols, vals = [], [], []
+        for a, row in self._delta.items():
+            for b, v in row.items():
+                rows.append(a)
+                cols.append(b)
+                vals.append(v)
+        delta = sparse.csr_matrix((vals, (rows, cols)), shape=(n, n), dtype=np.int32)
+        base = self._base
+        if base is None:
+            base = sparse.csr_matrix((n, n), dtype=np.int32)
+        elif base.shape[0] < n:
+            base = sparse.csr_matrix((base.data, base.indices, np.pad(base.indptr, (0, n - base.shape[0]), mode="edge")),
+                                     shape=(n, n))
+        merged = (base + delta).tocsr()
+        merged.eliminate_zeros()
+        self._base = merged
+        self._delta.clear()
+        self._delta_size = 0
+
+    def _bump_locked(self, tags: tuple[str, ...], sign: int) -> None:
+        ids = [self._tag_id(t) for t in tags]
+        for tid in ids:
+            self._counts[tid] += sign
+        if self._top is not None:
+            self._dirty.update(ids)
+        for a, b in permutations(ids, 2):
+            row = self._delta.setdefault(a, {})
+            v = row.get(b, 0) + sign
+            if v:
+                if b not in row:
+                    self._delta_size += 1
+                row[b] = v
+            elif b in row:
+                del row[b]
+                self._delta_size -= 1
+
+    def apply(self, old: Iterable[str], new: Iterable[str]) -> None:
+        """한 이미지의 태그가 old → new 로 바뀐 것을 반영 (추가는 old=(), 삭제는 new=())."""
+        old, new = tuple(old or ()), tuple(new or ())
+        if old == new:
+            return
+        with self._lock:
+            if old:
+                self._bump_locked(old, -1)
+            if new:
+                self._bump_locked(new, 1)
+            if self._delta_size > FOLD_THRESHOLD:
+                self._fold_locked()
+
+    def apply_many(self, changes: Iterable[tuple[Iterable[str], Iterable[str]]]) -> None:
+        for old, new in changes:
+            self.apply(old, new)
+
+    def _ranked_locked(self) -> list[tuple[int, str]]:
+        """정렬 캐시를 최신으로. 쓰기 때는 바뀐 태그만 표시하고, 여기서 그 태그들만 빼고 다시 끼워 넣음."""
+        if self._top is not None and len(self._dirty) * TOP_RESORT_RATIO > len(self._top):
+            self._top = None
+        if self._top is None:
+            self._top_counts = {tid: c for tid, c in enumerate(self._counts) if c > 0}
+            self._top = sorted((-c, self._names[tid]) for tid, c in self._top_counts.items())
+        else:
+            for tid in self._dirty:
+                name = self._names[tid]
+                old = self._top_counts.pop(tid, 0)
+                if old > 0:
+                    del self._top[bisect_left(self._top, (-old, name))]
+                c = self._counts[tid]
+                if c > 0:
+                    insort(self._top, (-c, name))
+                    self._top_counts[tid] = c
+        self._dirty.clear()
+        return self._top
+
+    def top(self, limit: int = 100) -> list[dict]:
+        """이미지 수가 많은 태그 순 (같으면 이름 순)."""
+        with self._lock:
+            return [{"tag": name, "count": -neg} for neg, name in self._ranked_locked()[:limit]]
+
+    def total_tags(self) -> int:
+        with self._lock:
+            return len(self._ranked_locked())
+
+    def count(self, tag: str) -> int:
+        with self._lock:
+            tid = self._tag_ids.get(tag)
+            return self._counts[tid] if tid is not None else 0
+
+    def related(self, tag: str, limit: int = 20) -> list[dict]:
+        """tag 와 함께 가장 많이 붙은 태그. score 는 Jaccard (|A∩B| / |A∪B|)."""
+        with self._lock:
+            tid = self._tag_ids.get(tag)
+            if tid is None or self._counts[tid] <= 0:
+                return []
+            co: dict[int, int] = {}
+            base = self._base
+            if base is not None and tid < base.shape[0]:
+                start, end = base.indptr[tid], base.indptr[tid + 1]
+                co.update(zip(base.indices[start:end].tolist(), base.data[start:end].tolist()))
+            for other, v in self._delta.get(tid, {}).items():
+                co[other] = co.get(other, 0) + v
+            count = self._counts[tid]
+            best = heapq.nlargest(limit, ((v, o) for o, v in co.items() if v > 0), key=lambda x: (x[0], -x[1]))
+            return [
+                {
+                    "tag": self._names[o],
+                    "count": v,
+                    "score": round(v / max(1, count + self._counts[o] - v), 4),
+                }
+                for v, o in best
+            ]
@@ -0,0 +1,185 @@
+# server/tag_vectors.py — 태그 임베딩 저장소 (시맨틱 검색용)
+# 태그는 한 번만 임베딩해 data/tag_vectors/ 에 보관하고, 새 태그가 들어올 때만 추가 인코딩해 파일 끝에 덧붙입니다.
+# 검색어 벡터는 LRU 캐시에 두고, 점수는 캐시된 행렬과의 행렬-벡터 곱 한 번으로 계산합니다.
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TAG_VECTOR_DIR = PROJECT_ROOT / "data" / "tag_vectors"
+QUERY_CACHE_SIZE = 512
+
+EncodeFn = Callable[[list[str]], np.ndarray]
+
+
+def _normalize(mat: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (내적 = 코사인 유사도가 되도록)."""
+    mat = np.asarray(mat, dtype=np.float32)
+    if mat.ndim == 1:
+        norm = float(np.linalg.norm(mat))
+        return mat / norm if norm > 0 else mat
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+class TagVectorStore:
+    """태그 → 정규화된 임베딩 행렬. 디스크에 영속화되며 스레드 안전."""
+
+    def __init__(self, model_id: str, encode: EncodeFn, directory: Path = TAG_VECTOR_DIR,
+                 query_cache_size: int = QUERY_CACHE_SIZE):
+        self.model_id = model_id
+        self._encode = encode
+        self._dir = directory
+        self._query_cache_size = query_cache_size
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._saved: Optional[int] = None  # 디스크에 있는 앞쪽 행 수 (None: 파일을 전체 새로 써야 함)
+        self._tags: list[str] = []
+        self._index: dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self._dir / "vectors.f32"
+
+    @property
+    def _tags_path(self) -> Path:
+        return self._dir / "tags.jsonl"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self._dir / "meta.json"
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def _read_files(self) -> Optional[tuple[list[str], np.ndarray, bool]]:
+        """(태그, 행렬, 두 파일이 끝까지 짝이 맞는지). 모델이 다르거나 파일이 없으면 None. 덧붙이다 끊긴 꼬리는 버림."""
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            dim = int(meta["dim"])
+            lines = self._tags_path.read_text(encoding="utf-8").splitlines()
+            raw = self._vectors_path.read_bytes()
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if meta.get("model") != self.model_id or dim <= 0:
+            print("Tag vector cache mismatch; rebuilding on demand.")
+            return None
+        tags: list[str] = []
+        for line in lines:
+            try:
+                tags.append(str(json.loads(line)))
+            except ValueError:
+                break
+        n = min(len(tags), len(raw) // (4 * dim))
+        matrix = np.frombuffer(raw, dtype="<f4", count=n * dim).reshape(n, dim).astype(np.float32)
+        return tags[:n], matrix, n == len(lines) and n * dim * 4 == len(raw)
+
+    def load(self) -> None:
+        """디스크에서 태그 행렬 로드. 모델이 다르거나 파일이 깨졌으면 비운 상태로 시작."""
+        loaded = self._read_files()
+        if loaded is None:
+            return
+        tags, matrix, complete = loaded
+        with self._lock:
+            self._tags = tags
+            self._index = {t: i for i, t in enumerate(tags)}
+            self._matrix = matrix
+            # 짝이 맞지 않는 꼬리가 있었으면(중단된 덧붙임) 다음 저장 때 전체를 다시 씀
+            self._saved = len(tags) if complete else None
+        print(f"Loaded {len(tags)} tag vectors.")
+
+    def _write_all(self, tags: list[str], matrix: np.ndarray) -> None:
+        """전체를 임시 파일에 쓴 뒤 교체 (처음 저장·모델 변경·파일 복구 시). meta 를 마지막에 교체."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        tmp_vec = self._vectors_path.with_suffix(".tmp")
+        tmp_tags = self._tags_path.with_suffix(".tmp")
+        tmp_meta = self._meta_path.with_suffix(".tmp")
+        matrix.astype("<f4", copy=False).tofile(tmp_vec)
+        tmp_tags.write_text("".join(json.dumps(t, ensure_ascii=False) + "\n" for t in tags), encoding="utf-8")
+        tmp_meta.write_text(json.dumps({"model": self.model_id, "dim": int(matrix.shape[1])}), encoding="utf-8")
+        os.replace(tmp_vec, self._vectors_path)
+        os.replace(tmp_tags, self._tags_path)
+        os.replace(tmp_meta, self._meta_path)
+
+    def _append(self, tags: list[str], matrix: np.ndarray) -> None:
+        """새 행만 파일 끝에 덧붙임 (벡터 먼저 — 중단되면 load 가 짝이 맞는 앞부분만 읽음)."""
+        with open(self._vectors_path, "ab") as f:
+            f.write(matrix.astype("<f4", copy=False).tobytes())
+        with open(self._tags_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(t, ensure_ascii=False) + "\n" for t in tags))
+
+    def _flush(self) -> None:
+        """아직 디스크에 없는 행을 저장. 동시에 들어온 ensure 의 행은 한 번에 덧붙임."""
+        with self._save_lock:
+            with self._lock:
+                n, start, matrix = len(self._tags), self._saved, self._matrix
+                tags = self._tags[start or 0:n]
+            if n == 0 or n == start:
+                return
+            try:
+                if start is None:
+                    self._write_all(tags, matrix[:n])
+                else:
+                    self._append(tags, matrix[start:n])
+            except OSError as e:
+                self._saved = None  # 일부만 쓰였을 수 있으므로 다음 저장은 전체 다시 쓰기
+                print(f"Tag vector save failed: {e}")
+                return
+            self._saved = n
+
+    def ensure(self, tags: Iterable[str]) -> None:
+        """아직 임베딩되지 않은 태그만 인코딩해 행렬에 추가하고 저장.
+
+        인코딩은 잠금 밖에서 하므로 그동안 다른 검색의 query_vector·match 가 기다리지 않음.
+        """
+        with self._lock:
+            missing = list(dict.fromkeys(t for t in tags if t and t not in self._index))
+        if not missing:
+            return
+        vecs = _normalize(self._encode(missing))
+        with self._lock:
+            # 인코딩하는 사이 다른 스레드가 먼저 넣은 태그는 건너뜀
+            keep = [i for i, t in enumerate(missing) if t not in self._index]
+            if not keep:
+                return
+            vecs = vecs[keep]
+            self._matrix = vecs if self._matrix.size == 0 else np.concatenate([self._matrix, vecs], axis=0)
+            for i in keep:
+                self._index[missing[i]] = len(self._tags)
+                self._tags.append(missing[i])
+        self._flush()
+
+    def query_vector(self, query: str) -> np.ndarray:
+        """검색어 벡터 (LRU 캐시)."""
+        with self._lock:
+            vec = self._query_cache.get(query)
+            if vec is not None:
+                self._query_cache.move_to_end(query)
+                return vec
+        vec = _normalize(np.asarray(self._encode([query]))[0])
+        with self._lock:
+            self._query_cache[query] = vec
+            while len(self._query_cache) > self._query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vec
+
+    def match(self, query: str, tags: list[str], threshold: float) -> list[str]:
+        """tags 중 검색어와 코사인 유사도가 threshold 초과인 태그 (입력 순서 유지)."""
+        tags = [str(t) for t in tags if t]
+        if not query or not tags:
+            return []
+        self.ensure(tags)
+        qvec = self.query_vector(query)
+        with self._lock:
+            rows = np.fromiter((self._index[t] for t in tags), dtype=np.int64, count=len(tags))
+            scores = self._matrix[rows] @ qvec
+        return [tags[i] for i in np.nonzero(scores > threshold)[0]]
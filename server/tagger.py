@@ -1,19 +1,22 @@
 # server/tagger.py
-import io
 import torch
 import timm
 """
 Timm = PyTorch Image Models의 약자로
 """
 import pandas as pd
-from PIL import Image
 from transformers import ViTImageProcessor
 from huggingface_hub import hf_hub_download
 
+import onnx_backend
+from image_loader import TAGGER_DECODE_SIDE, TAGGER_INPUT_SIZE, load_rgb
+
 class WD14Eva02Tagger:
-    def __init__(self):
+    def __init__(self, backend=None, quantize=None):
+        """backend: "torch" | "onnx" (기본값은 INFERENCE_BACKEND 설정), quantize: ONNX 동적 int8 사용 여부."""
         print("Loading WD-EVA02-Large-V3...")
         self.model_id = "SmilingWolf/wd-eva02-large-tagger-v3"
+        self.backend = (backend or onnx_backend.INFERENCE_BACKEND).lower()
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         """
         cuda를 사용할 수 있는 GPU가 있으면 cuda를 사용하고 없으면 일반 cpu를 사용하도록 설정.
@@ -22,34 +25,77 @@ class WD14Eva02Tagger:
         # 전처리기 설정
         self.processor = ViTImageProcessor(
             do_resize=True,
-            size={"height": 448, "width": 448},
+            size={"height": TAGGER_INPUT_SIZE, "width": TAGGER_INPUT_SIZE},
             do_normalize=True,
             image_mean=[0.48145466, 0.4578275, 0.40821073], # 학습 때 사용하는 평균 색상값
             image_std=[0.26862954, 0.26130258, 0.27577711] # 학습 때 사용된 표준편차
         )
 
-        # 모델 로드
-        self.model = timm.create_model(f"hf_hub:{self.model_id}", pretrained=True).to(self.device)
-        self.model.eval()
+        # 모델 로드 (ONNX 백엔드는 캐시된 그래프가 없을 때만 PyTorch 모델을 읽어 내보냄)
+        self.model = None
+        self.session = None
+        if self.backend == "onnx":
+            self.session = onnx_backend.tagger_session(
+                self.model_id, lambda: timm.create_model(f"hf_hub:{self.model_id}", pretrained=True), TAGGER_INPUT_SIZE, quantize
+            )
+        else:
+            self.model = timm.create_model(f"hf_hub:{self.model_id}", pretrained=True).to(self.device)
+            self.model.eval()
 
         # 태그 리스트 로드
         tags_path = hf_hub_download(repo_id=self.model_id, filename="selected_tags.csv")
         self.labels = pd.read_csv(tags_path)['name'].tolist()
 
-    def predict(self, image_bytes, threshold=0.35):
-        try:
-            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-            inputs = self.processor(images=image, return_tensors="pt").to(self.device)
+    # 등급 태그 등 결과에서 제외할 라벨
+    EXCLUDE_TAGS = {'general', 'sensitive', 'questionable', 'explicit', 'rating:g', 'rating:s', 'rating:q', 'rating:e'}
 
-            with torch.no_grad():
-                outputs = self.model(inputs['pixel_values'])
-                probs = torch.sigmoid(outputs)[0]
+    def _probs_to_tags(self, probs, threshold):
+        indices = torch.where(probs > threshold)[0]
+        found_tags = [self.labels[i.item()].replace('_', ' ') for i in indices]
+        return [t for t in found_tags if t not in self.EXCLUDE_TAGS]
 
-                indices = torch.where(probs > threshold)[0]
-                found_tags = [self.labels[i.item()].replace('_', ' ') for i in indices]
+    def _forward(self, images):
+        """RGB PIL 이미지 리스트 → 라벨별 확률 텐서 [N, 라벨 수] (CPU)."""
+        if self.session is not None:
+            pixels = self.processor(images=images, return_tensors="np")['pixel_values']
+            logits = self.session.run(None, {"pixel_values": pixels.astype("float32")})[0]
+            return torch.sigmoid(torch.from_numpy(logits))
+        inputs = self.processor(images=images, return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            outputs = self.model(inputs['pixel_values'])
+            return torch.sigmoid(outputs).cpu()
 
-                exclude = {'general', 'sensitive', 'questionable', 'explicit', 'rating:g', 'rating:s', 'rating:q', 'rating:e'}
-                return [t for t in found_tags if t not in exclude]
+    def predict(self, image_bytes, threshold=0.35):
+        try:
+            image = load_rgb(image_bytes, TAGGER_DECODE_SIDE)  # 448 입력에 필요한 만큼만 디코딩
+            probs = self._forward([image])[0]
+            return self._probs_to_tags(probs, threshold)
         except Exception as e:
             print(f"Prediction Error: {e}")
-            return ["error"]
\ No newline at end of file
+            return ["error"]
+
+    def predict_batch(self, images_bytes, threshold=0.35, batch_size=8):
+        """여러 이미지를 batch_size 단위로 묶어 한 번의 forward로 태깅. 입력 순서대로 태그 리스트 반환."""
+        images = []
+        for data in images_bytes:
+            try:
+                images.append(load_rgb(data, TAGGER_DECODE_SIDE))
+            except Exception as e:
+                print(f"Prediction Error: {e}")
+                images.append(None)
+        return self.predict_images(images, threshold, batch_size)
+
+    def predict_images(self, images, threshold=0.35, batch_size=8):
+        """이미 디코딩된 RGB PIL 이미지 리스트를 태깅. None 항목은 ["error"]."""
+        results = [["error"] for _ in images]
+        decoded = [(idx, img) for idx, img in enumerate(images) if img is not None]
+
+        for start in range(0, len(decoded), batch_size):
+            chunk = decoded[start:start + batch_size]
+            try:
+                probs = self._forward([img for _, img in chunk])
+                for row, (idx, _) in enumerate(chunk):
+                    results[idx] = self._probs_to_tags(probs[row], threshold)
+            except Exception as e:
+                print(f"Batch Prediction Error: {e}")
+        return results
@@ -0,0 +1,32 @@
+# server/tests/conftest.py — server/ 모듈을 직접 import 하고, 임시 LanceDB images 테이블을 만드는 공용 픽스처
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from schema import ImageRow, VECTOR_DIM  # noqa: E402
+
+
+def image_row(image_id: str, tags=None, vector=None) -> dict:
+    return {
+        "id": image_id, "filename": f"{image_id}.png", "thumbnail": f"{image_id}.webp", "originalName": f"{image_id}.png",
+        "tags": list(tags or []), "width": None, "height": None, "notes": "", "createdAt": "",
+        "vector": list(vector) if vector is not None else [0.0] * VECTOR_DIM, "phash": None,
+    }
+
+
+@pytest.fixture
+def make_table(tmp_path):
+    """rows(dict 목록)로 채운 임시 images 테이블을 만드는 함수."""
+    import lancedb
+
+    def make(rows: list[dict]):
+        table = lancedb.connect(str(tmp_path / "db")).create_table("images", schema=ImageRow)
+        if rows:
+            table.add(rows)
+        return table
+
+    return make
@@ -0,0 +1,52 @@
+import numpy as np
+
+from conftest import image_row
+from dedup import _block_rows, _legacy_find_groups, find_duplicate_groups, load_vector_matrix
+from schema import VECTOR_DIM
+
+THRESHOLD = 0.2
+
+
+def _fixed_vectors() -> tuple[list[str], np.ndarray]:
+    """클러스터 4개(크기 4, 3, 2, 2 — 중심 주변 작은 잡음)와 서로 먼 단독 벡터 9개."""
+    rng = np.random.default_rng(42)
+    vecs = []
+    for size in (4, 3, 2, 2):
+        center = rng.normal(size=VECTOR_DIM).astype(np.float32)
+        vecs.extend(center + rng.normal(scale=0.005, size=VECTOR_DIM).astype(np.float32) for _ in range(size))
+    vecs.extend(rng.normal(size=VECTOR_DIM).astype(np.float32) for _ in range(9))
+    order = rng.permutation(len(vecs))  # 클러스터 원소가 여러 블록에 흩어지도록
+    mat = np.asarray(vecs, dtype=np.float32)[order]
+    ids = [str(1_700_000_000_000 + i) for i in range(len(mat))]
+    return ids, mat
+
+
+def _norm(groups):
+    return sorted(sorted(g) for g in groups)
+
+
+def test_blocked_groups_match_legacy_search(make_table):
+    ids, mat = _fixed_vectors()
+    table = make_table([image_row(i, vector=v) for i, v in zip(ids, mat)])
+    tiny_mb = 0.0005
+    assert _block_rows(len(ids), tiny_mb) < len(ids)  # 블록 나눔이 실제로 일어나는지
+
+    blocked = find_duplicate_groups(table, THRESHOLD, max_groups=100, max_memory_mb=tiny_mb)
+    load_ids, load_mat = load_vector_matrix(table)
+    legacy = _legacy_find_groups(table, load_ids, load_mat, THRESHOLD)
+
+    assert _norm(blocked) == _norm(legacy)
+    assert sorted(len(g) for g in blocked) == [2, 2, 3, 4]
+    # 큰 그룹 순, 블록 크기와 무관
+    assert [len(g) for g in blocked] == [4, 3, 2, 2]
+    assert _norm(find_duplicate_groups(table, THRESHOLD, max_groups=100)) == _norm(blocked)
+
+
+def test_zero_vectors_are_ignored(make_table):
+    ids, mat = _fixed_vectors()
+    rows = [image_row(i, vector=v) for i, v in zip(ids, mat)]
+    rows += [image_row("zero-a"), image_row("zero-b")]  # 0 벡터끼리는 거리 0 이지만 중복 아님
+    table = make_table(rows)
+    groups = find_duplicate_groups(table, THRESHOLD, max_groups=100, max_memory_mb=0.0005)
+    assert not any("zero-a" in g or "zero-b" in g for g in groups)
+    assert find_duplicate_groups(table, THRESHOLD, max_groups=2) == find_duplicate_groups(table, THRESHOLD, 100)[:2]
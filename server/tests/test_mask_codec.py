@@ -0,0 +1,58 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from mask_codec import encode_bits, encode_mask, encode_rle
+
+
+def decode_rle(data: bytes, width: int, height: int) -> np.ndarray:
+    """src/lib/api/remove-bg.ts decodeRle 와 같은 해석: uint32 LE 런, 짝수 번째(0부터) 런은 0, 홀수 번째는 1."""
+    counts = np.frombuffer(data, dtype="<u4")
+    flat = np.zeros(width * height, dtype=bool)
+    pos = 0
+    for i, run in enumerate(counts):
+        if i % 2 == 1:
+            flat[pos:pos + run] = True
+        pos += int(run)
+    assert pos == width * height
+    return flat.reshape(height, width)
+
+
+def decode_bits(data: bytes, width: int, height: int) -> np.ndarray:
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=width * height).astype(bool).reshape(height, width)
+
+
+def _masks() -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    starts_with_one = np.zeros((3, 5), dtype=bool)
+    starts_with_one[0, :2] = True
+    starts_with_one[2, 4] = True
+    return {
+        "starts_with_one": starts_with_one,
+        "all_zeros": np.zeros((4, 7), dtype=bool),
+        "all_ones": np.ones((4, 7), dtype=bool),
+        "single_pixel_one": np.ones((1, 1), dtype=bool),
+        "random": rng.random((13, 11)) > 0.5,
+    }
+
+
+@pytest.mark.parametrize("name", list(_masks()))
+def test_rle_and_bits_round_trip(name):
+    mask = _masks()[name]
+    h, w = mask.shape
+    assert np.array_equal(decode_rle(encode_rle(mask), w, h), mask)
+    assert np.array_equal(decode_bits(encode_bits(mask), w, h), mask)
+    assert np.array_equal(decode_rle(encode_mask(mask, "rle"), w, h), mask)
+    png = np.asarray(Image.open(io.BytesIO(encode_mask(mask, "png")))) >= 128
+    assert np.array_equal(png, mask)
+
+
+def test_rle_layout():
+    # 항상 0 구간부터: 1 로 시작하면 길이 0 인 0 구간이 앞에 붙음
+    assert np.frombuffer(encode_rle(np.ones((4, 7), dtype=bool)), "<u4").tolist() == [0, 28]
+    assert np.frombuffer(encode_rle(np.zeros((4, 7), dtype=bool)), "<u4").tolist() == [28]
+    assert np.frombuffer(encode_rle(_masks()["starts_with_one"]), "<u4").tolist() == [0, 2, 12, 1]
+    assert encode_rle(np.zeros((0, 0), dtype=bool)) == b""
+    assert encode_bits(np.ones((1, 9), dtype=bool)) == b"\xff\x80"  # 남는 비트는 0
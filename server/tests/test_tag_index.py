@@ -0,0 +1,107 @@
+import pytest
+
+from tag_index import TagBitmapIndex, TagQueryError
+
+
+def _index(rows: dict[str, list[str]]) -> TagBitmapIndex:
+    index = TagBitmapIndex()
+    for image_id, tags in rows.items():
+        index.set_tags(image_id, tags)
+    return index
+
+
+@pytest.fixture
+def index():
+    return _index({
+        "1": ["a"],
+        "2": ["b", "c"],
+        "3": ["a", "b"],
+        "4": ["c"],
+        "5": ["a", "c", "hat"],
+    })
+
+
+def _ids(index, expr, **kw):
+    return index.query(expr, **kw)["ids"]
+
+
+def test_operator_precedence(index):
+    # NOT > AND > OR, 결과는 최신(나중에 추가된) 순
+    assert _ids(index, "a OR b AND c") == ["5", "3", "2", "1"]
+    assert _ids(index, "(a OR b) AND c") == ["5", "2"]
+    assert _ids(index, "NOT a AND c") == ["4", "2"]
+    assert _ids(index, "NOT (a AND c)") == ["4", "3", "2", "1"]
+    assert _ids(index, "a & !hat | b") == ["3", "2", "1"]
+    assert _ids(index, "a c") == []  # 공백으로 이어진 단어는 태그 하나 ("a c")
+    assert _ids(index, "a (b OR hat)") == ["5", "3"]  # 연산자 없이 괄호·NOT 이 이어지면 AND
+    assert _ids(index, "a !hat") == ["3", "1"]
+    assert _ids(index, "NOT NOT a") == _ids(index, "a")
+
+
+def test_query_errors(index):
+    for expr in ("a AND", "(a OR b", "a )", "OR a"):
+        with pytest.raises(TagQueryError):
+            index.query(expr)
+
+
+def test_not_on_empty_universe():
+    empty = TagBitmapIndex()
+    assert empty.query("NOT a") == {"ids": [], "total": 0, "next_cursor": None}
+    assert empty.query("a OR NOT a")["total"] == 0
+
+    index = _index({"1": ["a"], "2": ["b"]})
+    index.remove("1")
+    index.remove("2")
+    assert len(index) == 0
+    assert index.query("!a") == {"ids": [], "total": 0, "next_cursor": None}
+    assert index.query("")["ids"] == []
+
+
+def test_cursor_continuation():
+    index = _index({str(i): ["x"] if i % 2 else ["x", "odd"] for i in range(1, 11)})
+    index.remove("4")  # 중간에 빈 행 번호
+
+    for expr, expected in (("x", ["10", "9", "8", "7", "6", "5", "3", "2", "1"]),
+                           ("odd", ["10", "8", "6", "2"])):
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = index.query(expr, limit=3, cursor=cursor)
+            assert page["total"] == len(expected)
+            seen += page["ids"]
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected
+        assert pages == -(-len(expected) // 3)
+
+    # 첫 페이지 이후에 추가된 행은 이어 받는 페이지에 섞이지 않음
+    first = index.query("x", limit=3)
+    index.set_tags("11", ["x"])
+    rest = index.query("x", limit=100, cursor=first["next_cursor"])
+    assert "11" not in rest["ids"]
+    assert first["ids"] + rest["ids"] == ["10", "9", "8", "7", "6", "5", "3", "2", "1"]
+
+
+def test_rename_merges_into_existing_tag():
+    index = _index({"1": ["old"], "2": ["new"], "3": ["old", "new"], "4": ["other"]})
+    changes = index.rewrite({"Old ": "new"})
+
+    assert sorted(changes) == [(("old",), ("new",)), (("old", "new"), ("new",))]
+    assert index.count("old") == 0
+    assert index.count("new") == 3
+    assert index.get_tags("3") == ("new",)  # 병합으로 생긴 중복 제거
+    assert _ids(index, "new") == ["3", "2", "1"]
+    assert _ids(index, "old") == []
+    assert index.rewrite({"missing": "new"}) == []
+
+
+def test_rewrite_applies_mapping_once():
+    index = _index({"1": ["a"], "2": ["b"], "3": ["a", "b"]})
+    index.rewrite({"a": "b", "b": "c"})
+    assert index.get_tags("1") == ("b",)
+    assert index.get_tags("2") == ("c",)
+    assert index.get_tags("3") == ("b", "c")
+    assert _ids(index, "b") == ["3", "1"]
+    assert _ids(index, "c") == ["3", "2"]
+    assert _ids(index, "a") == []
@@ -0,0 +1,40 @@
+from conftest import image_row
+from tag_ops import remove_tags, rename_tags, rewrite_tags
+
+
+def _tags_by_id(table) -> dict[str, list[str]]:
+    data = table.to_arrow().select(["id", "tags"]).to_pydict()
+    return {i: list(t or []) for i, t in zip(data["id"], data["tags"])}
+
+
+def _table(make_table, tags: dict[str, list[str]]):
+    rows = []
+    for image_id, row_tags in tags.items():
+        row = image_row(image_id, tags=row_tags)
+        row["notes"] = f"note {image_id}"
+        rows.append(row)
+    return make_table(rows)
+
+
+def test_remove_tags_with_untagged_rows(make_table):
+    table = _table(make_table, {
+        "1": [], "2": [], "3": ["hat", "Red Eyes"], "4": ["hat"], "5": ["solo"], "6": [],
+    })
+    # 배치 2: 첫 배치("1", "2")는 태그 없는 행만 (빈 flatten)
+    assert rewrite_tags(table, {"HAT ": None, "red eyes": None, "": None}, batch_size=2) == 2
+    assert _tags_by_id(table) == {"1": [], "2": [], "3": [], "4": [], "5": ["solo"], "6": []}
+    notes = dict(zip(*table.to_arrow().select(["id", "notes"]).to_pydict().values()))
+    assert notes["3"] == "note 3"  # id/tags 만 merge_insert → 다른 컬럼 유지
+    assert remove_tags(table, ["hat"]) == 0
+
+
+def test_rename_chain_maps_each_tag_once(make_table):
+    table = _table(make_table, {"1": ["a"], "2": ["b"], "3": ["a", "b"], "4": ["c"], "5": []})
+    assert rewrite_tags(table, {"a": "b", "b": "c"}, batch_size=2) == 3
+    assert _tags_by_id(table) == {"1": ["b"], "2": ["c"], "3": ["b", "c"], "4": ["c"], "5": []}
+
+
+def test_rename_merges_and_dedupes(make_table):
+    table = _table(make_table, {"1": ["Cat", "kitty", "solo"], "2": ["kitty"], "3": ["dog"]})
+    assert rename_tags(table, {"kitty": "cat", "dog": ""}) == 2  # 빈 이름은 무시 (제거 아님)
+    assert _tags_by_id(table) == {"1": ["Cat", "solo"], "2": ["cat"], "3": ["dog"]}
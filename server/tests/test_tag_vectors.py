@@ -0,0 +1,42 @@
+import numpy as np
+
+from tag_vectors import TagVectorStore
+
+
+def _encode(tags: list[str]) -> np.ndarray:
+    return np.asarray([[len(t), sum(map(ord, t)) % 13 + 1, 1.0] for t in tags], dtype=np.float32)
+
+
+def test_new_tags_are_appended_and_reloaded(tmp_path):
+    store = TagVectorStore("m", _encode, tmp_path)
+    store.ensure(["cat", "dog"])
+    size = (tmp_path / "vectors.f32").stat().st_size
+    store.ensure(["dog", "bird"])  # 이미 있는 태그는 다시 인코딩·저장하지 않음
+    assert (tmp_path / "vectors.f32").stat().st_size == size + size // 2
+
+    reloaded = TagVectorStore("m", _encode, tmp_path)
+    reloaded.load()
+    assert len(reloaded) == 3
+    assert reloaded.match("cat", ["cat", "bird"], 0.999) == ["cat"]
+
+
+def test_interrupted_append_is_dropped(tmp_path):
+    store = TagVectorStore("m", _encode, tmp_path)
+    store.ensure(["cat", "dog"])
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(b"\0\0")
+    reloaded = TagVectorStore("m", _encode, tmp_path)
+    reloaded.load()
+    assert len(reloaded) == 2
+    reloaded.ensure(["bird"])  # 짝이 맞지 않던 파일은 전체 다시 쓰기
+    again = TagVectorStore("m", _encode, tmp_path)
+    again.load()
+    assert len(again) == 3
+    assert (tmp_path / "vectors.f32").stat().st_size == 3 * 3 * 4
+
+
+def test_other_model_starts_empty(tmp_path):
+    TagVectorStore("m", _encode, tmp_path).ensure(["cat"])
+    other = TagVectorStore("other", _encode, tmp_path)
+    other.load()
+    assert len(other) == 0
@@ -0,0 +1,262 @@
+# server/upscale_engine.py — 메모리 상한이 있는 타일 스트리밍 Real-ESRGAN 업스케일
+# 원본을 타일 단위로 모델에 통과시키고, 한 줄(band)의 타일이 끝날 때마다 목표 배율로 줄여 바로 파일에 씁니다.
+# 전체 출력 배열을 만들지 않으므로 최대 메모리는 (타일 작업 메모리 × 워커 수 + 출력 한 줄) 로 출력 크기와 무관합니다.
+#
+#   UPSCALE_MEMORY_MB     타일 추론에 쓸 메모리 예산 (기본 1024). 타일 크기는 여기서 자동 결정
+#   UPSCALE_TILE_WORKERS  CPU 에서 동시에 돌릴 타일 수 (기본 1, GPU 는 항상 1)
+#
+# 출력이 UPSCALE_IN_MEMORY_MAX_PIXELS 이하이면 메모리에 모아 cv2 로 저장(WebP 등)하고,
+# 그보다 크면 PNG 를 행 단위로 압축해 스트리밍합니다 (.png 경로 필요).
+
+import math
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+UPSCALE_MEMORY_MB = int(os.environ.get("UPSCALE_MEMORY_MB", "1024"))
+UPSCALE_TILE_WORKERS = max(1, int(os.environ.get("UPSCALE_TILE_WORKERS", "1")))
+UPSCALE_IN_MEMORY_MAX_PIXELS = 24_000_000  # 이보다 큰 출력은 PNG 스트리밍
+WEBP_MAX_DIMENSION = 16383
+
+TILE_PAD = 16  # 타일 경계 이음새 방지용 문맥 여백 (원본 픽셀)
+TILE_MIN, TILE_MAX = 64, 1024
+# RRDBNet(6B, feat 64) 추론 시 원본 픽셀당 대략의 작업 메모리. 4배 해상도 업샘플 층(64채널 float32)이 대부분
+BYTES_PER_INPUT_PIXEL = 12 * 1024
+PNG_COMPRESS_LEVEL = 6
+
+MB = 1024 * 1024
+
+
+def choose_tile_size(memory_mb: int = UPSCALE_MEMORY_MB, workers: int = 1, pad: int = TILE_PAD) -> int:
+    """예산 안에서 workers 개 타일을 동시에 돌릴 수 있는 가장 큰 타일 변 길이 (32 배수)."""
+    per_worker = max(1, memory_mb) * MB / max(1, workers)
+    side = int(math.sqrt(per_worker / BYTES_PER_INPUT_PIXEL)) - 2 * pad
+    return max(TILE_MIN, min(TILE_MAX, side // 32 * 32))
+
+
+def output_size(width: int, height: int, scale: float) -> tuple[int, int]:
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def needs_streaming(width: int, height: int, scale: float) -> bool:
+    """출력이 커서 PNG 스트리밍으로 저장해야 하는지 (WebP 최대 크기 초과 포함)."""
+    out_w, out_h = output_size(width, height, scale)
+    return out_w * out_h > UPSCALE_IN_MEMORY_MAX_PIXELS or max(out_w, out_h) > WEBP_MAX_DIMENSION
+
+
+class PngStreamWriter:
+    """RGB PNG 를 행 단위로 압축해 쓰는 작성기 (Sub 필터). 임시 파일에 쓰고 close() 때 교체."""
+
+    def __init__(self, path: Path, width: int, height: int, level: int = PNG_COMPRESS_LEVEL):
+        self.path = path
+        self.width, self.height = width, height
+        self.rows = 0
+        self._tmp = path.with_name(path.name + ".part")
+        self._f = open(self._tmp, "wb")
+        self._z = zlib.compressobj(level)
+        self._f.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self._f.write(struct.pack(">I", len(data)))
+        self._f.write(kind)
+        self._f.write(data)
+        self._f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+
+    def write_rows(self, bgr: np.ndarray) -> None:
+        rgb = bgr[:, :, ::-1].reshape(bgr.shape[0], -1)
+        raw = np.empty((rgb.shape[0], rgb.shape[1] + 1), dtype=np.uint8)
+        raw[:, 0] = 1  # Sub 필터: 왼쪽 픽셀과의 차이
+        raw[:, 1:4] = rgb[:, :3]
+        np.subtract(rgb[:, 3:], rgb[:, :-3], out=raw[:, 4:])
+        data = self._z.compress(raw.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self.rows += bgr.shape[0]
+
+    def close(self) -> None:
+        try:
+            self._chunk(b"IDAT", self._z.flush())
+            self._chunk(b"IEND", b"")
+        finally:
+            self._f.close()
+        if self.rows != self.height:
+            self._tmp.unlink(missing_ok=True)
+            raise ValueError(f"PNG row count mismatch: {self.rows} != {self.height}")
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class _ArrayWriter:
+    """작은 출력용: 행을 배열에 모았다가 cv2.imwrite 로 저장."""
+
+    def __init__(self, path: Path, width: int, height: int):
+        self.path = path
+        self._out = np.empty((height, width, 3), dtype=np.uint8)
+        self.rows = 0
+
+    def write_rows(self, bgr: np.ndarray) -> None:
+        self._out[self.rows:self.rows + bgr.shape[0]] = bgr
+        self.rows += bgr.shape[0]
+
+    def close(self) -> None:
+        import cv2
+
+        ext = self.path.suffix.lower()
+        if ext == ".webp":
+            params = [cv2.IMWRITE_WEBP_QUALITY, 95]
+        elif ext in (".jpg", ".jpeg"):
+            params = [cv2.IMWRITE_JPEG_QUALITY, 95]
+        else:
+            params = []
+        if not cv2.imwrite(str(self.path), self._out, params):
+            raise ValueError(f"Failed to write {self.path}")
+
+    def abort(self) -> None:
+        pass
+
+
+def _read_bgr(path: Path) -> np.ndarray:
+    import cv2
+
+    img = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise ValueError(f"Failed to read image: {path}")
+    if img.dtype == np.uint16:
+        img = (img >> 8).astype(np.uint8)
+    if img.ndim == 2:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    elif img.shape[2] == 4:  # 알파 채널은 제거
+        img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+    return img
+
+
+def _run_tile(upsampler, tile_bgr: np.ndarray) -> np.ndarray:
+    """BGR uint8 타일 → 모델 배율(4x) BGR uint8."""
+    import torch
+
+    rgb = np.ascontiguousarray(tile_bgr[:, :, ::-1], dtype=np.float32) / 255.0
+    t = torch.from_numpy(rgb).permute(2, 0, 1).unsqueeze(0).to(upsampler.device)
+    if upsampler.half:
+        t = t.half()
+    with torch.no_grad():
+        out = upsampler.model(t)
+    out = out.squeeze(0).float().clamp_(0, 1).permute(1, 2, 0).cpu().numpy()
+    return (out[:, :, ::-1] * 255.0).round().astype(np.uint8)
+
+
+def upscale_file(upsampler, input_path: Path, output_path: Path, scale: float,
+                 memory_mb: int = UPSCALE_MEMORY_MB, workers: Optional[int] = None,
+                 preview_max_size: int = 1024, on_progress: Optional[Callable[[float], None]] = None) -> dict:
+    """input_path 를 scale 배로 업스케일해 output_path 에 저장. on_progress(0~1) 는 줄마다 호출 (예외를 던지면 중단).
+
+    반환: {width, height, tile, workers, preview} — preview 는 긴 변 preview_max_size 이하로 줄인 RGB 배열
+    (썸네일·임베딩·pHash 용, 큰 결과 파일을 다시 디코딩하지 않기 위함).
+    """
+    import cv2
+
+    img = _read_bgr(input_path)
+    h, w = img.shape[:2]
+    model_scale = int(getattr(upsampler, "scale", 4))
+    out_w, out_h = output_size(w, h, scale)
+    on_gpu = str(getattr(upsampler, "device", "cpu")).startswith("cuda")
+    workers = 1 if on_gpu else max(1, workers or UPSCALE_TILE_WORKERS)
+    tile = choose_tile_size(memory_mb, workers)
+
+    preview_scale = min(1.0, preview_max_size / max(out_w, out_h))
+    preview_w = max(1, round(out_w * preview_scale))
+    preview_rows: list[np.ndarray] = []
+    preview_done = 0
+
+    if needs_streaming(w, h, scale):
+        if output_path.suffix.lower() != ".png":
+            raise ValueError(f"Output {out_w}x{out_h} requires a .png path for streaming")
+        writer = PngStreamWriter(output_path, out_w, out_h)
+    else:
+        writer = _ArrayWriter(output_path, out_w, out_h)
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upscale") if workers > 1 else None
+    try:
+        out_done = 0
+        for y0 in range(0, h, tile):
+            y1 = min(h, y0 + tile)
+            py0, py1 = max(0, y0 - TILE_PAD), min(h, y1 + TILE_PAD)
+
+            def process(x0: int) -> np.ndarray:
+                x1 = min(w, x0 + tile)
+                px0, px1 = max(0, x0 - TILE_PAD), min(w, x1 + TILE_PAD)
+                out = _run_tile(upsampler, img[py0:py1, px0:px1])
+                oy, ox = (y0 - py0) * model_scale, (x0 - px0) * model_scale
+                return out[oy:oy + (y1 - y0) * model_scale, ox:ox + (x1 - x0) * model_scale]
+
+            xs = range(0, w, tile)
+            tiles = list(pool.map(process, xs)) if pool is not None else [process(x0) for x0 in xs]
+            band = np.concatenate(tiles, axis=1)
+            del tiles
+
+            # 목표 배율 행 범위: 줄 경계마다 반올림해 누적 오차 없이 out_h 에 맞춤
+            out_y1 = out_h if y1 == h else round(y1 * scale)
+            band_h = out_y1 - out_done
+            if band_h <= 0:
+                continue
+            if band.shape[1] != out_w or band.shape[0] != band_h:
+                band = cv2.resize(band, (out_w, band_h), interpolation=cv2.INTER_AREA)
+            writer.write_rows(band)
+            out_done = out_y1
+            if on_progress is not None:
+                on_progress(out_done / out_h)
+
+            preview_y1 = max(preview_done, round(out_done * preview_scale)) if y1 < h else max(1, round(out_h * preview_scale))
+            if preview_y1 > preview_done:
+                small = cv2.resize(band, (preview_w, preview_y1 - preview_done), interpolation=cv2.INTER_AREA)
+                preview_rows.append(small[:, :, ::-1])
+                preview_done = preview_y1
+            del band
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return {
+        "width": out_w,
+        "height": out_h,
+        "tile": tile,
+        "workers": workers,
+        "preview": np.ascontiguousarray(np.concatenate(preview_rows)),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import resource
+    import time
+
+    parser = argparse.ArgumentParser(description="타일 스트리밍 업스케일 (최대 메모리·소요 시간 확인용)")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--scale", type=float, default=4.0)
+    parser.add_argument("--memory-mb", type=int, default=UPSCALE_MEMORY_MB)
+    parser.add_argument("--workers", type=int, default=UPSCALE_TILE_WORKERS)
+    args = parser.parse_args()
+
+    from main import _load_realesrgan_upscaler
+
+    upsampler = _load_realesrgan_upscaler()
+    started = time.perf_counter()
+    info = upscale_file(upsampler, Path(args.input), Path(args.output), args.scale, args.memory_mb, args.workers,
+                        on_progress=lambda f: print(f"\r{f * 100:5.1f}%", end="", flush=True))
+    print()
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{info['width']}x{info['height']} tile={info['tile']} workers={info['workers']} "
+          f"in {time.perf_counter() - started:.1f}s, peak RSS {peak_mb:.0f} MB")
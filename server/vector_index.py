@@ -0,0 +1,241 @@
+# server/vector_index.py — images.vector ANN 인덱스 수명 관리
+# 행 수가 INDEX_MIN_ROWS 를 넘으면 IVF_PQ(또는 IVF_HNSW_SQ) 인덱스를 만들고,
+# 인덱스 이후 추가된 행이 RETRAIN_FRACTION 비율을 넘으면 재학습합니다. 검색은 nprobes/refine_factor 로 조정.
+#
+# recall@k vs 지연 리포트 (정확 검색 대비):
+#   python vector_index.py --report                # 현재 갤러리 DB
+#   python vector_index.py --report --synthetic 20000
+
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from db import ensure_id_index
+from schema import VECTOR_DIM
+
+INDEX_MIN_ROWS = int(os.environ.get("VECTOR_INDEX_MIN_ROWS", "5000"))
+RETRAIN_FRACTION = float(os.environ.get("VECTOR_INDEX_RETRAIN_FRACTION", "0.2"))
+INDEX_TYPE = os.environ.get("VECTOR_INDEX_TYPE", "IVF_PQ")  # IVF_PQ | IVF_HNSW_SQ
+SEARCH_NPROBES = int(os.environ.get("VECTOR_SEARCH_NPROBES", "20"))
+SEARCH_REFINE_FACTOR = int(os.environ.get("VECTOR_SEARCH_REFINE_FACTOR", "10"))
+CHECK_DELAY_SECONDS = float(os.environ.get("VECTOR_INDEX_CHECK_DELAY", "2"))  # 쓰기 후 확인까지 모으는 시간
+METRIC = "l2"
+
+_build_lock = threading.Lock()
+_status: dict = {"building": False, "lastBuild": None, "lastError": None}
+_check_lock = threading.Lock()
+_check_timer: Optional[threading.Timer] = None
+
+
+def _vector_index(table):
+    for idx in table.list_indices():
+        if "vector" in list(getattr(idx, "columns", []) or []):
+            return idx
+    return None
+
+
+def index_status(table) -> dict:
+    """인덱스 유무·종류·인덱싱/미인덱싱 행 수와 검색 파라미터."""
+    out = {
+        **_status,
+        "rows": table.count_rows(),
+        "minRows": INDEX_MIN_ROWS,
+        "retrainFraction": RETRAIN_FRACTION,
+        "nprobes": SEARCH_NPROBES,
+        "refineFactor": SEARCH_REFINE_FACTOR,
+        "indexed": False,
+    }
+    try:
+        idx = _vector_index(table)
+    except Exception as e:
+        out["lastError"] = str(e)
+        return out
+    if idx is None:
+        return out
+    out["indexed"] = True
+    out["indexType"] = str(getattr(idx, "index_type", INDEX_TYPE))
+    try:
+        stats = table.index_stats(idx.name)
+        out["numIndexedRows"] = stats.num_indexed_rows
+        out["numUnindexedRows"] = stats.num_unindexed_rows
+    except Exception:
+        pass
+    return out
+
+
+def needs_reindex(status: dict) -> bool:
+    if status["rows"] < INDEX_MIN_ROWS:
+        return False
+    if not status["indexed"]:
+        return True
+    indexed = status.get("numIndexedRows") or 0
+    unindexed = status.get("numUnindexedRows") or 0
+    return unindexed > max(1, indexed) * RETRAIN_FRACTION
+
+
+def build_index(table) -> dict:
+    """벡터 인덱스를 (재)생성. 이미 빌드 중이면 건너뜀."""
+    if not _build_lock.acquire(blocking=False):
+        return {**_status, "skipped": True}
+    try:
+        _status.update({"building": True, "lastError": None})
+        rows = table.count_rows()
+        started = time.perf_counter()
+        if INDEX_TYPE == "IVF_HNSW_SQ":
+            table.create_index(metric=METRIC, vector_column_name="vector", index_type="IVF_HNSW_SQ",
+                               num_partitions=max(1, rows // 100_000 + 1), replace=True)
+        else:
+            table.create_index(metric=METRIC, vector_column_name="vector", index_type="IVF_PQ",
+                               num_partitions=max(1, int(np.sqrt(rows))), num_sub_vectors=VECTOR_DIM // 16,
+                               replace=True)
+        elapsed = time.perf_counter() - started
+        _status["lastBuild"] = {"rows": rows, "indexType": INDEX_TYPE, "seconds": round(elapsed, 2),
+                                "at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        print(f"Built {INDEX_TYPE} vector index on {rows} rows in {elapsed:.1f}s")
+    except Exception as e:
+        _status["lastError"] = str(e)
+        print(f"Vector index build failed: {e}")
+    finally:
+        _status["building"] = False
+        _build_lock.release()
+    return dict(_status)
+
+
+def maybe_reindex(table, force: bool = False) -> bool:
+    """필요하면(또는 force) 인덱스 빌드. 빌드했으면 True."""
+    try:
+        if not force and not needs_reindex(index_status(table)):
+            return False
+    except Exception as e:
+        print(f"Vector index check failed: {e}")
+        return False
+    build_index(table)
+    return True
+
+
+def startup_check(table) -> None:
+    """서버 시작 시 (백그라운드 스레드에서) 인덱스 상태 확인과 필요 시 빌드. 실패하면 예외."""
+    status = index_status(table)
+    if status.get("lastError"):
+        raise RuntimeError(status["lastError"])
+    if needs_reindex(status):
+        result = build_index(table)
+        if result.get("lastError"):
+            raise RuntimeError(result["lastError"])
+
+
+def _after_write(table) -> None:
+    global _check_timer
+    with _check_lock:
+        # 타이머 자리를 먼저 비움 → 아래 확인·빌드가 도는 동안 들어온 쓰기가 새 타이머를 걸 수 있음
+        _check_timer = None
+    if _status["building"]:
+        # 빌드 중에 들어온 쓰기: 버리지 않고 CHECK_DELAY_SECONDS 뒤 다시 확인 (빌드가 끝날 때까지 재예약)
+        schedule_reindex_check(table)
+        return
+    # 빈 테이블로 시작했으면 시작 시 만들지 못한 id 인덱스를 첫 추가 뒤 여기서 생성 (한 번만)
+    ensure_id_index(table)
+    maybe_reindex(table)
+
+
+def schedule_reindex_check(table) -> None:
+    """쓰기 후 호출. CHECK_DELAY_SECONDS 뒤 백그라운드에서 id 인덱스 보장과 재학습 필요 여부 확인.
+
+    이미 예약된 확인이 있으면 아무것도 하지 않음 (연속 쓰기는 확인 한 번으로 합침, 스레드는 최대 하나).
+    """
+    global _check_timer
+    with _check_lock:
+        if _check_timer is not None:
+            return
+        _check_timer = threading.Timer(CHECK_DELAY_SECONDS, _after_write, args=(table,))
+        _check_timer.daemon = True
+        _check_timer.start()
+
+
+def vector_search(table, vec, nprobes: Optional[int] = None, refine_factor: Optional[int] = None,
+                  metric: str = METRIC):
+    """튜닝 파라미터를 적용한 벡터 검색 빌더. 인덱스가 없으면 정확(전수) 검색과 같음.
+
+    metric 이 인덱스 metric(METRIC)과 다르면 인덱스는 그 거리로 학습된 게 아니므로 정확(전수) 검색으로 강제.
+    """
+    query = table.search(vec, vector_column_name="vector").metric(metric)
+    if metric != METRIC:
+        return query.bypass_vector_index()
+    query = query.nprobes(nprobes or SEARCH_NPROBES)
+    rf = SEARCH_REFINE_FACTOR if refine_factor is None else refine_factor
+    if rf and rf > 1:
+        query = query.refine_factor(rf)
+    return query
+
+
+def _recall_report(table, k: int, queries: int, nprobes_list: list[int], refine_list: list[int]) -> None:
+    from dedup import load_vector_matrix
+
+    ids, mat = load_vector_matrix(table)
+    if len(ids) <= k:
+        print("Not enough vectors for a report.")
+        return
+    if not index_status(table)["indexed"]:
+        print("No vector index yet; building one for the report...")
+        build_index(table)
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(ids), size=min(queries, len(ids)), replace=False)
+    sq = np.einsum("ij,ij->i", mat, mat)
+
+    exact: list[set] = []
+    t0 = time.perf_counter()
+    for qi in sample:
+        d = sq - 2.0 * (mat @ mat[qi]) + sq[qi]
+        exact.append(set(ids[np.argpartition(d, k)[:k]].tolist()))
+    exact_ms = (time.perf_counter() - t0) * 1000 / len(sample)
+    print(f"rows={len(ids)} k={k} queries={len(sample)} exact(numpy)={exact_ms:.2f} ms/query")
+    print(f"{'nprobes':>8} {'refine':>7} {'recall@k':>9} {'ms/query':>9}")
+    for nprobes in nprobes_list:
+        for rf in refine_list:
+            hits = 0
+            t0 = time.perf_counter()
+            for qi, truth in zip(sample, exact):
+                res = vector_search(table, mat[qi].tolist(), nprobes, rf).select(["id"]).limit(k).to_list()
+                hits += len(truth & {str(r["id"]) for r in res})
+            ms = (time.perf_counter() - t0) * 1000 / len(sample)
+            print(f"{nprobes:>8} {rf:>7} {hits / (k * len(sample)):>9.3f} {ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="벡터 인덱스 recall@k / 지연 리포트")
+    parser.add_argument("--report", action="store_true")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 벡터 N개로 임시 테이블 생성")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--nprobes", default="5,10,20,50")
+    parser.add_argument("--refine", default="1,5,10")
+    args = parser.parse_args()
+    if not args.report:
+        parser.print_help()
+        raise SystemExit(0)
+    nprobes_list = [int(x) for x in args.nprobes.split(",")]
+    refine_list = [int(x) for x in args.refine.split(",")]
+    if args.synthetic:
+        import lancedb
+
+        from schema import ImageRow
+
+        rng = np.random.default_rng(0)
+        vecs = rng.normal(size=(args.synthetic, VECTOR_DIM)).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            tbl = lancedb.connect(tmp).create_table("images", schema=ImageRow)
+            tbl.add([{
+                "id": str(i), "filename": "", "thumbnail": "", "originalName": "", "tags": [],
+                "width": None, "height": None, "notes": "", "createdAt": "", "vector": v.tolist(), "phash": None,
+            } for i, v in enumerate(vecs)])
+            _recall_report(tbl, args.k, args.queries, nprobes_list, refine_list)
+    else:
+        from db import get_table
+
+        _recall_report(get_table(), args.k, args.queries, nprobes_list, refine_list)
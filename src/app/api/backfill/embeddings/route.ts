@@ -8,6 +8,11 @@ export async function POST() {
       method: "POST",
       headers: { "Content-Type": "application/json" },
     });
+    if (res.status === 409) {
+      // 이미 대기·실행 중인 백필이 있으면 새로 만들지 않고 그 작업을 따라감
+      const running = (await res.json()) as { jobId?: string; status?: string };
+      return NextResponse.json({ jobId: running.jobId, status: running.status });
+    }
     if (!res.ok) {
       const err = await res.text();
       console.error("Python backfill/embeddings error:", res.status, err);
@@ -16,12 +21,9 @@ export async function POST() {
         { status: 502 }
       );
     }
-    const data = (await res.json()) as { updated?: number; skipped?: number; failed?: number };
-    return NextResponse.json({
-      updated: data.updated ?? 0,
-      skipped: data.skipped ?? 0,
-      failed: data.failed ?? 0,
-    });
+    // 작업 큐에 들어가므로 jobId 를 그대로 전달 (진행 상황·결과는 /api/jobs/[id])
+    const data = (await res.json()) as { jobId?: string; status?: string };
+    return NextResponse.json({ jobId: data.jobId, status: data.status });
   } catch (error) {
     console.error("backfill/embeddings error:", error);
     return NextResponse.json(
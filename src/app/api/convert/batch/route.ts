@@ -0,0 +1,45 @@
+import { NextRequest, NextResponse } from "next/server";
+
+const PYTHON_API = process.env.PYTHON_API_URL ?? "http://127.0.0.1:8000";
+
+export async function POST(req: NextRequest) {
+  try {
+    const body = await req.json();
+    const { imageIds, tagQuery, format, quality } = body;
+
+    if (!format || (!(Array.isArray(imageIds) && imageIds.length > 0) && !tagQuery)) {
+      return NextResponse.json(
+        { error: "format and imageIds or tagQuery are required" },
+        { status: 400 }
+      );
+    }
+
+    const res = await fetch(`${PYTHON_API}/convert/batch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        imageIds: Array.isArray(imageIds) ? imageIds : [],
+        tagQuery: tagQuery ?? null,
+        format,
+        quality: quality ?? 85,
+      }),
+    });
+
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      return NextResponse.json(
+        { error: err.error || "Batch conversion failed" },
+        { status: res.status }
+      );
+    }
+
+    const data = await res.json();
+    return NextResponse.json(data);
+  } catch (e) {
+    console.error("Batch convert API error:", e);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 }
+    );
+  }
+}
@@ -16,13 +16,15 @@ export async function DELETE(req: NextRequest) {
     }
 
     const uploadPath = path.join(process.cwd(), "public", "uploads", filename);
-    const thumbPath = path.join(process.cwd(), "public", "thumbnails", `${id}.webp`);
+    const thumbDir = path.join(process.cwd(), "public", "thumbnails");
+    const thumbPath = path.join(thumbDir, `${id}.webp`);
 
     await Promise.all([
       fs.unlink(uploadPath).catch(() => console.warn(`File not found: ${uploadPath}`)),
       fs.unlink(thumbPath).catch(() => console.warn(`Thumbnail not found: ${thumbPath}`)),
     ]);
 
+    // 크기별 파생 썸네일({id}_{크기}.webp)은 THUMB_SIZES 를 아는 Python 쪽이 행과 함께 삭제
     const res = await fetch(`${PYTHON_API}/images?id=${encodeURIComponent(id)}`, {
       method: "DELETE",
     });
@@ -0,0 +1,23 @@
+import { NextRequest, NextResponse } from "next/server";
+
+const PYTHON_API = process.env.PYTHON_API_URL ?? "http://127.0.0.1:8000";
+
+/** GET ?limit=N&after_id=커서 → 최신순 페이지 { images, next_cursor, version } */
+export async function GET(req: NextRequest) {
+  const limit = Math.min(1000, Math.max(1, Number(req.nextUrl.searchParams.get("limit")) || 200));
+  const afterId = req.nextUrl.searchParams.get("after_id");
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (afterId) params.set("after_id", afterId);
+  try {
+    const res = await fetch(`${PYTHON_API}/images?${params}`, { cache: "no-store" });
+    if (!res.ok) {
+      const err = await res.text();
+      console.error("Python images error:", res.status, err);
+      return NextResponse.json({ error: "Failed to load images" }, { status: res.status });
+    }
+    return NextResponse.json(await res.json());
+  } catch (error) {
+    console.error("images error:", error);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+}
@@ -0,0 +1,32 @@
+import { NextRequest, NextResponse } from "next/server";
+
+const PYTHON_API = process.env.PYTHON_API_URL ?? "http://127.0.0.1:8000";
+
+async function forward(res: Response) {
+  const data = await res.json().catch(() => ({}));
+  return NextResponse.json(data, { status: res.status });
+}
+
+/** 작업 상태 조회 (status, progress, detail, result, error) */
+export async function GET(_req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+  const { id } = await params;
+  try {
+    const res = await fetch(`${PYTHON_API}/jobs/${encodeURIComponent(id)}`, { cache: "no-store" });
+    return forward(res);
+  } catch (e) {
+    console.error("Jobs API error:", e);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+}
+
+/** 작업 취소 */
+export async function DELETE(_req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+  const { id } = await params;
+  try {
+    const res = await fetch(`${PYTHON_API}/jobs/${encodeURIComponent(id)}/cancel`, { method: "POST" });
+    return forward(res);
+  } catch (e) {
+    console.error("Jobs cancel API error:", e);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+}
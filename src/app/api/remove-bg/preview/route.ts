@@ -5,7 +5,7 @@ const PYTHON_API = process.env.PYTHON_API_URL ?? "http://127.0.0.1:8000";
 export async function POST(req: NextRequest) {
   try {
     const body = await req.json();
-    const { imageId, points, mode } = body;
+    const { imageId, points, mode, sessionId, maxSize, encoding } = body;
 
     if (!imageId) {
       return NextResponse.json(
@@ -24,7 +24,14 @@ export async function POST(req: NextRequest) {
     const res = await fetch(`${PYTHON_API}/remove-bg/preview`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ imageId, points, mode: mode || "extract" }),
+      body: JSON.stringify({
+        imageId,
+        points,
+        mode: mode || "extract",
+        sessionId: sessionId || "",
+        maxSize: maxSize ?? null,
+        encoding: encoding || "png",
+      }),
     });
 
     if (!res.ok) {
@@ -35,6 +42,15 @@ export async function POST(req: NextRequest) {
       );
     }
 
+    // rle/bits 마스크는 바이너리 그대로 전달 (크기 정보는 X-Mask-* 헤더)
+    if (res.headers.get("content-type")?.startsWith("application/octet-stream")) {
+      const headers = new Headers({ "Content-Type": "application/octet-stream" });
+      for (const [key, value] of res.headers) {
+        if (key.startsWith("x-mask-") || key.startsWith("x-source-")) headers.set(key, value);
+      }
+      return new NextResponse(await res.arrayBuffer(), { headers });
+    }
+
     const data = await res.json();
     return NextResponse.json(data);
   } catch (e) {
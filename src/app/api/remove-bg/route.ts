@@ -5,7 +5,7 @@ const PYTHON_API = process.env.PYTHON_API_URL ?? "http://127.0.0.1:8000";
 export async function POST(req: NextRequest) {
   try {
     const body = await req.json();
-    const { imageId, points, mode } = body;
+    const { imageId, points, mode, sessionId } = body;
 
     if (!imageId) {
       return NextResponse.json(
@@ -24,7 +24,7 @@ export async function POST(req: NextRequest) {
     const res = await fetch(`${PYTHON_API}/remove-bg`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ imageId, points, mode: mode || "extract" }),
+      body: JSON.stringify({ imageId, points, mode: mode || "extract", sessionId: sessionId || "" }),
     });
 
     if (!res.ok) {
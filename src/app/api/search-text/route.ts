@@ -0,0 +1,32 @@
+import { NextRequest, NextResponse } from "next/server";
+
+const PYTHON_API = process.env.PYTHON_API_URL ?? "http://127.0.0.1:8000";
+
+export async function POST(req: NextRequest) {
+  try {
+    const body = await req.json();
+    const query = body?.query;
+    if (!query || typeof query !== "string") {
+      return NextResponse.json({ error: "Missing query" }, { status: 400 });
+    }
+    const limit = Math.min(200, Math.max(1, Number(body?.limit) || 50));
+    const offset = Math.max(0, Number(body?.offset) || 0);
+
+    const res = await fetch(`${PYTHON_API}/search_text`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ query: query.trim(), limit, offset }),
+    });
+
+    if (!res.ok) {
+      const err = await res.text();
+      console.error("Python search_text error:", res.status, err);
+      return NextResponse.json({ error: "Text search failed" }, { status: res.status });
+    }
+    const data = await res.json();
+    return NextResponse.json({ results: data.results ?? [], next_offset: data.next_offset ?? null });
+  } catch (error) {
+    console.error("search_text error:", error);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+}
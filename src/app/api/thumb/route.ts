@@ -12,9 +12,16 @@ export async function GET(req: NextRequest) {
     return NextResponse.json({ error: "Missing or invalid id" }, { status: 400 });
   }
 
-  const filePath = path.join(THUMB_DIR, `${id}.webp`);
+  // 기본(400) 외 크기는 Python 파생 이미지 파이프라인이 {id}_{size}.webp 로 함께 만듦 (THUMB_SIZES)
+  const size = req.nextUrl.searchParams.get("size");
+  const basePath = path.join(THUMB_DIR, `${id}.webp`);
+  const sizedPath =
+    size && /^\d+$/.test(size) ? path.join(THUMB_DIR, `${id}_${size}.webp`) : null;
   try {
-    const buffer = await fs.readFile(filePath);
+    // 해당 크기가 없으면 (sharp 로 만든 이전 썸네일 등) 기본 썸네일로 대체
+    const buffer = sizedPath
+      ? await fs.readFile(sizedPath).catch(() => fs.readFile(basePath))
+      : await fs.readFile(basePath);
     return new NextResponse(buffer, {
       headers: {
         "Content-Type": "image/webp",
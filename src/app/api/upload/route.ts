@@ -3,8 +3,8 @@ import fs from "fs/promises";
 import { readExcludeTagsFromFile } from "@/lib/server/exclude-tags";
 import { readSettingsFromFile } from "@/lib/server/settings";
 import { mapLimit } from "@/lib/utils/mapLimit";
-import { UPLOAD_DIR, THUMB_DIR } from "@/lib/upload/constants";
-import { processOneImage } from "@/lib/upload/processImage";
+import { UPLOAD_DIR, THUMB_DIR, TAG_BATCH_SIZE } from "@/lib/upload/constants";
+import { processImageBatch } from "@/lib/upload/processImage";
 import { deleteProgress, setProgress } from "./progressStore";
 
 export async function POST(req: NextRequest) {
@@ -61,8 +61,12 @@ export async function POST(req: NextRequest) {
 
     let completed = 0;
     const total = imageFiles.length;
-    const metadataList = await mapLimit(imageFiles, 3, (file, index) =>
-      processOneImage(file, index, {
+    const batches: File[][] = [];
+    for (let i = 0; i < imageFiles.length; i += TAG_BATCH_SIZE) {
+      batches.push(imageFiles.slice(i, i + TAG_BATCH_SIZE));
+    }
+    const batchResults = await mapLimit(batches, 2, (batch, batchIndex) =>
+      processImageBatch(batch, batchIndex * TAG_BATCH_SIZE, {
         baseId,
         excludeTagSet,
         wd14Threshold,
@@ -79,6 +83,7 @@ export async function POST(req: NextRequest) {
           : undefined,
       })
     );
+    const metadataList = batchResults.flat();
 
     if (uploadId) {
       setProgress(uploadId, {
@@ -1,15 +1,15 @@
 import GalleryClient from "@/components/GalleryClient";
-import { getImageMetadataList } from "@/lib/images";
+import { getFirstImagePage } from "@/lib/images";
 
 export const dynamic = "force-dynamic";
 
 export default async function Home() {
-  const initialImages = await getImageMetadataList();
+  const { images: initialImages, nextCursor } = await getFirstImagePage();
 
   return (
     <div className="space-y-8">
       {/* 클라이언트 컴포넌트인 GalleryClient에 초기 데이터 전달 */}
-      <GalleryClient initialImages={initialImages} />
+      <GalleryClient initialImages={initialImages} initialCursor={nextCursor} />
     </div>
   );
 }
\ No newline at end of file
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect, useCallback, useRef } from "react";
+import { useState, useCallback, useRef } from "react";
 import { Menu, ImagePlus } from "lucide-react";
 import { useSearch } from "@/hooks/useSearch";
 import { useDelete } from "@/hooks/useDelete";
@@ -9,6 +9,7 @@ import { useBulkTag } from "@/hooks/useBulkTag";
 import { useFolders } from "@/hooks/useFolders";
 import { useGalleryImages } from "@/hooks/useGalleryImages";
 import { useUpload } from "@/hooks/useUpload";
+import { useImagePages } from "@/hooks/useImagePages";
 import { searchSimilar } from "@/lib/api/search-similar";
 import ImageModal from "./ImageModal";
 import SimilarImagesDrawer from "./similar/SimilarImagesDrawer";
@@ -16,7 +17,13 @@ import { BulkTagBar, GalleryGrid, SearchBar } from "./gallery";
 import FolderSidebarLayout from "./sidebar/FolderSidebarLayout";
 import type { ImageItem } from "@/types/gallery";
 
-export default function GalleryClient({ initialImages }: { initialImages: ImageItem[] }) {
+export default function GalleryClient({
+  initialImages,
+  initialCursor,
+}: {
+  initialImages: ImageItem[];
+  initialCursor: string | null;
+}) {
   const [images, setImages] = useState<ImageItem[]>(initialImages);
   const [mobileSidebarOpen, setMobileSidebarOpen] = useState(false);
   const [isBulkDeleting, setIsBulkDeleting] = useState(false);
@@ -73,9 +80,7 @@ export default function GalleryClient({ initialImages }: { initialImages: ImageI
     clearSelection
   );
 
-  useEffect(() => {
-    setImages(initialImages);
-  }, [initialImages]);
+  useImagePages(initialImages, initialCursor, setImages);
 
   const handleDeleteClick = async (e: React.MouseEvent, id: string, filename: string) => {
     e.stopPropagation();
@@ -132,6 +132,7 @@ export default function GalleryCard({
 
       <img
         src={`/api/thumb?id=${image.id}`}
+        srcSet={`/api/thumb?id=${image.id} 1x, /api/thumb?id=${image.id}&size=1200 2x`}
         className="w-full h-full object-contain transition-transform duration-500 group-hover:scale-105"
         alt={image.originalName}
         loading="lazy"
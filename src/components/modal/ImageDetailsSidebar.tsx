@@ -9,6 +9,7 @@ import { NoteSection } from "./sections/NoteSection";
 import { FolderSection } from "./sections/FolderSection";
 import type { Folder } from "@/types/folders";
 import type { ImageItem } from "@/types/gallery";
+import { runJob } from "@/lib/api";
 
 export default function ImageDetailsSidebar({
   image,
@@ -38,22 +39,22 @@ export default function ImageDetailsSidebar({
   const [upscaleExpanded, setUpscaleExpanded] = useState(false);
   const [upscaleScale, setUpscaleScale] = useState(2.0);
   const [isUpscaling, setIsUpscaling] = useState(false);
+  const [upscaleProgress, setUpscaleProgress] = useState<number | null>(null);
 
   const handleUpscale = useCallback(async () => {
     if (isUpscaling) return;
     setIsUpscaling(true);
     try {
-      const res = await fetch("/api/upscale", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          imageId: image.id,
-          scale: upscaleScale,
-        }),
-      });
-      const data = await res.json();
-      if (!res.ok) {
-        alert(`업스케일 실패: ${data.error || "알 수 없는 오류"}`);
+      // 서버 작업 큐에서 처리 — 진행률을 받아 표시하며 끝날 때까지 대기
+      let data: { image?: ImageItem };
+      try {
+        data = await runJob<{ image?: ImageItem }>(
+          "/api/upscale",
+          { imageId: image.id, scale: upscaleScale },
+          (job) => setUpscaleProgress(job.progress)
+        );
+      } catch (e) {
+        alert(`업스케일 실패: ${e instanceof Error ? e.message : "알 수 없는 오류"}`);
         return;
       }
       alert(`업스케일 완료! 새 이미지가 갤러리에 추가되었습니다.`);
@@ -66,6 +67,7 @@ export default function ImageDetailsSidebar({
       console.error(e);
     } finally {
       setIsUpscaling(false);
+      setUpscaleProgress(null);
     }
   }, [image.id, upscaleScale, isUpscaling, onImageCreated]);
 
@@ -79,18 +81,15 @@ export default function ImageDetailsSidebar({
     if (isConverting) return;
     setIsConverting(true);
     try {
-      const res = await fetch("/api/convert", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
+      let data: { image?: ImageItem };
+      try {
+        data = await runJob<{ image?: ImageItem }>("/api/convert", {
           imageId: image.id,
           format: convertFormat,
           quality: convertQuality,
-        }),
-      });
-      const data = await res.json();
-      if (!res.ok) {
-        alert(`변환 실패: ${data.error || "알 수 없는 오류"}`);
+        });
+      } catch (e) {
+        alert(`변환 실패: ${e instanceof Error ? e.message : "알 수 없는 오류"}`);
         return;
       }
       alert(`변환 완료! 새 이미지가 갤러리에 추가되었습니다.`);
@@ -299,7 +298,7 @@ export default function ImageDetailsSidebar({
                     {isUpscaling ? (
                       <>
                         <Loader2 className="w-4 h-4 animate-spin" />
-                        업스케일 중...
+                        업스케일 중...{upscaleProgress != null && ` ${Math.round(upscaleProgress * 100)}%`}
                       </>
                     ) : (
                       <>
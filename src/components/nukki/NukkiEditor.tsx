@@ -4,6 +4,7 @@ import { useState, useRef, useCallback, useEffect } from "react";
 import { TransformWrapper, TransformComponent, useControls } from "react-zoom-pan-pinch";
 import { X, ZoomIn, ZoomOut, RotateCcw, Loader2, Trash2, MousePointer2, Eye } from "lucide-react";
 import type { ImageItem } from "@/types/gallery";
+import { previewMask, runJob } from "@/lib/api";
 
 interface ClickPoint {
   x: number;
@@ -56,10 +57,12 @@ export default function NukkiEditor({ image, onClose, onComplete }: NukkiEditorP
   const [mode, setMode] = useState<Mode>("extract");
   const [isProcessing, setIsProcessing] = useState(false);
   const [isPreviewing, setIsPreviewing] = useState(false);
-  const [maskData, setMaskData] = useState<string | null>(null);
+  const [maskUrl, setMaskUrl] = useState<string | null>(null);
   const [isPanning, setIsPanning] = useState(false);
   const imageRef = useRef<HTMLImageElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
+  // 서버가 이 편집 세션의 이전 마스크를 이어서 쓰도록 미리보기·실행에 함께 보냄
+  const sessionIdRef = useRef(`${image.id}-${Date.now()}-${Math.random().toString(36).slice(2, 8)}`);
 
   useEffect(() => {
     const handleKeyDown = (e: KeyboardEvent) => {
@@ -72,9 +75,16 @@ export default function NukkiEditor({ image, onClose, onComplete }: NukkiEditorP
   }, [onClose]);
 
   useEffect(() => {
-    setMaskData(null);
+    setMaskUrl(null);
   }, [points, mode]);
 
+  // 미리보기 마스크는 object URL 이므로 바뀌거나 닫힐 때 해제
+  useEffect(() => {
+    return () => {
+      if (maskUrl) URL.revokeObjectURL(maskUrl);
+    };
+  }, [maskUrl]);
+
   const addPoint = useCallback((e: React.MouseEvent<HTMLDivElement>) => {
     if (isPanning || isProcessing || isPreviewing) return;
 
@@ -109,7 +119,7 @@ export default function NukkiEditor({ image, onClose, onComplete }: NukkiEditorP
 
   const clearPoints = useCallback(() => {
     setPoints([]);
-    setMaskData(null);
+    setMaskUrl(null);
   }, []);
 
   const handlePreview = useCallback(async () => {
@@ -117,26 +127,22 @@ export default function NukkiEditor({ image, onClose, onComplete }: NukkiEditorP
 
     setIsPreviewing(true);
     try {
-      const res = await fetch("/api/remove-bg/preview", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          imageId: image.id,
-          points: points,
-          mode: mode,
-        }),
+      // 화면에 보이는 크기만큼만 받음 (원본 해상도 마스크는 최종 실행에서만)
+      const rect = imageRef.current?.getBoundingClientRect();
+      const maxSize = rect
+        ? Math.ceil(Math.max(rect.width, rect.height) * (window.devicePixelRatio || 1))
+        : undefined;
+      const mask = await previewMask({
+        imageId: image.id,
+        points,
+        mode,
+        sessionId: sessionIdRef.current,
+        maxSize,
       });
-
-      const data = await res.json();
-      if (!res.ok) {
-        alert(`미리보기 실패: ${data.error || "알 수 없는 오류"}`);
-        return;
-      }
-
-      setMaskData(data.mask);
+      setMaskUrl(mask.url);
     } catch (e) {
       console.error(e);
-      alert("미리보기 중 오류가 발생했습니다.");
+      alert(`미리보기 실패: ${e instanceof Error ? e.message : "알 수 없는 오류"}`);
     } finally {
       setIsPreviewing(false);
     }
@@ -147,19 +153,16 @@ export default function NukkiEditor({ image, onClose, onComplete }: NukkiEditorP
 
     setIsProcessing(true);
     try {
-      const res = await fetch("/api/remove-bg", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
+      let data: { image?: ImageItem };
+      try {
+        data = await runJob<{ image?: ImageItem }>("/api/remove-bg", {
           imageId: image.id,
           points: points,
           mode: mode,
-        }),
-      });
-
-      const data = await res.json();
-      if (!res.ok) {
-        alert(`실패: ${data.error || "알 수 없는 오류"}`);
+          sessionId: sessionIdRef.current,
+        });
+      } catch (e) {
+        alert(`실패: ${e instanceof Error ? e.message : "알 수 없는 오류"}`);
         return;
       }
 
@@ -241,12 +244,12 @@ export default function NukkiEditor({ image, onClose, onComplete }: NukkiEditorP
                     />
                     
                     {/* 마스크 오버레이 (줄무늬 패턴) */}
-                    {maskData && (
+                    {maskUrl && (
                       <div 
                         className="absolute inset-0 pointer-events-none"
                         style={{
-                          maskImage: `url(data:image/png;base64,${maskData})`,
-                          WebkitMaskImage: `url(data:image/png;base64,${maskData})`,
+                          maskImage: `url(${maskUrl})`,
+                          WebkitMaskImage: `url(${maskUrl})`,
                           maskSize: "100% 100%",
                           WebkitMaskSize: "100% 100%",
                           backgroundImage: mode === "extract" 
@@ -257,12 +260,12 @@ export default function NukkiEditor({ image, onClose, onComplete }: NukkiEditorP
                     )}
                     
                     {/* 마스크 테두리 */}
-                    {maskData && (
+                    {maskUrl && (
                       <div 
                         className="absolute inset-0 pointer-events-none"
                         style={{
-                          maskImage: `url(data:image/png;base64,${maskData})`,
-                          WebkitMaskImage: `url(data:image/png;base64,${maskData})`,
+                          maskImage: `url(${maskUrl})`,
+                          WebkitMaskImage: `url(${maskUrl})`,
                           maskSize: "100% 100%",
                           WebkitMaskSize: "100% 100%",
                           boxShadow: mode === "extract" 
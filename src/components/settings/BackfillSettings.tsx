@@ -2,14 +2,15 @@
 
 import { useState } from "react";
 import { Loader2, Database, Copy } from "lucide-react";
-import { runBackfillEmbeddings } from "@/lib/api/backfill";
+import { runBackfillEmbeddings, type BackfillEmbeddingsResult } from "@/lib/api/backfill";
 import { fetchDuplicateCandidates } from "@/lib/api/duplicate-candidates";
 import type { ImageItem } from "@/types/gallery";
 import DuplicateCandidatesModal from "./DuplicateCandidatesModal";
 
 export default function BackfillSettings() {
   const [loading, setLoading] = useState(false);
-  const [result, setResult] = useState<{ updated: number; skipped: number; failed: number } | null>(null);
+  const [result, setResult] = useState<BackfillEmbeddingsResult | null>(null);
+  const [progress, setProgress] = useState<BackfillEmbeddingsResult | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [duplicateLoading, setDuplicateLoading] = useState(false);
   const [duplicateGroups, setDuplicateGroups] = useState<ImageItem[][] | null>(null);
@@ -20,12 +21,13 @@ export default function BackfillSettings() {
     setResult(null);
     setError(null);
     try {
-      const data = await runBackfillEmbeddings();
+      const data = await runBackfillEmbeddings(setProgress);
       setResult(data);
     } catch (e) {
       setError(e instanceof Error ? e.message : "백필 실패");
     } finally {
       setLoading(false);
+      setProgress(null);
     }
   };
 
@@ -46,7 +48,7 @@ export default function BackfillSettings() {
           {loading ? (
             <>
               <Loader2 className="w-4 h-4 animate-spin" />
-              백필 실행 중...
+              백필 실행 중...{progress && ` (갱신 ${progress.updated}건)`}
             </>
           ) : (
             <>
@@ -70,6 +72,7 @@ export default function BackfillSettings() {
             <li>벡터 갱신: {result.updated}건</li>
             <li>파일 없음/건너뜀: {result.skipped}건</li>
             <li>실패: {result.failed}건</li>
+            {result.imagesPerSecond ? <li>처리 속도: {result.imagesPerSecond}장/초</li> : null}
           </ul>
         </div>
       )}
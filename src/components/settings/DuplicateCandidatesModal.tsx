@@ -68,13 +68,13 @@ export default function DuplicateCandidatesModal({
                       className="flex flex-col items-center gap-1"
                     >
                       <a
-                        href={`/api/thumb?id=${img.id}`}
+                        href={`/api/thumb?id=${img.id}&size=1200`}
                         target="_blank"
                         rel="noopener noreferrer"
                         className="block w-20 h-20 rounded-lg overflow-hidden border border-white/10 hover:border-indigo-500/50 transition-colors focus:outline-none focus:ring-2 focus:ring-indigo-500"
                       >
                         <img
-                          src={`/api/thumb?id=${img.id}`}
+                          src={`/api/thumb?id=${img.id}&size=200`}
                           alt={img.originalName ?? ""}
                           className="w-full h-full object-cover"
                         />
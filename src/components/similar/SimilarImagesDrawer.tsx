@@ -51,7 +51,7 @@ export default function SimilarImagesDrawer({
           <p className="text-xs text-white/50 mb-2">기준 이미지</p>
           <div className="flex gap-2 items-center">
             <img
-              src={`/api/thumb?id=${queryImage.id}`}
+              src={`/api/thumb?id=${queryImage.id}&size=200`}
               alt=""
               className="w-14 h-14 object-cover rounded-lg shrink-0"
             />
@@ -85,7 +85,7 @@ export default function SimilarImagesDrawer({
                 className="aspect-square rounded-lg overflow-hidden border border-white/10 hover:border-indigo-500/50 hover:ring-1 hover:ring-indigo-500/50 transition-all focus:outline-none focus:ring-2 focus:ring-indigo-500"
               >
                 <img
-                  src={`/api/thumb?id=${img.id}`}
+                  src={`/api/thumb?id=${img.id}&size=200`}
                   alt={img.originalName ?? ""}
                   className="w-full h-full object-cover"
                 />
@@ -0,0 +1,42 @@
+"use client";
+
+import { useEffect } from "react";
+import { getImagePage } from "@/lib/api";
+import type { ImageItem } from "@/types/gallery";
+
+/**
+ * 서버에서 받은 첫 페이지로 목록을 채운 뒤, 나머지를 /images 커서 페이지로 이어 받아 뒤에 붙입니다.
+ * 검색·폴더 필터는 전체 목록 기준이라 끝까지 받되, 첫 화면은 첫 페이지만으로 바로 그립니다.
+ */
+export function useImagePages(
+  initialImages: ImageItem[],
+  initialCursor: string | null,
+  setImages: React.Dispatch<React.SetStateAction<ImageItem[]>>
+) {
+  useEffect(() => {
+    setImages(initialImages);
+    if (!initialCursor) return;
+    let cancelled = false;
+    const loadRest = async () => {
+      let cursor: string | null = initialCursor;
+      try {
+        while (cursor && !cancelled) {
+          const page = await getImagePage(cursor);
+          if (cancelled) break;
+          setImages((prev) => {
+            // 그 사이 업로드·변환으로 앞에 추가된 이미지와 겹치지 않게
+            const seen = new Set(prev.map((img) => img.id));
+            return [...prev, ...page.images.filter((img) => !seen.has(img.id))];
+          });
+          cursor = page.nextCursor;
+        }
+      } catch (e) {
+        console.error("Failed to load more images:", e);
+      }
+    };
+    loadRest();
+    return () => {
+      cancelled = true;
+    };
+  }, [initialImages, initialCursor, setImages]);
+}
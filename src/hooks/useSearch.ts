@@ -1,6 +1,6 @@
 // src/hooks/useSearch.ts
 import { useState, useEffect, useCallback } from "react";
-import { searchSemantic } from "@/lib/api";
+import { searchText } from "@/lib/api";
 import type { ImageItem } from "@/types/gallery";
 
 export function useSearch(initialImages: ImageItem[]) {
@@ -23,16 +23,21 @@ export function useSearch(initialImages: ImageItem[]) {
     setIsSearching(true);
     (async () => {
       try {
-        const allUniqueTags = Array.from(new Set(initialImages.flatMap((img) => img.tags ?? [])));
-        const { match_tags } = await searchSemantic(searchTerm, allUniqueTags);
+        // 서버에서 CLIP 텍스트 벡터로 이미지 벡터를 직접 검색 (점수순)
+        const { results } = await searchText(searchTerm);
+        const byId = new Map(initialImages.map((img) => [img.id, img]));
+        const hits = results.map((r) => byId.get(r.id)).filter((img): img is ImageItem => !!img);
+        const hitIds = new Set(hits.map((img) => img.id));
 
-        const filtered = initialImages.filter((img) => {
-          const matchTags = (img.tags ?? []).some((tag) => match_tags.includes(tag));
+        // 벡터 검색 결과 뒤에 태그·이름·메모 일치 결과를 이어 붙임 (임베딩 전 이미지도 태그로 찾을 수 있게)
+        const textMatches = initialImages.filter((img) => {
+          if (hitIds.has(img.id)) return false;
+          const matchTags = (img.tags ?? []).some((tag) => tag.toLowerCase().includes(searchTerm));
           const matchName = img.originalName.toLowerCase().includes(searchTerm);
           const matchNotes = img.notes && img.notes.toLowerCase().includes(searchTerm);
           return matchTags || matchName || matchNotes;
         });
-        setFilteredImages(filtered);
+        setFilteredImages([...hits, ...textMatches]);
       } catch (error) {
         const fallback = initialImages.filter((img) => {
           const matchTags = (img.tags ?? []).some((tag) => tag.toLowerCase().includes(searchTerm));
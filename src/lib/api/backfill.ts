@@ -1,14 +1,29 @@
+import { runJob } from "./jobs";
+
 export interface BackfillEmbeddingsResult {
   updated: number;
   skipped: number;
   failed: number;
+  /** 임베딩 처리량 (이미지/초) */
+  imagesPerSecond?: number;
+}
+
+/** 백필 작업을 큐에 넣고 끝날 때까지 대기. onProgress 는 처리 중 누적 건수로 호출. */
+export async function runBackfillEmbeddings(
+  onProgress?: (partial: BackfillEmbeddingsResult) => void
+): Promise<BackfillEmbeddingsResult> {
+  const result = await runJob<Partial<BackfillEmbeddingsResult>>("/api/backfill/embeddings", undefined, (job) => {
+    if (job.detail && onProgress) onProgress(toResult(job.detail));
+  });
+  return toResult(result ?? {});
 }
 
-export async function runBackfillEmbeddings(): Promise<BackfillEmbeddingsResult> {
-  const res = await fetch("/api/backfill/embeddings", { method: "POST" });
-  if (!res.ok) {
-    const data = await res.json().catch(() => ({}));
-    throw new Error((data as { error?: string }).error ?? "백필 실패");
-  }
-  return res.json() as Promise<BackfillEmbeddingsResult>;
+function toResult(data: Partial<BackfillEmbeddingsResult> | Record<string, unknown>): BackfillEmbeddingsResult {
+  const d = data as Partial<BackfillEmbeddingsResult>;
+  return {
+    updated: d.updated ?? 0,
+    skipped: d.skipped ?? 0,
+    failed: d.failed ?? 0,
+    imagesPerSecond: d.imagesPerSecond ?? 0,
+  };
 }
@@ -0,0 +1,42 @@
+import type { ImageItem } from "@/types/gallery";
+import { runJob, type Job } from "./jobs";
+
+export type ConvertFormat = "png" | "jpg" | "webp";
+
+/** 일괄 변환 이미지별 결과 (끝난 순서). 실패면 error */
+export type ConvertBatchItem = {
+  sourceId: string;
+  id?: string;
+  filename?: string;
+  error?: string;
+};
+
+export type ConvertBatchResult = {
+  success: boolean;
+  converted: number;
+  failed: number;
+  items: ConvertBatchItem[];
+  images: ImageItem[];
+};
+
+export type ConvertBatchProgress = {
+  done: number;
+  total: number;
+  items: ConvertBatchItem[];
+};
+
+/**
+ * 여러 이미지를 한 작업으로 변환 (imageIds 또는 불리언 태그 식 tagQuery).
+ * onProgress 로 진행 수와 지금까지 끝난 이미지별 결과를 받음.
+ */
+export async function convertBatch(
+  params: { imageIds?: string[]; tagQuery?: string; format: ConvertFormat; quality?: number },
+  onProgress?: (progress: ConvertBatchProgress) => void
+): Promise<ConvertBatchResult> {
+  return runJob<ConvertBatchResult>("/api/convert/batch", params, (job: Job<ConvertBatchResult>) => {
+    const detail = job.detail as Partial<ConvertBatchProgress> | null;
+    if (detail?.total) {
+      onProgress?.({ done: detail.done ?? 0, total: detail.total, items: detail.items ?? [] });
+    }
+  });
+}
@@ -0,0 +1,9 @@
+import { IMAGE_PAGE_SIZE, toImagePage, type ImagePage } from "@/lib/images";
+
+/** afterId(이전 페이지 nextCursor) 다음부터 최신순 한 페이지 */
+export async function getImagePage(afterId: string, limit = IMAGE_PAGE_SIZE): Promise<ImagePage> {
+  const params = new URLSearchParams({ limit: String(limit), after_id: afterId });
+  const res = await fetch(`/api/images?${params}`, { cache: "no-store" });
+  if (!res.ok) throw new Error(`Failed to load images (${res.status})`);
+  return toImagePage(await res.json());
+}
@@ -1,4 +1,6 @@
 export { searchSemantic } from "./search";
+export { searchText, type TextSearchHit } from "./search-text";
+export { getImagePage } from "./images";
 export { deleteImage } from "./delete";
 export { updateNotes, updateTags } from "./update";
 export { getFolders, saveFolders } from "./folders";
@@ -15,3 +17,12 @@ export {
   type AppSettings,
 } from "./settings";
 export { getExcludeTags, saveExcludeTags } from "./exclude-tags";
+export { previewMask, type MaskPoint, type MaskPreview } from "./remove-bg";
+export { getJob, cancelJob, waitForJob, runJob, type Job, type JobStatus } from "./jobs";
+export {
+  convertBatch,
+  type ConvertBatchItem,
+  type ConvertBatchProgress,
+  type ConvertBatchResult,
+  type ConvertFormat,
+} from "./convert";
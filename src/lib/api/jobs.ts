@@ -0,0 +1,60 @@
+export type JobStatus = "queued" | "running" | "succeeded" | "failed" | "cancelled";
+
+export interface Job<T = unknown> {
+  id: string;
+  kind: string;
+  status: JobStatus;
+  priority: number;
+  /** 0~1, 알 수 없으면 null */
+  progress: number | null;
+  detail: Record<string, unknown> | null;
+  result: T | null;
+  error: string | null;
+}
+
+export async function getJob<T = unknown>(jobId: string): Promise<Job<T>> {
+  const res = await fetch(`/api/jobs/${encodeURIComponent(jobId)}`, { cache: "no-store" });
+  const data = await res.json().catch(() => ({}));
+  if (!res.ok) throw new Error((data as { error?: string }).error ?? "작업 조회 실패");
+  return data as Job<T>;
+}
+
+export async function cancelJob(jobId: string): Promise<void> {
+  await fetch(`/api/jobs/${encodeURIComponent(jobId)}`, { method: "DELETE" });
+}
+
+/** 작업이 끝날 때까지 주기적으로 조회. 성공하면 result, 실패·취소면 예외. */
+export async function waitForJob<T = unknown>(
+  jobId: string,
+  onProgress?: (job: Job<T>) => void,
+  intervalMs = 1000
+): Promise<T> {
+  for (;;) {
+    const job = await getJob<T>(jobId);
+    onProgress?.(job);
+    if (job.status === "succeeded") return job.result as T;
+    if (job.status === "failed") throw new Error(job.error || "작업 실패");
+    if (job.status === "cancelled") throw new Error("작업이 취소되었습니다.");
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
+/**
+ * 작업 큐로 처리되는 API 호출: POST 후 jobId 를 받아 끝날 때까지 기다려 결과 반환.
+ * 실패 시 서버 오류 메시지로 예외.
+ */
+export async function runJob<T = unknown>(
+  url: string,
+  body?: unknown,
+  onProgress?: (job: Job<T>) => void
+): Promise<T> {
+  const res = await fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: body === undefined ? undefined : JSON.stringify(body),
+  });
+  const data = (await res.json().catch(() => ({}))) as { jobId?: string; error?: string };
+  if (!res.ok) throw new Error(data.error || "알 수 없는 오류");
+  if (!data.jobId) return data as T;
+  return waitForJob<T>(data.jobId, onProgress);
+}
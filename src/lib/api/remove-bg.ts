@@ -0,0 +1,56 @@
+export type MaskPoint = { x: number; y: number; label: number };
+
+export type MaskPreview = { url: string; width: number; height: number };
+
+/** 런 길이(uint32 LE, 0 구간부터 번갈아) 마스크 → 흰색 + 알파 RGBA 픽셀 */
+function decodeRle(buffer: ArrayBuffer, width: number, height: number) {
+  const counts = new DataView(buffer);
+  const pixels = new Uint8ClampedArray(width * height * 4);
+  let pos = 0;
+  for (let i = 0; i * 4 < buffer.byteLength; i++) {
+    const run = counts.getUint32(i * 4, true);
+    if (i % 2 === 1) {
+      for (let p = pos; p < pos + run; p++) {
+        pixels[p * 4] = 255;
+        pixels[p * 4 + 1] = 255;
+        pixels[p * 4 + 2] = 255;
+        pixels[p * 4 + 3] = 255;
+      }
+    }
+    pos += run;
+  }
+  return pixels;
+}
+
+/**
+ * 누끼 미리보기 마스크. 표시 크기(maxSize, 긴 변 px)로 줄인 rle 바이너리를 받아
+ * CSS mask-image 로 쓸 PNG object URL 로 만듦. 다 쓴 URL 은 URL.revokeObjectURL 로 해제.
+ */
+export async function previewMask(params: {
+  imageId: string;
+  points: MaskPoint[];
+  mode: "extract" | "remove";
+  sessionId: string;
+  maxSize?: number;
+}): Promise<MaskPreview> {
+  const res = await fetch("/api/remove-bg/preview", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ ...params, encoding: "rle" }),
+  });
+  if (!res.ok) {
+    const data = (await res.json().catch(() => ({}))) as { error?: string };
+    throw new Error(data.error || "알 수 없는 오류");
+  }
+  const width = Number(res.headers.get("x-mask-width"));
+  const height = Number(res.headers.get("x-mask-height"));
+  const pixels = decodeRle(await res.arrayBuffer(), width, height);
+
+  const canvas = document.createElement("canvas");
+  canvas.width = width;
+  canvas.height = height;
+  canvas.getContext("2d")!.putImageData(new ImageData(pixels, width, height), 0, 0);
+  const blob = await new Promise<Blob | null>((resolve) => canvas.toBlob(resolve, "image/png"));
+  if (!blob) throw new Error("마스크 변환 실패");
+  return { url: URL.createObjectURL(blob), width, height };
+}
@@ -0,0 +1,23 @@
+export type TextSearchHit = { id: string; score: number };
+
+export async function searchText(
+  query: string,
+  limit = 200,
+  offset = 0
+): Promise<{ results: TextSearchHit[]; next_offset: number | null }> {
+  const res = await fetch("/api/search-text", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ query, limit, offset }),
+  });
+  if (!res.ok) throw new Error("Text search failed");
+  const data = (await res.json()) as { results?: unknown[]; next_offset?: number | null };
+  const list = Array.isArray(data.results) ? data.results : [];
+  return {
+    results: list.map((item: unknown) => {
+      const o = item as Record<string, unknown>;
+      return { id: String(o.id ?? ""), score: typeof o.score === "number" ? o.score : 0 };
+    }),
+    next_offset: typeof data.next_offset === "number" ? data.next_offset : null,
+  };
+}
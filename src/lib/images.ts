@@ -2,29 +2,47 @@ import type { ImageItem } from "@/types/gallery";
 
 const PYTHON_API = process.env.PYTHON_API_URL ?? "http://127.0.0.1:8000";
 
+/** 첫 화면과 이후 페이지에서 한 번에 받는 이미지 수 */
+export const IMAGE_PAGE_SIZE = 200;
+
+export type ImagePage = { images: ImageItem[]; nextCursor: string | null };
+
+/** Python /images 응답의 행 하나 → ImageItem */
+export function toImageItem(item: Record<string, unknown>): ImageItem {
+  return {
+    id: String(item.id ?? ""),
+    filename: String(item.filename ?? ""),
+    thumbnail: String(item.thumbnail ?? ""),
+    originalName: String(item.originalName ?? ""),
+    tags: Array.isArray(item.tags) ? (item.tags as string[]) : [],
+    width: typeof item.width === "number" ? item.width : undefined,
+    height: typeof item.height === "number" ? item.height : undefined,
+    notes: typeof item.notes === "string" ? item.notes : "",
+    createdAt: typeof item.createdAt === "string" ? item.createdAt : undefined,
+  };
+}
+
+/** /images 페이지 응답 { images, next_cursor } → ImagePage */
+export function toImagePage(data: unknown): ImagePage {
+  const page = (data ?? {}) as { images?: unknown; next_cursor?: unknown };
+  const list = Array.isArray(page.images) ? page.images : [];
+  return {
+    images: list.map((item: Record<string, unknown>) => toImageItem(item)),
+    nextCursor: typeof page.next_cursor === "string" ? page.next_cursor : null,
+  };
+}
+
 /**
- * LanceDB(Python 서버)에서 이미지 메타데이터 목록을 가져옵니다.
- * id 기준 최신순으로 정렬된 배열을 반환합니다.
+ * LanceDB(Python 서버)에서 이미지 메타데이터 첫 페이지를 가져옵니다.
+ * id 기준 최신순이며, 나머지는 nextCursor 로 클라이언트가 이어서 받습니다.
  */
-export async function getImageMetadataList(): Promise<ImageItem[]> {
+export async function getFirstImagePage(): Promise<ImagePage> {
   try {
-    const res = await fetch(`${PYTHON_API}/images`, { cache: "no-store" });
-    if (!res.ok) return [];
-    const data = (await res.json()) as unknown;
-    const list = Array.isArray(data) ? data : [];
-    return list.map((item: Record<string, unknown>) => ({
-      id: String(item.id ?? ""),
-      filename: String(item.filename ?? ""),
-      thumbnail: String(item.thumbnail ?? ""),
-      originalName: String(item.originalName ?? ""),
-      tags: Array.isArray(item.tags) ? (item.tags as string[]) : [],
-      width: typeof item.width === "number" ? item.width : undefined,
-      height: typeof item.height === "number" ? item.height : undefined,
-      notes: typeof item.notes === "string" ? item.notes : "",
-      createdAt: typeof item.createdAt === "string" ? item.createdAt : undefined,
-    }));
+    const res = await fetch(`${PYTHON_API}/images?limit=${IMAGE_PAGE_SIZE}`, { cache: "no-store" });
+    if (!res.ok) return { images: [], nextCursor: null };
+    return toImagePage(await res.json());
   } catch (e) {
     console.error("데이터 로드 실패:", e);
-    return [];
+    return { images: [], nextCursor: null };
   }
 }
@@ -6,3 +6,6 @@ export const PYTHON_API_URL = process.env.PYTHON_API_URL ?? "http://127.0.0.1:80
 
 export const THUMB_MAX_SIZE = 400;
 export const THUMB_WEBP_QUALITY = 75;
+
+/** /tag/batch 한 번에 보내는 이미지 수 */
+export const TAG_BATCH_SIZE = 8;
@@ -7,7 +7,13 @@ import {
   THUMB_MAX_SIZE,
   THUMB_WEBP_QUALITY,
 } from "./constants";
-import { tagImage, registerImage, type ImageMetadataForApi } from "./pythonClient";
+import {
+  tagImage,
+  tagImages,
+  ingestImages,
+  registerImage,
+  type ImageMetadataForApi,
+} from "./pythonClient";
 import type { ImageItem } from "@/types/gallery";
 
 export type ProcessOneImageOptions = {
@@ -21,6 +27,19 @@ export type ProcessOneImageOptions = {
 
 const DEFAULT_TAG = "untagged";
 
+type SavedImage = {
+  file: File;
+  buffer: Buffer;
+  fileId: string;
+  imgFilename: string;
+  thumbFilename: string;
+};
+
+type PreparedImage = SavedImage & {
+  width?: number;
+  height?: number;
+};
+
 /**
  * 단일 이미지 처리: 원본 저장 → 썸네일 생성 → AI 태깅 → LanceDB 등록
  */
@@ -30,6 +49,90 @@ export async function processOneImage(
   options: ProcessOneImageOptions
 ): Promise<ImageItem> {
   const { baseId, excludeTagSet, wd14Threshold, onComplete } = options;
+  const prepared = await addThumbnail(await saveUpload(file, index, baseId));
+
+  const tags = await fetchAndFilterTags(
+    file,
+    prepared.buffer,
+    excludeTagSet,
+    wd14Threshold
+  );
+
+  const item = await registerPrepared(prepared, tags);
+  onComplete?.();
+  return item;
+}
+
+/**
+ * 여러 이미지 처리: 원본 저장 후 Python /ingest 한 번으로
+ * 디코딩·태깅·임베딩·썸네일·LanceDB 등록을 처리. /ingest 실패 시 기존 경로로 처리
+ * @param startIndex files[0] 의 전체 업로드 내 인덱스 (id 계산용)
+ */
+export async function processImageBatch(
+  files: File[],
+  startIndex: number,
+  options: ProcessOneImageOptions
+): Promise<ImageItem[]> {
+  const { baseId, excludeTagSet, wd14Threshold, onComplete } = options;
+  const saved = await Promise.all(
+    files.map((file, i) => saveUpload(file, startIndex + i, baseId))
+  );
+
+  let ingested: ImageMetadataForApi[] | null = null;
+  try {
+    const createdAt = new Date().toISOString();
+    ingested = await ingestImages(
+      saved.map((s) => ({
+        file: s.file,
+        buffer: s.buffer,
+        metadata: {
+          id: s.fileId,
+          originalName: s.file.name,
+          filename: s.imgFilename,
+          thumbnail: s.thumbFilename,
+          createdAt,
+          notes: "",
+        },
+      })),
+      { threshold: wd14Threshold, excludeTags: Array.from(excludeTagSet) }
+    );
+  } catch (e) {
+    console.warn("Ingest request failed");
+  }
+  if (ingested && ingested.length === saved.length) {
+    return ingested.map((m) => {
+      onComplete?.();
+      return toImageItem(m);
+    });
+  }
+
+  // 대체 경로: /ingest 가 서버에서는 성공했는데 응답만 잃었더라도, 같은 id 로 다시 등록하므로
+  // Python 쪽 upsert(merge_insert on id)로 행이 중복되지 않음
+  const prepared = await Promise.all(saved.map(addThumbnail));
+  let rawTagLists: string[][] = prepared.map(() => []);
+  try {
+    rawTagLists = await tagImages(prepared, wd14Threshold);
+  } catch (e) {
+    console.warn("AI Tagging failed");
+  }
+
+  return Promise.all(
+    prepared.map(async (p, i) => {
+      const item = await registerPrepared(
+        p,
+        filterTags(rawTagLists[i] ?? [], excludeTagSet)
+      );
+      onComplete?.();
+      return item;
+    })
+  );
+}
+
+async function saveUpload(
+  file: File,
+  index: number,
+  baseId: number
+): Promise<SavedImage> {
   const buffer = Buffer.from(await file.arrayBuffer());
   const fileId = (baseId + index).toString();
 
@@ -38,28 +141,34 @@ export async function processOneImage(
   const thumbFilename = `${fileId}.webp`;
 
   await saveOriginal(buffer, imgFilename);
-  const { width: origWidth, height: origHeight } = await createThumbnail(
-    buffer,
-    thumbFilename
-  );
+  return { file, buffer, fileId, imgFilename, thumbFilename };
+}
 
-  let tags = await fetchAndFilterTags(file, buffer, excludeTagSet, wd14Threshold);
+async function addThumbnail(saved: SavedImage): Promise<PreparedImage> {
+  const { width, height } = await createThumbnail(
+    saved.buffer,
+    saved.thumbFilename
+  );
+  return { ...saved, width, height };
+}
 
+async function registerPrepared(
+  p: PreparedImage,
+  tags: string[]
+): Promise<ImageItem> {
   const metadata: ImageMetadataForApi = {
-    id: fileId,
-    originalName: file.name,
-    filename: imgFilename,
-    thumbnail: thumbFilename,
-    width: typeof origWidth === "number" ? origWidth : undefined,
-    height: typeof origHeight === "number" ? origHeight : undefined,
+    id: p.fileId,
+    originalName: p.file.name,
+    filename: p.imgFilename,
+    thumbnail: p.thumbFilename,
+    width: typeof p.width === "number" ? p.width : undefined,
+    height: typeof p.height === "number" ? p.height : undefined,
     tags,
     createdAt: new Date().toISOString(),
     notes: "",
   };
 
   await registerImage(metadata);
-  onComplete?.();
-
   return toImageItem(metadata);
 }
 
@@ -95,6 +204,10 @@ async function fetchAndFilterTags(
   } catch (e) {
     console.warn("AI Tagging failed");
   }
+  return filterTags(raw, excludeTagSet);
+}
+
+function filterTags(raw: string[], excludeTagSet: Set<string>): string[] {
   const filtered =
     excludeTagSet.size > 0
       ? raw.filter((t) => !excludeTagSet.has(String(t).toLowerCase().trim()))
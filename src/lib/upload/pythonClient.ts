@@ -12,6 +12,11 @@ export type ImageMetadataForApi = {
   notes: string;
 };
 
+export type IngestMetadata = Pick<
+  ImageMetadataForApi,
+  "id" | "originalName" | "filename" | "thumbnail" | "createdAt" | "notes"
+>;
+
 /**
  * Python /tag API로 이미지 AI 태깅 요청
  * @param threshold WD14 확률 임계값 (0.2~1.0). 낮을수록 더 많은 태그
@@ -38,6 +43,69 @@ export async function tagImage(
   return raw.map((t: string) => String(t));
 }
 
+/**
+ * Python /tag/batch API로 여러 이미지를 한 번에 태깅 요청
+ * @returns files 순서와 같은 태그 배열 목록. 실패 시 빈 배열로 채움
+ */
+export async function tagImages(
+  items: { file: File; buffer: Buffer }[],
+  threshold?: number
+): Promise<string[][]> {
+  const formData = new FormData();
+  for (const { file, buffer } of items) {
+    formData.append(
+      "files",
+      new Blob([new Uint8Array(buffer)], { type: file.type }),
+      file.name
+    );
+  }
+  const url =
+    threshold != null
+      ? `${PYTHON_API_URL}/tag/batch?threshold=${threshold}`
+      : `${PYTHON_API_URL}/tag/batch`;
+  const res = await fetch(url, { method: "POST", body: formData });
+  if (!res.ok) return items.map(() => []);
+  const data = await res.json();
+  const results = Array.isArray(data.results) ? data.results : [];
+  return items.map((_, i) =>
+    Array.isArray(results[i]) ? results[i].map((t: string) => String(t)) : []
+  );
+}
+
+/**
+ * Python /ingest API: 이미지를 한 번만 디코딩해 태깅·임베딩·썸네일 생성·LanceDB 등록까지 수행
+ * @returns 등록된 메타데이터 (items 순서). 실패 시 null
+ */
+export async function ingestImages(
+  items: { file: File; buffer: Buffer; metadata: IngestMetadata }[],
+  options: { threshold?: number; excludeTags?: string[] } = {}
+): Promise<ImageMetadataForApi[] | null> {
+  const formData = new FormData();
+  for (const { file, buffer } of items) {
+    formData.append(
+      "files",
+      new Blob([new Uint8Array(buffer)], { type: file.type }),
+      file.name
+    );
+  }
+  formData.append("metadata", JSON.stringify(items.map((i) => i.metadata)));
+  formData.append("exclude_tags", JSON.stringify(options.excludeTags ?? []));
+  formData.append("write_thumbnail", "true");
+  if (options.threshold != null) {
+    formData.append("threshold", String(options.threshold));
+  }
+  const res = await fetch(`${PYTHON_API_URL}/ingest`, {
+    method: "POST",
+    body: formData,
+  });
+  if (!res.ok) {
+    console.warn("Ingest failed:", await res.text());
+    return null;
+  }
+  const data = await res.json();
+  return Array.isArray(data.images) ? (data.images as ImageMetadataForApi[]) : null;
+}
+
 /**
  * Python /images API로 메타데이터를 LanceDB에 등록
  */